@@ -44,5 +44,11 @@ class CustomUser(AbstractUser):
         verbose_name="Has selected role"
     )
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # role filters on dashboards / forms (exclude HR, Team Member lists)
+            models.Index(fields=["role"], name="user_role_idx"),
+        ]
+
     def __str__(self):
         return f"{self.username} ({self.role or 'No role'})"
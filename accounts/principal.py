@@ -0,0 +1,177 @@
+# accounts/principal.py
+"""
+Session-cached user principal, so role checks do not load the user row.
+
+Nearly every view (and base.html) only needs to know who the user is and
+which role they have. PrincipalAuthenticationMiddleware replaces Django's
+AuthenticationMiddleware. It keeps
+
+    {"id", "username", "role", "department", "is_role_selected", "hash", "token"}
+
+in the session and hands views a lazy request.user that answers those
+fields (plus pk / is_authenticated / is_anonymous) from the session. The
+CustomUser row is only fetched when something else is touched
+(user.email, user == other, filter(owner=request.user), ...), and then
+exactly like Django does it. Async views get the same object from
+`await request.auser()`.
+
+`token` must match a per-user value in the cache. Every CustomUser save
+deletes that value (accounts/signals.py), so the next request rebuilds
+the principal from the database. That covers role changes, deactivation
+and password changes. A delete only reaches other processes through a
+shared cache: with a per-process one (settings.SHARED_CACHE off) the
+value lives LOCAL_CACHE_TTL seconds instead of PRINCIPAL_TTL, which
+bounds how long another worker keeps trusting the old principal.
+"""
+import uuid
+from dataclasses import asdict, dataclass
+from functools import partial
+
+from django.conf import settings
+from django.contrib.auth import HASH_SESSION_KEY, SESSION_KEY, aget_user, get_user, get_user_model
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.core.cache import cache
+from django.utils.functional import LazyObject, SimpleLazyObject, empty
+
+
+PRINCIPAL_SESSION_KEY = "_principal"
+PRINCIPAL_TTL = 60 * 5
+
+
+@dataclass(frozen=True)
+class Principal:
+    id: int
+    username: str
+    role: str
+    department: str
+    is_role_selected: bool
+
+    is_authenticated = True
+    is_anonymous = False
+
+    @property
+    def pk(self):
+        return self.id
+
+
+PRINCIPAL_FIELDS = {
+    "id", "pk", "username", "role", "department", "is_role_selected",
+    "is_authenticated", "is_anonymous",
+}
+
+
+def _token_key(user_id):
+    return f"principal_token:{user_id}"
+
+
+def _token_ttl():
+    return PRINCIPAL_TTL if settings.SHARED_CACHE else settings.LOCAL_CACHE_TTL
+
+
+def _current_token(user_id):
+    key = _token_key(user_id)
+    token = cache.get(key)
+    if token is None:
+        cache.add(key, uuid.uuid4().hex, _token_ttl())
+        token = cache.get(key)
+    return token
+
+
+def invalidate(user_id):
+    """Make every session's cached principal for this user stale."""
+    cache.delete(_token_key(user_id))
+
+
+def remember(request, user):
+    """Store `user`'s principal in the session (after login / a role change)."""
+    request.session[PRINCIPAL_SESSION_KEY] = {
+        **asdict(Principal(user.id, user.username, user.role, user.department, user.is_role_selected)),
+        "hash": request.session.get(HASH_SESSION_KEY),
+        "token": _current_token(user.id),
+    }
+
+
+def get_principal(request):
+    """The session's principal if it is still current, else None."""
+    data = request.session.get(PRINCIPAL_SESSION_KEY)
+    if not data or str(data["id"]) != str(request.session.get(SESSION_KEY)):
+        return None
+    if data["hash"] != request.session.get(HASH_SESSION_KEY) or data["token"] != _current_token(data["id"]):
+        return None
+    try:
+        return Principal(**{field: data[field] for field in Principal.__dataclass_fields__})
+    except KeyError:
+        return None  # stored by an older version
+
+
+class LazyUser(SimpleLazyObject):
+    """
+    request.user that answers principal fields from the session and only
+    loads the row for anything else. Nothing (not even the session) is
+    read until the first attribute access, as with Django's own lazy user.
+    """
+
+    def __init__(self, request):
+        self.__dict__["_request"] = request
+        self.__dict__["_principal"] = empty
+        super().__init__(lambda: _load_user(request))
+
+    def _principal_or_none(self):
+        if self._wrapped is not empty:
+            return None
+        principal = self.__dict__["_principal"]
+        if principal is empty:
+            principal = self.__dict__["_principal"] = get_principal(self.__dict__["_request"])
+        return principal
+
+    def __getattr__(self, name):
+        if name in PRINCIPAL_FIELDS:
+            principal = self._principal_or_none()
+            if principal is not None:
+                return getattr(principal, name)
+        return super().__getattr__(name)
+
+    # Template variable lookup tries user[...] and isinstance() before
+    # user.<attr>; proxying those would load the row for {{ user.role }}.
+    def __getitem__(self, key):
+        raise TypeError("User objects are not subscriptable")
+
+    @property
+    def __class__(self):
+        if self._principal_or_none() is not None:
+            return get_user_model()
+        return LazyObject.__dict__["__class__"].fget(self)
+
+
+def _load_user(request):
+    user = get_user(request)
+    if user.is_authenticated and get_principal(request) is None:
+        remember(request, user)
+    return user
+
+
+async def _auser(request):
+    """
+    request.auser() for async views (and login_required on them): the
+    same LazyUser, with its principal resolved. The session is loaded
+    asynchronously first, so the principal check below only reads the
+    cache; the row is fetched (with aget_user) only when that check fails.
+    """
+    if not hasattr(request, "_acached_user"):
+        await request.session.aget(SESSION_KEY)
+        user = request.user
+        if user._principal_or_none() is None and user._wrapped is empty:
+            loaded = await aget_user(request)
+            if loaded.is_authenticated:
+                remember(request, loaded)
+            user._wrapped = loaded
+        request._acached_user = user
+    return request._acached_user
+
+
+class PrincipalAuthenticationMiddleware(AuthenticationMiddleware):
+
+    def process_request(self, request):
+        super().process_request(request)  # the session check
+        request.user = LazyUser(request)
+        request.auser = partial(_auser, request)
@@ -0,0 +1,24 @@
+from functools import partial
+
+from django.contrib.auth.signals import user_logged_in
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import principal
+from .models import CustomUser
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def user_changed(sender, instance, **kwargs):
+    # Sessions holding the old role / department rebuild it on their next request;
+    # again after commit, in case one rebuilt it from the old row meanwhile
+    principal.invalidate(instance.id)
+    transaction.on_commit(partial(principal.invalidate, instance.id))
+
+
+@receiver(user_logged_in)
+def user_logged_in_principal(sender, request, user, **kwargs):
+    if request is not None and hasattr(request, "session"):
+        principal.remember(request, user)
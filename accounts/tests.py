@@ -1,3 +1,82 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.sessions.backends.cached_db import SessionStore
+from django.core.cache import cache
+from django.template import Context, Template
+from django.test import RequestFactory, TestCase, override_settings
+
+from .models import CustomUser
+from .principal import PRINCIPAL_TTL, PrincipalAuthenticationMiddleware
+
+
+class PrincipalTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.user = CustomUser.objects.create_user(
+            username="member", password="old-password", role=CustomUser.ROLE_MEMBER
+        )
+        self.client.force_login(self.user)  # stores the principal in the session
+
+    def request_user(self):
+        """request.user as the middleware builds it for the client's session."""
+        request = RequestFactory().get("/")
+        request.session = SessionStore(session_key=self.client.session.session_key)
+        PrincipalAuthenticationMiddleware(lambda request: None).process_request(request)
+        self.session = request.session  # SessionMiddleware would save it after the response
+        return request.user
+
+    def save(self, **fields):
+        for name, value in fields.items():
+            setattr(self.user, name, value)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+
+    def test_principal_fields_need_no_query(self):
+        user = self.request_user()
+        with self.assertNumQueries(0):
+            self.assertEqual((user.pk, user.username, user.role), (self.user.pk, "member", "Team Member"))
+            self.assertTrue(user.is_authenticated)
+            self.assertIsInstance(user, CustomUser)
+            rendered = Template("{{ user.username }}/{{ user.role }}").render(Context({"user": user}))
+        self.assertEqual(rendered, "member/Team Member")
+
+        with self.assertNumQueries(1):
+            self.assertEqual(user.email, "")  # anything else loads the row
+
+    def test_role_change(self):
+        self.save(role=CustomUser.ROLE_HR)
+        self.assertEqual(self.request_user().role, CustomUser.ROLE_HR)
+        self.session.save()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.request_user().role, CustomUser.ROLE_HR)  # cached again
+
+    def test_deactivation(self):
+        self.save(is_active=False)
+        self.assertFalse(self.request_user().is_authenticated)
+
+    def test_password_change_elsewhere(self):
+        self.user.set_password("new-password")
+        self.save()
+        self.assertFalse(self.request_user().is_authenticated)
+
+    def test_logout(self):
+        user = self.request_user()
+        self.assertTrue(user.is_authenticated)
+        self.client.logout()
+        self.assertFalse(self.request_user().is_authenticated)
+
+    def token_ttl(self):
+        cache.clear()
+        with mock.patch.object(cache, "add", wraps=cache.add) as add:
+            self.request_user().role
+        return add.call_args.args[2]
+
+    @override_settings(SHARED_CACHE=False, LOCAL_CACHE_TTL=7)
+    def test_per_process_cache_caps_the_token_ttl(self):
+        self.assertEqual(self.token_ttl(), 7)
+
+    @override_settings(SHARED_CACHE=True)
+    def test_shared_cache_keeps_the_full_ttl(self):
+        self.assertEqual(self.token_ttl(), PRINCIPAL_TTL)
@@ -0,0 +1,121 @@
+# backend/conditional.py
+"""
+Conditional GET for JSON detail endpoints, driven by a model's
+`updated_at` column.
+
+    @login_required
+    @conditional_on_updated_at(Project)
+    def project_api(request, pk):
+        project = get_object_or_404(...)
+        loaded(request, project)
+        ...
+
+A revalidation (If-None-Match / If-Modified-Since) first reads only
+`updated_at` by primary key. That value is both the Last-Modified date
+and (at full precision) the ETag, so a client that still has the current
+version gets a 304 before anything is loaded or serialized. A plain GET
+skips that lookup: the view reports the row it loaded with loaded(), and
+the headers are taken from it. For a row that does not exist the view
+runs as usual and returns its own 404. Async views are supported; the
+lookup is then done with the async ORM before Django's condition() runs.
+
+With `visible=` (user → queryset of rows they may read), rows outside it
+are looked up as missing, so a revalidation never answers 304 for a row
+the user cannot see; the view must apply the same rule before loaded().
+
+This only works if every write that changes the payload also moves
+`updated_at`. Values from related rows (names of the project, the
+assignee, ...) are not covered and do not belong in such a payload. auto_now covers save(), including save(update_fields=[...])
+as long as "updated_at" is listed. QuerySet.update() and M2M changes
+must set it themselves (see projects/signals.py).
+"""
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.http import condition
+
+
+def _memo(request):
+    return request.__dict__.setdefault("_updated_at", {})
+
+
+def loaded(request, instance):
+    """Record the updated_at of the row a decorated view just loaded."""
+    _memo(request)[(instance._meta.label, instance.pk)] = instance.updated_at
+
+
+def _lookup(rows, pk):
+    return rows.filter(pk=pk).values_list("updated_at", flat=True).order_by()[:1]
+
+
+def _updated_at(request, model, pk, visible=None):
+    # etag_func and last_modified_func both ask; look it up once per request
+    memo = _memo(request)
+    key = (model._meta.label, pk)
+    if key not in memo:
+        rows = visible(request.user) if visible else model._base_manager.all()
+        memo[key] = next(iter(_lookup(rows, pk)), None)
+    return memo[key]
+
+
+async def _aupdated_at(request, model, pk, visible=None):
+    memo = _memo(request)
+    key = (model._meta.label, pk)
+    if key not in memo:
+        rows = visible(await request.auser()) if visible else model._base_manager.all()
+        memo[key] = next(iter([value async for value in _lookup(rows, pk)]), None)
+    return memo[key]
+
+
+def _revalidating(request):
+    return "If-None-Match" in request.headers or "If-Modified-Since" in request.headers
+
+
+def _add_headers(request, response, model, pk):
+    updated_at = _memo(request).get((model._meta.label, pk))
+    if response.status_code == 200 and updated_at and request.method in ("GET", "HEAD"):
+        response.headers.setdefault("ETag", quote_etag(_etag(model, pk, updated_at)))
+        response.headers.setdefault("Last-Modified", http_date(updated_at.timestamp()))
+    return response
+
+
+def _etag(model, pk, updated_at):
+    return f"{model._meta.model_name}-{pk}-{updated_at.timestamp():.6f}"
+
+
+def conditional_on_updated_at(model, pk_kwarg="pk", visible=None):
+
+    def last_modified(request, **kwargs):
+        return _updated_at(request, model, kwargs[pk_kwarg], visible)
+
+    def etag(request, **kwargs):
+        pk = kwargs[pk_kwarg]
+        updated_at = _updated_at(request, model, pk, visible)
+        return _etag(model, pk, updated_at) if updated_at else None
+
+    revalidate = condition(etag_func=etag, last_modified_func=last_modified)
+
+    def decorator(view):
+        checked = revalidate(view)
+
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                pk = kwargs[pk_kwarg]
+                if _revalidating(request):
+                    await _aupdated_at(request, model, pk, visible)  # condition() then reads the memo
+                    return await checked(request, *args, **kwargs)
+                return _add_headers(request, await view(request, *args, **kwargs), model, pk)
+
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if _revalidating(request):
+                return checked(request, *args, **kwargs)
+            return _add_headers(request, view(request, *args, **kwargs), model, kwargs[pk_kwarg])
+
+        return wrapper
+
+    return decorator
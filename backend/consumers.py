@@ -1,19 +1,162 @@
-from channels.generic.websocket import AsyncWebsocketConsumer
 import json
 
-class NotificationConsumer(AsyncWebsocketConsumer):
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncWebsocketConsumer
+
+from notifications.unread import unread_summary
+from projects.pagination import visible_projects
+
+from . import metrics
+from .realtime import ANNOUNCEMENTS_GROUP, project_group, user_group
+
+CONSUMER = "realtime"  # metrics label
+
+
+@database_sync_to_async
+def _can_follow_project(user, project_id):
+    return visible_projects(user).filter(pk=project_id).exists()
+
+
+class RealtimeConsumer(AsyncWebsocketConsumer):
+    """
+    One authenticated socket per tab, multiplexing every live feed.
+
+    Client → server:
+        {"action": "subscribe",   "topics": ["announcements", "project:12"]}
+        {"action": "unsubscribe", "topics": ["project:12"]}
+
+    Server → client: every frame carries a "topic" key ("notifications",
+    "announcements", "project:<id>") plus the event's own fields, and
+    subscribe/unsubscribe are answered with {"type": "subscribed", ...}.
+    """
 
     async def connect(self):
-        user = self.scope["user"]
-        if user.is_anonymous:
+        self.user = self.scope["user"]
+        self.groups_joined = {}  # topic → group
+
+        if self.user.is_anonymous:
+            metrics.WS_REJECTED.inc(consumer=CONSUMER)
             await self.close()
-        else:
-            self.group_name = f"user_{user.id}"
-            await self.channel_layer.group_add(self.group_name, self.channel_name)
-            await self.accept()
+            return
+
+        await self.accept()
+        metrics.WS_CONNECTIONS.inc(consumer=CONSUMER)
+        metrics.WS_ACTIVE.inc(consumer=CONSUMER)
+
+        # Every socket gets its owner's notifications without asking
+        await self._join("notifications", user_group(self.user.id))
+        summary = await database_sync_to_async(unread_summary)(self.user.id)
+        await self._emit("notifications", {"type": "unread", **summary})
 
     async def disconnect(self, close_code):
-        await self.channel_layer.group_discard(self.group_name, self.channel_name)
+        user = getattr(self, "user", None)
+        if user is None or user.is_anonymous:
+            return  # never accepted
+        metrics.WS_DISCONNECTIONS.inc(consumer=CONSUMER)
+        metrics.WS_ACTIVE.dec(consumer=CONSUMER)
+        for group in list(self.groups_joined.values()):
+            await self._leave(group)
+
+    # ----- subscriptions -----
+    async def receive(self, text_data=None, bytes_data=None):
+        try:
+            data = json.loads(text_data or "{}")
+        except ValueError:
+            metrics.WS_CLIENT_MESSAGES.inc(consumer=CONSUMER, action="invalid")
+            return await self._error("Invalid JSON")
+
+        if not isinstance(data, dict):
+            data = {}
+        action = data.get("action")
+        topics = data.get("topics") or []
+        if action not in ("subscribe", "unsubscribe") or not isinstance(topics, list):
+            metrics.WS_CLIENT_MESSAGES.inc(consumer=CONSUMER, action="invalid")
+            return await self._error("Unknown action")
+        metrics.WS_CLIENT_MESSAGES.inc(consumer=CONSUMER, action=action)
+
+        for topic in topics:
+            if not isinstance(topic, str):
+                await self._error("Topics must be strings")
+                continue
+            if action == "subscribe":
+                group = await self._resolve(topic)
+                if group is None:
+                    await self._error(f"Cannot subscribe to {topic}")
+                    continue
+                await self._join(topic, group)
+            elif topic != "notifications" and topic in self.groups_joined:
+                await self._leave(self.groups_joined.pop(topic))
+
+        await self.send(text_data=json.dumps({
+            "type": "subscribed",
+            "topics": sorted(self.groups_joined),
+        }))
+
+    async def _resolve(self, topic):
+        """Topic → group name, or None if unknown or not allowed."""
+        if topic == "notifications":
+            return user_group(self.user.id)
+        if topic == "announcements":
+            return ANNOUNCEMENTS_GROUP
+        if topic.startswith("project:"):
+            project_id = topic.split(":", 1)[1]
+            if project_id.isdigit() and await _can_follow_project(self.user, int(project_id)):
+                return project_group(project_id)
+        return None
+
+    async def _join(self, topic, group):
+        if topic in self.groups_joined:
+            return
+        await self.channel_layer.group_add(group, self.channel_name)
+        self.groups_joined[topic] = group
+        metrics.WS_SUBSCRIPTIONS.inc(group=metrics.group_kind(group))
 
+    async def _leave(self, group):
+        await self.channel_layer.group_discard(group, self.channel_name)
+        metrics.WS_SUBSCRIPTIONS.dec(group=metrics.group_kind(group))
+
+    async def _emit(self, topic, payload):
+        await self.send(text_data=json.dumps({"topic": topic, **payload}))
+
+    async def _error(self, message):
+        await self.send(text_data=json.dumps({"type": "error", "error": message}))
+
+    # ----- group events (see backend/realtime.py) -----
+    @metrics.instrument_handler(CONSUMER)
     async def send_notification(self, event):
-        await self.send(text_data=json.dumps(event["data"]))
+        await self._emit("notifications", {
+            "type": "notification",
+            "message": event["message"],
+            "link": event["link"],
+            "item": event.get("item"),
+            "count": event.get("count"),
+        })
+
+    @metrics.instrument_handler(CONSUMER)
+    async def unread_update(self, event):
+        await self._emit("notifications", {
+            "type": "unread",
+            "count": event["count"],
+            "items": event.get("items"),
+        })
+
+    @metrics.instrument_handler(CONSUMER)
+    async def announce_message(self, event):
+        await self._emit("announcements", {
+            "type": "announcement",
+            "message": {
+                "id": event["id"],
+                "sender": event["sender"],
+                "content": event["content"],
+                "created_at": event["created_at"],
+            },
+        })
+
+    @metrics.instrument_handler(CONSUMER)
+    async def project_update(self, event):
+        await self._emit(f"project:{event['project']}", {
+            "type": "project_update",
+            "project": event["project"],
+            "name": event["name"],
+            "changes": event["changes"],
+        })
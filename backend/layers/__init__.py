@@ -0,0 +1,15 @@
+from .core import (
+    POLICY_DROP,
+    POLICY_DROP_OLDEST,
+    POLICY_ERROR,
+    LocalBrokerChannelLayer,
+    RespChannelLayer,
+)
+
+__all__ = [
+    "POLICY_DROP",
+    "POLICY_DROP_OLDEST",
+    "POLICY_ERROR",
+    "LocalBrokerChannelLayer",
+    "RespChannelLayer",
+]
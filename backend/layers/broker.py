@@ -0,0 +1,332 @@
+"""
+Stand-in channel broker speaking the subset of the Redis protocol the
+channel layer uses (lists, sorted sets, BLPOP, EXPIRE). Lets several
+Daphne / Uvicorn workers on one machine share groups without running
+Redis, and gives tests a real cross-process layer.
+
+    python -m backend.layers.broker --socket /tmp/pms-channels.sock
+    python -m backend.layers.broker --port 6390
+
+LocalBrokerChannelLayer can also start it (start_process) when nothing
+is listening on its socket yet. It runs as its own process, so it
+outlives the worker that started it. Everything is kept in memory: if
+the broker itself stops, queued messages and group memberships are
+gone, and sockets only rejoin their groups when they reconnect.
+"""
+import argparse
+import asyncio
+import fnmatch
+import os
+import subprocess
+import sys
+import time
+from collections import deque
+from pathlib import Path
+
+from .resp import read_reply
+
+
+def _simple(value):
+    return b"+%s\r\n" % value.encode()
+
+
+def _error(message):
+    return b"-ERR %s\r\n" % message.encode()
+
+
+def _int(value):
+    return b":%d\r\n" % value
+
+
+def _bulk(value):
+    if value is None:
+        return b"$-1\r\n"
+    return b"$%d\r\n%s\r\n" % (len(value), value)
+
+
+def _array(values):
+    if values is None:
+        return b"*-1\r\n"
+    return b"*%d\r\n" % len(values) + b"".join(_bulk(v) for v in values)
+
+
+class Broker:
+    def __init__(self):
+        self.data = {}       # key → deque (list) or dict (sorted set: member → score)
+        self.expires = {}    # key → unix deadline
+        self.waiters = {}    # key → deque[(Future, client reader)] blocked in BLPOP
+
+    # ----- storage helpers -----
+    def _alive(self, key):
+        deadline = self.expires.get(key)
+        if deadline is not None and deadline <= time.time():
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return key in self.data
+
+    def _list(self, key, create=False):
+        if self._alive(key):
+            return self.data[key]
+        if create:
+            self.data[key] = deque()
+            return self.data[key]
+        return None
+
+    def _zset(self, key, create=False):
+        if self._alive(key):
+            return self.data[key]
+        if create:
+            self.data[key] = {}
+            return self.data[key]
+        return None
+
+    def _drop_if_empty(self, key):
+        if key in self.data and not self.data[key]:
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+
+    def _wake(self, key):
+        queue = self._list(key)
+        waiters = self.waiters.get(key)
+        while queue and waiters:
+            future, reader = waiters.popleft()
+            # A client that hung up mid-BLPOP must not swallow the message
+            if not future.done() and not (reader and reader.at_eof()):
+                future.set_result((key, queue.popleft()))
+        self._drop_if_empty(key)
+
+    def sweep(self):
+        for key in list(self.expires):
+            self._alive(key)
+
+    # ----- commands -----
+    async def dispatch(self, args, reader=None):
+        name = args[0].decode().upper()
+        handler = getattr(self, f"cmd_{name.lower()}", None)
+        if handler is None:
+            return _error(f"unknown command '{name}'")
+        try:
+            if name == "BLPOP":
+                return await handler(*args[1:], reader=reader)
+            return await handler(*args[1:])
+        except (TypeError, ValueError) as e:
+            return _error(str(e))
+
+    async def cmd_ping(self, *args):
+        return _simple("PONG")
+
+    async def cmd_select(self, db):
+        return _simple("OK")
+
+    async def cmd_rpush(self, key, *values):
+        queue = self._list(key, create=True)
+        queue.extend(values)
+        length = len(queue)
+        self._wake(key)
+        return _int(length)
+
+    async def cmd_lpop(self, key):
+        queue = self._list(key)
+        value = queue.popleft() if queue else None
+        self._drop_if_empty(key)
+        return _bulk(value)
+
+    async def cmd_llen(self, key):
+        queue = self._list(key)
+        return _int(len(queue) if queue else 0)
+
+    async def cmd_lrem(self, key, count, value):
+        queue = self._list(key)
+        if not queue:
+            return _int(0)
+        count = int(count)
+        limit = abs(count) or len(queue)
+        # count < 0 removes from the tail, like Redis
+        items = list(reversed(queue)) if count < 0 else list(queue)
+        kept, removed = [], 0
+        for item in items:
+            if item == value and removed < limit:
+                removed += 1
+            else:
+                kept.append(item)
+        queue.clear()
+        queue.extend(reversed(kept) if count < 0 else kept)
+        self._drop_if_empty(key)
+        return _int(removed)
+
+    async def cmd_ltrim(self, key, start, stop):
+        queue = self._list(key)
+        if queue:
+            kept = _slice(list(queue), int(start), int(stop))
+            queue.clear()
+            queue.extend(kept)
+            self._drop_if_empty(key)
+        return _simple("OK")
+
+    async def cmd_blpop(self, *args, reader=None):
+        *keys, timeout = args
+        for key in keys:
+            queue = self._list(key)
+            if queue:
+                value = queue.popleft()
+                self._drop_if_empty(key)
+                return _array([key, value])
+
+        future = asyncio.get_running_loop().create_future()
+        entry = (future, reader)
+        for key in keys:
+            self.waiters.setdefault(key, deque()).append(entry)
+        try:
+            timeout = float(timeout)
+            key, value = await asyncio.wait_for(future, timeout or None)
+            return _array([key, value])
+        except asyncio.TimeoutError:
+            return _array(None)
+        finally:
+            for key in keys:
+                waiters = self.waiters.get(key)
+                if waiters and entry in waiters:
+                    waiters.remove(entry)
+                if waiters is not None and not waiters:
+                    self.waiters.pop(key, None)
+
+    async def cmd_zadd(self, key, *args):
+        if not args or len(args) % 2:
+            raise ValueError("wrong number of arguments for 'zadd'")
+        zset = self._zset(key, create=True)
+        added = 0
+        for score, member in zip(args[::2], args[1::2]):
+            added += member not in zset
+            zset[member] = float(score)
+        return _int(added)
+
+    async def cmd_zrem(self, key, *members):
+        zset = self._zset(key)
+        if not zset:
+            return _int(0)
+        removed = sum(zset.pop(member, None) is not None for member in members)
+        self._drop_if_empty(key)
+        return _int(removed)
+
+    async def cmd_zrange(self, key, start, stop):
+        zset = self._zset(key) or {}
+        ordered = sorted(zset, key=lambda member: (zset[member], member))
+        return _array(_slice(ordered, int(start), int(stop)))
+
+    async def cmd_zremrangebyscore(self, key, low, high):
+        zset = self._zset(key)
+        if not zset:
+            return _int(0)
+        low, high = float(low), float(high)
+        stale = [member for member, score in zset.items() if low <= score <= high]
+        for member in stale:
+            del zset[member]
+        self._drop_if_empty(key)
+        return _int(len(stale))
+
+    async def cmd_zcard(self, key):
+        return _int(len(self._zset(key) or ()))
+
+    async def cmd_expire(self, key, seconds):
+        if not self._alive(key):
+            return _int(0)
+        self.expires[key] = time.time() + int(seconds)
+        return _int(1)
+
+    async def cmd_del(self, *keys):
+        removed = 0
+        for key in keys:
+            if self._alive(key):
+                self.data.pop(key, None)
+                self.expires.pop(key, None)
+                removed += 1
+        return _int(removed)
+
+    async def cmd_keys(self, pattern):
+        pattern = pattern.decode()
+        return _array([
+            key for key in list(self.data)
+            if self._alive(key) and fnmatch.fnmatchcase(key.decode(), pattern)
+        ])
+
+    async def cmd_flushdb(self, *args):
+        self.data.clear()
+        self.expires.clear()
+        return _simple("OK")
+
+    # ----- server -----
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    args = await read_reply(reader)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    break
+                if not isinstance(args, list) or not args:
+                    writer.write(_error("expected a command array"))
+                else:
+                    writer.write(await self.dispatch(args, reader))
+                await writer.drain()
+        except (ConnectionResetError, BrokenPipeError):
+            pass
+        finally:
+            writer.close()
+
+    async def _sweeper(self):
+        while True:
+            await asyncio.sleep(5)
+            self.sweep()
+
+    async def serve(self, path=None, host="127.0.0.1", port=None, ready=None):
+        if path:
+            if os.path.exists(path):
+                os.unlink(path)
+            server = await asyncio.start_unix_server(self.handle, path=path)
+        else:
+            server = await asyncio.start_server(self.handle, host=host, port=port)
+
+        sweeper = asyncio.ensure_future(self._sweeper())
+        if ready is not None:
+            ready.set()
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            sweeper.cancel()
+
+
+def _slice(items, start, stop):
+    # Redis ranges: inclusive stop, negative indexes count from the end
+    length = len(items)
+    start = max(start + length if start < 0 else start, 0)
+    stop = stop + length if stop < 0 else stop
+    return items[start:stop + 1]
+
+
+def start_process(path):
+    """
+    Start a broker on `path` in a new, detached process (used by
+    LocalBrokerChannelLayer autostart). It is not tied to the caller's
+    lifetime; stop it with .terminate() on the returned Popen.
+    """
+    return subprocess.Popen(
+        [sys.executable, "-m", "backend.layers.broker", "--socket", path],
+        cwd=Path(__file__).resolve().parents[2],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in channel broker")
+    parser.add_argument("--socket", help="Unix socket path to listen on")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6390)
+    args = parser.parse_args()
+    asyncio.run(Broker().serve(path=args.socket, host=args.host, port=args.port))
+
+
+if __name__ == "__main__":
+    main()
+
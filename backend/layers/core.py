@@ -0,0 +1,302 @@
+"""
+Cross-process channel layer over the Redis protocol, used with the
+bundled broker (LocalBrokerChannelLayer). Deployments with a real Redis
+server use channels_redis instead (see CHANNEL_LAYERS in settings).
+
+RespChannelLayer stores each channel as a list and each group as a
+sorted set of channel → join time, so any worker connected to the same
+server can reach any socket. Members older than `group_expiry` are
+pruned on every group_send, which is how channels from sockets that
+died without a disconnect leave their groups. Group sends are fanned out
+in pipelined batches (one round trip per `fanout_batch_size` members
+instead of one per member) and obey a per-group capacity / overflow
+policy.
+
+Capacity is enforced by pushing first and looking at the length the
+push returns; a message that went over is taken back out (or, under
+drop_oldest, the list is trimmed). Each command is atomic on the server,
+so concurrent senders cannot all pass a separate length check.
+"""
+import asyncio
+import fcntl
+import json
+import os
+import time
+import uuid
+from collections import defaultdict
+
+from channels.exceptions import ChannelFull
+from channels.layers import BaseChannelLayer
+
+from .. import metrics
+from .resp import RespConnection
+
+
+# What to do with a group message when a member's queue is at capacity
+POLICY_DROP = "drop"                # skip that member (channels' default)
+POLICY_DROP_OLDEST = "drop_oldest"  # evict the member's oldest message
+POLICY_ERROR = "error"              # deliver to the rest, then raise ChannelFull
+POLICIES = {POLICY_DROP, POLICY_DROP_OLDEST, POLICY_ERROR}
+
+
+class RespChannelLayer(BaseChannelLayer):
+
+    extensions = ["groups", "flush"]
+
+    def __init__(
+        self,
+        address,
+        prefix="pms:",
+        expiry=60,
+        group_expiry=86400,
+        capacity=100,
+        channel_capacity=None,
+        group_capacity=None,
+        group_policy=None,
+        fanout_batch_size=100,
+        receive_timeout=5,
+    ):
+        super().__init__(expiry=expiry, capacity=capacity)
+        self.address = address
+        self.prefix = prefix
+        self.group_expiry = group_expiry
+        self.channel_capacity = self.compile_capacities(channel_capacity or {})
+        self.group_capacity = self.compile_capacities(group_capacity or {})
+        self.group_policy = self.compile_capacities(group_policy or {})
+        for _, policy in self.group_policy:
+            if policy not in POLICIES:
+                raise ValueError(f"Unknown group policy {policy!r}")
+        self.fanout_batch_size = max(1, fanout_batch_size)
+        self.receive_timeout = receive_timeout
+
+        self._pools = {}
+        # group → messages dropped because members were full
+        self.dropped = defaultdict(int)
+
+    # ----- connections (one idle pool per event loop) -----
+    async def _connect(self):
+        return await RespConnection.open(self.address)
+
+    async def _acquire(self):
+        loop = asyncio.get_running_loop()
+        for other in [l for l in self._pools if l.is_closed()]:
+            del self._pools[other]
+        pool = self._pools.setdefault(loop, [])
+        while pool:
+            conn = pool.pop()
+            if not conn.closed:
+                return conn
+            conn.close()  # the server went away while it sat in the pool
+        return await self._connect()
+
+    def _release(self, conn):
+        if conn.closed:
+            return
+        self._pools.setdefault(asyncio.get_running_loop(), []).append(conn)
+
+    async def _pipeline(self, commands):
+        conn = await self._acquire()
+        try:
+            replies = await conn.pipeline(commands)
+        except BaseException:
+            conn.close()
+            raise
+        self._release(conn)
+        return replies
+
+    async def _execute(self, *args):
+        (reply,) = await self._pipeline([args])
+        return reply
+
+    # ----- keys -----
+    def _channel_key(self, channel):
+        return f"{self.prefix}channel:{channel}"
+
+    def _group_key(self, group):
+        return f"{self.prefix}group:{group}"
+
+    def _lookup(self, compiled, name, default):
+        for pattern, value in compiled:
+            if pattern.match(name):
+                return value
+        return default
+
+    # ----- channel API -----
+    async def send(self, channel, message):
+        assert isinstance(message, dict), "message is not a dict"
+        assert self.valid_channel_name(channel), "Channel name not valid"
+
+        key = self._channel_key(channel)
+        capacity = self._lookup(self.channel_capacity, channel, self.capacity)
+        payload = json.dumps(message)
+        length, _ = await self._pipeline([
+            ("RPUSH", key, payload),
+            ("EXPIRE", key, self.expiry),
+        ])
+        if length > capacity:
+            await self._execute("LREM", key, -1, payload)
+            raise ChannelFull(channel)
+
+    async def receive(self, channel):
+        assert self.valid_channel_name(channel, receive=True)
+        key = self._channel_key(channel)
+
+        while True:
+            conn = await self._acquire()
+            try:
+                reply = await conn.execute("BLPOP", key, self.receive_timeout)
+            except BaseException:
+                # Cancelled mid-BLPOP: the connection may still get a reply,
+                # so it can never go back into the pool.
+                conn.close()
+                raise
+            self._release(conn)
+            if reply is not None:
+                return json.loads(reply[1])
+
+    async def new_channel(self, prefix="specific"):
+        return f"{prefix}.{uuid.uuid4().hex}"
+
+    # ----- groups -----
+    async def group_add(self, group, channel):
+        assert self.valid_group_name(group), "Group name not valid"
+        assert self.valid_channel_name(channel), "Channel name not valid"
+        key = self._group_key(group)
+        await self._pipeline([
+            ("ZADD", key, time.time(), channel),
+            ("EXPIRE", key, self.group_expiry),
+        ])
+
+    async def group_discard(self, group, channel):
+        assert self.valid_group_name(group), "Group name not valid"
+        assert self.valid_channel_name(channel), "Channel name not valid"
+        await self._execute("ZREM", self._group_key(group), channel)
+
+    async def _members(self, group):
+        key = self._group_key(group)
+        _, members = await self._pipeline([
+            ("ZREMRANGEBYSCORE", key, 0, time.time() - self.group_expiry),
+            ("ZRANGE", key, 0, -1),
+        ])
+        return [member.decode() for member in members]
+
+    async def group_size(self, group):
+        return len(await self._members(group))
+
+    async def group_send(self, group, message):
+        assert self.valid_group_name(group), "Group name not valid"
+        members = await self._members(group)
+        if not members:
+            return
+
+        kind = metrics.group_kind(group)
+        metrics.LAYER_GROUP_MEMBERS.observe(len(members), group=kind)
+        capacity = self._lookup(self.group_capacity, group, self.capacity)
+        policy = self._lookup(self.group_policy, group, POLICY_DROP)
+        payload = json.dumps(message)
+        full = []
+
+        for start in range(0, len(members), self.fanout_batch_size):
+            batch = members[start:start + self.fanout_batch_size]
+            keys = [self._channel_key(channel) for channel in batch]
+
+            # one round trip: every push (and, for drop_oldest, the trim
+            # back to capacity that evicts the oldest) for the batch
+            step = 3 if policy == POLICY_DROP_OLDEST else 2
+            commands = []
+            for key in keys:
+                commands.append(("RPUSH", key, payload))
+                commands.append(("EXPIRE", key, self.expiry))
+                if policy == POLICY_DROP_OLDEST:
+                    commands.append(("LTRIM", key, -capacity, -1))
+            replies = await self._pipeline(commands)
+            lengths = replies[::step]  # the RPUSH replies
+
+            # members that were already full get theirs taken back out
+            overflow = []
+            for channel, key, length in zip(batch, keys, lengths):
+                metrics.LAYER_QUEUE_DEPTH.observe(length - 1, group=kind)
+                if length > capacity and policy != POLICY_DROP_OLDEST:
+                    full.append(channel)
+                    overflow.append(("LREM", key, -1, payload))
+            if overflow:
+                await self._pipeline(overflow)
+
+        if full:
+            self.dropped[group] += len(full)
+            metrics.LAYER_DROPPED.inc(len(full), group=kind)
+            if policy == POLICY_ERROR:
+                raise ChannelFull(f"{group}: {len(full)} member(s) at capacity")
+
+    # ----- flush / close -----
+    async def flush(self):
+        keys = await self._execute("KEYS", f"{self.prefix}*")
+        if keys:
+            await self._execute("DEL", *keys)
+
+    async def close(self):
+        loop = asyncio.get_running_loop()
+        for conn in self._pools.pop(loop, []):
+            conn.close()
+
+
+class LocalBrokerChannelLayer(RespChannelLayer):
+    """
+    Channel layer on the bundled broker (backend/layers/broker.py) over a
+    Unix socket. With autostart=True the first process that finds no
+    broker listening starts one as a separate process, so several
+    workers on one machine — or a test run — need no external service,
+    and the broker survives any one worker exiting. If the broker itself
+    dies, the next connection attempt starts a fresh one.
+    """
+
+    # How long to wait for another process's broker, or for our own to listen
+    startup_timeout = 10
+
+    def __init__(self, path="/tmp/pms-channels.sock", autostart=True, **kwargs):
+        super().__init__(address=path, **kwargs)
+        self.path = path
+        self.autostart = autostart
+        self.broker_process = None  # the Popen, if this process started it
+
+    async def _connect(self):
+        try:
+            return await super()._connect()
+        except (FileNotFoundError, ConnectionRefusedError):
+            if not self.autostart:
+                raise
+        from .broker import start_process
+
+        # Serialise autostart across worker processes: whoever gets the
+        # lock first starts the broker, the rest find it listening.
+        with open(f"{self.path}.lock", "w") as lock:
+            await self._lock(lock)
+            try:
+                return await super()._connect()
+            except (FileNotFoundError, ConnectionRefusedError):
+                if os.path.exists(self.path):
+                    os.unlink(self.path)  # stale socket left by a dead broker
+                self.broker_process = start_process(self.path)
+                return await self._wait_for_broker()
+
+    async def _lock(self, lock):
+        # flock() without LOCK_NB would block the event loop
+        deadline = time.monotonic() + self.startup_timeout
+        while True:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return
+            except BlockingIOError:
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"Timed out waiting for {lock.name}")
+                await asyncio.sleep(0.05)
+
+    async def _wait_for_broker(self):
+        deadline = time.monotonic() + self.startup_timeout
+        while True:
+            try:
+                return await super()._connect()
+            except (FileNotFoundError, ConnectionRefusedError):
+                if time.monotonic() > deadline or self.broker_process.poll() is not None:
+                    raise
+                await asyncio.sleep(0.05)
@@ -0,0 +1,107 @@
+"""
+Minimal asyncio client for the Redis serialization protocol (RESP2).
+
+Only what the channel layer needs: single commands and pipelines over a
+TCP or Unix-socket connection. Works against a real Redis server and the
+bundled stand-in broker (backend/layers/broker.py).
+"""
+import asyncio
+from urllib.parse import unquote, urlparse
+
+
+class RespError(Exception):
+    """Error reply (-ERR ...) from the server."""
+
+
+def encode_command(*args):
+    out = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if isinstance(arg, bytes):
+            data = arg
+        elif isinstance(arg, str):
+            data = arg.encode()
+        else:
+            data = str(arg).encode()
+        out.append(b"$%d\r\n%s\r\n" % (len(data), data))
+    return b"".join(out)
+
+
+async def read_reply(reader):
+    line = await reader.readline()
+    if not line:
+        raise ConnectionError("Connection closed by server")
+    prefix, rest = line[:1], line[1:-2]
+
+    if prefix == b"+":
+        return rest.decode()
+    if prefix == b"-":
+        return RespError(rest.decode())
+    if prefix == b":":
+        return int(rest)
+    if prefix == b"$":
+        length = int(rest)
+        if length == -1:
+            return None
+        data = await reader.readexactly(length + 2)
+        return data[:-2]
+    if prefix == b"*":
+        count = int(rest)
+        if count == -1:
+            return None
+        return [await read_reply(reader) for _ in range(count)]
+    raise ConnectionError(f"Unexpected RESP prefix {prefix!r}")
+
+
+class RespConnection:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def open(cls, address):
+        """`address` is a redis:// / rediss:// / unix:// URL or a socket path."""
+        if "://" not in address:
+            address = f"unix://{address}"
+        url = urlparse(address)
+
+        if url.scheme == "unix":
+            reader, writer = await asyncio.open_unix_connection(url.path)
+        else:
+            reader, writer = await asyncio.open_connection(
+                url.hostname or "localhost",
+                url.port or 6379,
+                ssl=url.scheme == "rediss" or None,
+            )
+        conn = cls(reader, writer)
+
+        if url.password:
+            auth = [unquote(url.password)]
+            if url.username:
+                auth.insert(0, unquote(url.username))
+            await conn.execute("AUTH", *auth)
+        db = (url.path or "/").strip("/")
+        if url.scheme != "unix" and db:
+            await conn.execute("SELECT", db)
+        return conn
+
+    async def execute(self, *args):
+        (reply,) = await self.pipeline([args])
+        return reply
+
+    async def pipeline(self, commands):
+        """Send every command in one write, then read the replies in order."""
+        self.writer.write(b"".join(encode_command(*cmd) for cmd in commands))
+        await self.writer.drain()
+        replies = [await read_reply(self.reader) for _ in commands]
+        for reply in replies:
+            if isinstance(reply, RespError):
+                raise reply
+        return replies
+
+    def close(self):
+        self.writer.close()
+
+    @property
+    def closed(self):
+        # at_eof: the server hung up (e.g. a restarted broker)
+        return self.writer.is_closing() or self.reader.at_eof()
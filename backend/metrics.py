@@ -0,0 +1,261 @@
+# backend/metrics.py
+"""
+In-process metrics for the realtime stack, served as Prometheus text at
+/metrics (no client library or push gateway needed).
+
+    ws_connections_total{consumer}            sockets accepted
+    ws_rejected_total{consumer}               sockets refused (anonymous)
+    ws_disconnections_total{consumer}
+    ws_active_connections{consumer}
+    ws_client_messages_total{consumer,action} subscribe / unsubscribe / invalid
+    ws_handler_seconds{consumer,handler}      time spent in a group-event handler
+    ws_delivery_seconds{handler}              publish() → frame written to the socket
+    ws_subscriptions{group}                   group memberships held by this process
+    channel_layer_send_seconds{group}         group_send() as seen by the publisher
+    channel_layer_group_members{group}        fan-out size per group_send (RESP layers)
+    channel_layer_queue_depth{group}          member queue length at send (RESP layers)
+    channel_layer_dropped_total{group}        messages dropped at capacity (RESP layers)
+    channel_layer_groups / channel_layer_channels / channel_layer_queue_depth_max
+                                              sampled at scrape time (in-memory layer)
+
+The `group` label is the group's kind ("notif", "project",
+"announcements"), never a per-user name, to keep the series count small.
+
+Values live in the memory of the process that serves /metrics. Under
+Daphne/Uvicorn that is the same process as the sockets; with several
+workers, scrape each one.
+"""
+import hmac
+import re
+import threading
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.http import HttpResponse
+
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIZE_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+_GROUP_ID = re.compile(r"_\d+$")
+
+_registry = []
+_collectors = []
+
+
+def group_kind(group):
+    """notif_12 → notif, project_7 → project, announcements → announcements."""
+    return _GROUP_ID.sub("", group)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value):
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _key(self, labels):
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield self.name, key, (), value
+
+    def render(self):
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.kind}"
+        for name, key, extra, value in self.samples():
+            yield f"{name}{_format_labels(self.label_names, key, extra)} {_format_value(value)}"
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            # ([count per bucket..., total count], sum); bucket counts are cumulative
+            counts, total = self._values.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            counts[-1] += 1
+            self._values[key] = (counts, total + value)
+
+    def samples(self):
+        with self._lock:
+            items = sorted((key, (list(counts), total)) for key, (counts, total) in self._values.items())
+        for key, (counts, total) in items:
+            for bound, count in zip(self.buckets, counts):
+                yield f"{self.name}_bucket", key, (("le", _format_value(bound)),), count
+            yield f"{self.name}_bucket", key, (("le", "+Inf"),), counts[-1]
+            yield f"{self.name}_sum", key, (), total
+            yield f"{self.name}_count", key, (), counts[-1]
+
+    def time(self, **labels):
+        return _Timer(self, labels)
+
+
+class _Timer:
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+
+
+def collector(func):
+    """Register `func()` to refresh scrape-time gauges just before /metrics renders."""
+    _collectors.append(func)
+    return func
+
+
+def render():
+    for func in _collectors:
+        func()
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# -----------------------------------------------------
+# Metrics
+# -----------------------------------------------------
+WS_CONNECTIONS = Counter("ws_connections_total", "WebSocket connections accepted.", ["consumer"])
+WS_REJECTED = Counter("ws_rejected_total", "WebSocket connections refused.", ["consumer"])
+WS_DISCONNECTIONS = Counter("ws_disconnections_total", "WebSocket disconnections.", ["consumer"])
+WS_ACTIVE = Gauge("ws_active_connections", "Open WebSocket connections.", ["consumer"])
+WS_CLIENT_MESSAGES = Counter(
+    "ws_client_messages_total", "Frames received from clients.", ["consumer", "action"]
+)
+WS_HANDLER_SECONDS = Histogram(
+    "ws_handler_seconds", "Time spent handling one group event.", ["consumer", "handler"]
+)
+WS_DELIVERY_SECONDS = Histogram(
+    "ws_delivery_seconds", "Time from publish() to the frame being sent.", ["handler"]
+)
+WS_SUBSCRIPTIONS = Gauge(
+    "ws_subscriptions", "Group memberships held by sockets in this process.", ["group"]
+)
+
+LAYER_SEND_SECONDS = Histogram(
+    "channel_layer_send_seconds", "group_send() duration seen by the publisher.", ["group"]
+)
+LAYER_GROUP_MEMBERS = Histogram(
+    "channel_layer_group_members", "Members reached by one group_send().", ["group"], SIZE_BUCKETS
+)
+LAYER_QUEUE_DEPTH = Histogram(
+    "channel_layer_queue_depth", "Member queue length found by group_send().", ["group"], SIZE_BUCKETS
+)
+LAYER_DROPPED = Counter(
+    "channel_layer_dropped_total", "Group messages dropped because a member was full.", ["group"]
+)
+LAYER_GROUPS = Gauge("channel_layer_groups", "Groups known to the in-memory layer.")
+LAYER_CHANNELS = Gauge("channel_layer_channels", "Channels with a queue in the in-memory layer.")
+LAYER_QUEUE_DEPTH_MAX = Gauge(
+    "channel_layer_queue_depth_max", "Longest channel queue in the in-memory layer."
+)
+
+
+@collector
+def _sample_in_memory_layer():
+    from channels.layers import InMemoryChannelLayer, channel_layers
+
+    layer = channel_layers.backends.get("default")  # only if something already created it
+    if not isinstance(layer, InMemoryChannelLayer):
+        return
+    queues = list(layer.channels.values())
+    LAYER_GROUPS.set(len(layer.groups))
+    LAYER_CHANNELS.set(len(queues))
+    LAYER_QUEUE_DEPTH_MAX.set(max((q.qsize() for q in queues), default=0))
+
+
+def instrument_handler(consumer):
+    """Decorator for consumer event handlers: handler time and end-to-end delivery latency."""
+    def decorator(handler):
+        name = handler.__name__
+
+        @wraps(handler)
+        async def wrapper(self, event):
+            sent_at = event.get("sent_at")
+            with WS_HANDLER_SECONDS.time(consumer=consumer, handler=name):
+                await handler(self, event)
+            if sent_at:
+                WS_DELIVERY_SECONDS.observe(max(0.0, time.time() - sent_at), handler=name)
+        return wrapper
+    return decorator
+
+
+# -----------------------------------------------------
+# Endpoint
+# -----------------------------------------------------
+def metrics_view(request):
+    """
+    Prometheus scrape target, readable by staff and by scrapers sending
+    "Authorization: Bearer <settings.METRICS_TOKEN>". DEBUG opens nothing:
+    it is on in production here.
+    """
+    token = getattr(settings, "METRICS_TOKEN", "")
+    sent = request.headers.get("Authorization", "")
+    if not (token and hmac.compare_digest(sent, f"Bearer {token}")) and not request.user.is_staff:
+        raise PermissionDenied
+    return HttpResponse(render(), content_type="text/plain; version=0.0.4; charset=utf-8")
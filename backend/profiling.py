@@ -0,0 +1,220 @@
+# backend/profiling.py
+"""
+Per-request SQL profiling, cheap enough to leave on in production.
+
+A sampled fraction of requests (settings.SQL_PROFILE_SAMPLE_RATE) is
+timed at the database cursor. For each of those the middleware records
+
+  - queries    → number of statements (savepoints excluded)
+  - db_ms      → total time spent waiting on the database
+  - duplicates → statements run more than once, grouped by fingerprint
+                 (SQL with placeholders, IN-lists collapsed): N+1 loops
+  - slowest    → the SQL_PROFILE_TOP slowest statements
+  - slow       → how many took longer than SQL_PROFILE_SLOW_MS
+
+and sends it back as a Server-Timing header
+
+    Server-Timing: db;dur=12.4;desc="14 queries", db-dup;desc="3 repeated", app;dur=40.2
+
+(visible in the browser's network panel) and as one JSON line in the
+process's own log, SQL_PROFILE_LOG suffixed with its pid (several
+workers never share, or rotate, one file), which rotates at
+SQL_PROFILE_LOG_MAX_BYTES. The request only queues the line; a listener
+thread does the file I/O, so an async request never blocks the event
+loop on it. `manage.py sql_profile_report` summarises the logs per view.
+
+Unsampled requests run without any cursor wrapper. The middleware is
+async-capable, so under ASGI it does not push async views into a thread;
+for a sampled async request the wrapper is installed on the connections
+of the request's thread-sensitive executor, where its ORM calls run.
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+
+_IN_LIST = re.compile(r"\bIN \((?:%s, )*%s\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint(sql):
+    """Statement shape: parameters are already placeholders, IN-lists collapse to one."""
+    return _WHITESPACE.sub(" ", _IN_LIST.sub("IN (...)", sql)).strip()
+
+
+_listener = None
+_listener_pid = None
+_listener_lock = threading.Lock()
+
+
+def log_path():
+    """This process's JSONL file: SQL_PROFILE_LOG.<pid>."""
+    return Path(f"{settings.SQL_PROFILE_LOG}.{os.getpid()}")
+
+
+def _log():
+    """
+    JSONL logger whose records are queued for a listener thread writing
+    log_path(). Set up once per process (again in a forked child).
+    """
+    global _listener, _listener_pid
+    logger = logging.getLogger("backend.sql_profile")
+    if _listener_pid == os.getpid():
+        return logger
+
+    with _listener_lock:
+        if _listener_pid != os.getpid():
+            path = log_path()
+            path.parent.mkdir(parents=True, exist_ok=True)
+            handler = RotatingFileHandler(
+                path,
+                maxBytes=settings.SQL_PROFILE_LOG_MAX_BYTES,
+                backupCount=settings.SQL_PROFILE_LOG_BACKUPS,
+                encoding="utf-8",
+            )
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            records = queue.SimpleQueue()
+            # A forked child inherits the parent's handlers, not its thread
+            for old in logger.handlers[:]:
+                logger.removeHandler(old)
+            logger.addHandler(QueueHandler(records))
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+            _listener = QueueListener(records, handler)
+            _listener.start()
+            _listener_pid = os.getpid()
+    return logger
+
+
+def close_log():
+    """Write out queued lines and close the file (at exit; tests)."""
+    global _listener, _listener_pid
+    with _listener_lock:
+        if _listener is not None and _listener_pid == os.getpid():
+            _listener.stop()
+            for handler in _listener.handlers:
+                handler.close()
+        _listener = _listener_pid = None
+
+
+atexit.register(close_log)
+
+
+class QueryRecorder:
+    """execute_wrapper that times every statement on the connections it is installed on."""
+
+    def __init__(self):
+        self.statements = []  # (sql, duration in seconds)
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            if not sql.startswith(("SAVEPOINT", "RELEASE SAVEPOINT")):
+                self.statements.append((sql, time.perf_counter() - start))
+
+    def summary(self, top, slow_ms):
+        counts = Counter(fingerprint(sql) for sql, _ in self.statements)
+        slowest = sorted(self.statements, key=lambda s: s[1], reverse=True)[:top]
+        return {
+            "queries": len(self.statements),
+            "db_ms": round(sum(d for _, d in self.statements) * 1000, 2),
+            "slow": sum(1 for _, d in self.statements if d * 1000 >= slow_ms),
+            "duplicates": [
+                {"sql": sql, "count": n} for sql, n in counts.most_common() if n > 1
+            ],
+            "slowest": [
+                {"sql": fingerprint(sql), "ms": round(d * 1000, 2)} for sql, d in slowest
+            ],
+        }
+
+
+def _install(stack, recorder):
+    for conn in connections.all():
+        stack.enter_context(conn.execute_wrapper(recorder))
+
+
+class SQLProfilingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = settings.SQL_PROFILE_SAMPLE_RATE
+        self.top = settings.SQL_PROFILE_TOP
+        self.slow_ms = settings.SQL_PROFILE_SLOW_MS
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def _sampled(self):
+        return self.sample_rate and random.random() < self.sample_rate
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not self._sampled():
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            _install(stack, recorder)
+            response = self.get_response(request)
+        return self.record(request, response, recorder, start)
+
+    async def __acall__(self, request):
+        if not self._sampled():
+            return await self.get_response(request)
+
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        stack = ExitStack()
+        await sync_to_async(_install)(stack, recorder)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        return self.record(request, response, recorder, start)
+
+    def record(self, request, response, recorder, start):
+        elapsed_ms = round((time.perf_counter() - start) * 1000, 2)
+        summary = recorder.summary(self.top, self.slow_ms)
+        response["Server-Timing"] = self.server_timing(summary, elapsed_ms)
+
+        match = request.resolver_match
+        _log().info(json.dumps({
+            "ts": timezone.now().isoformat(),
+            "method": request.method,
+            "path": request.path,
+            "view": match.view_name if match else None,
+            "status": response.status_code,
+            "ms": elapsed_ms,
+            **summary,
+        }))
+        return response
+
+    @staticmethod
+    def server_timing(summary, elapsed_ms):
+        repeated = sum(entry["count"] - 1 for entry in summary["duplicates"])
+        return ", ".join([
+            f'db;dur={summary["db_ms"]};desc="{summary["queries"]} queries"',
+            f'db-dup;desc="{repeated} repeated"',
+            f"app;dur={elapsed_ms}",
+        ])
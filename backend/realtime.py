@@ -0,0 +1,89 @@
+# backend/realtime.py
+"""
+Group names and publishing helpers for the multiplexed WebSocket
+(backend/consumers.py).
+
+Every browser tab opens one socket at /ws/ and subscribes to topics on it:
+
+    notifications   → group notif_<user id>   (joined automatically)
+    announcements   → group announcements
+    project:<id>    → group project_<id>
+
+Server code publishes through these helpers so senders and the consumer
+always agree on group names and event types. Async views use the
+a-prefixed variants, which await the layer directly instead of going
+through async_to_sync.
+"""
+import asyncio
+import time
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+
+from . import metrics
+
+
+ANNOUNCEMENTS_GROUP = "announcements"
+
+
+def user_group(user_id):
+    return f"notif_{user_id}"
+
+
+def project_group(project_id):
+    return f"project_{project_id}"
+
+
+def _event(event_type, payload):
+    # sent_at lets the consumer measure delivery latency (backend/metrics.py)
+    return {"type": event_type, **payload, "sent_at": time.time()}
+
+
+async def _group_send(layer, group, event):
+    with metrics.LAYER_SEND_SECONDS.time(group=metrics.group_kind(group)):
+        await layer.group_send(group, event)
+
+
+def publish(group, event_type, **payload):
+    """Send one event to a group; `event_type` names the consumer handler."""
+    async_to_sync(_group_send)(get_channel_layer(), group, _event(event_type, payload))
+
+
+async def apublish(group, event_type, **payload):
+    await _group_send(get_channel_layer(), group, _event(event_type, payload))
+
+
+def publish_many(events):
+    """
+    Send many (group, event_type, payload) events in one sync→async hop,
+    instead of one async_to_sync round trip per recipient.
+    """
+    layer = get_channel_layer()
+
+    async def send_all():
+        await asyncio.gather(*(
+            _group_send(layer, group, _event(event_type, payload))
+            for group, event_type, payload in events
+        ))
+
+    async_to_sync(send_all)()
+
+
+def publish_project_update(project, **changes):
+    publish(
+        project_group(project.id),
+        "project_update",
+        project=project.id,
+        name=project.name,
+        changes=changes,
+    )
+
+
+async def apublish_project_update(project, **changes):
+    await apublish(
+        project_group(project.id),
+        "project_update",
+        project=project.id,
+        name=project.name,
+        changes=changes,
+    )
@@ -1,6 +1,6 @@
 from django.urls import path
-from .consumers import NotificationConsumer
+from .consumers import RealtimeConsumer
 
 websocket_urlpatterns = [
-    path("ws/notifications/", NotificationConsumer.as_view()),
+    path("ws/", RealtimeConsumer.as_asgi()),
 ]
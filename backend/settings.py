@@ -5,6 +5,7 @@ Author: Ani
 
 from pathlib import Path
 import os
+import sys
 import dj_database_url
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -67,6 +68,7 @@ INSTALLED_APPS = [
     "communications",
     "design",
     "notifications",
+    "jobs",
 
     # Channels
     "channels",
@@ -74,6 +76,10 @@ INSTALLED_APPS = [
 
 SITE_ID = 1
 
+# Partial indexes (e.g. unread notifications) are skipped on MySQL, which
+# falls back to the full composite index next to them.
+SILENCED_SYSTEM_CHECKS = ["models.W037"]
+
 # --------------------------------------------------------
 # AUTH & USER MODEL
 # --------------------------------------------------------
@@ -117,20 +123,57 @@ SOCIALACCOUNT_ENABLED = False
 # CHANNELS
 # --------------------------------------------------------
 ASGI_APPLICATION = "backend.asgi.application"
-CHANNEL_LAYERS = {
-    "default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}
+
+# Group fan-out limits for the bundled broker's layer: per-member queue
+# capacity and what happens to a group message when a member is full
+# (see backend/layers/core.py).
+CHANNEL_LAYER_OPTIONS = {
+    "capacity": 100,
+    "fanout_batch_size": 200,
+    "group_capacity": {"announcements": 50, "notif_*": 200},
+    "group_policy": {"announcements": "drop_oldest", "notif_*": "drop"},
 }
 
+# REDIS_URL → Redis via channels_redis (multi-host; a full member simply
+# misses group messages); CHANNEL_BROKER_SOCKET → bundled local broker
+# shared by every worker on this machine; neither → in-process layer,
+# only safe with a single worker.
+if os.getenv("REDIS_URL"):
+    CHANNEL_LAYERS = {
+        "default": {
+            "BACKEND": "channels_redis.core.RedisChannelLayer",
+            "CONFIG": {
+                "hosts": [os.getenv("REDIS_URL")],
+                "capacity": CHANNEL_LAYER_OPTIONS["capacity"],
+            },
+        }
+    }
+elif os.getenv("CHANNEL_BROKER_SOCKET"):
+    CHANNEL_LAYERS = {
+        "default": {
+            "BACKEND": "backend.layers.LocalBrokerChannelLayer",
+            "CONFIG": {"path": os.getenv("CHANNEL_BROKER_SOCKET"), **CHANNEL_LAYER_OPTIONS},
+        }
+    }
+else:
+    CHANNEL_LAYERS = {
+        "default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}
+    }
+
+# Bearer token Prometheus sends to /metrics; staff can always read it.
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
 # --------------------------------------------------------
 # MIDDLEWARE
 # --------------------------------------------------------
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
-    "whitenoise.middleware.WhiteNoiseMiddleware",
+    "backend.staticfiles.StaticFilesMiddleware",  # WhiteNoise, async-capable
+    "backend.profiling.SQLProfilingMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
-    "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "accounts.principal.PrincipalAuthenticationMiddleware",  # AuthenticationMiddleware + cached role
     "allauth.account.middleware.AccountMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
@@ -170,6 +213,13 @@ if os.getenv("RENDER"):  # Render = PostgreSQL
             ssl_require=True,
         )
     }
+elif os.getenv("USE_SQLITE"):  # Tests / benchmarks without a MySQL server
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": BASE_DIR / "db.sqlite3",
+        }
+    }
 else:  # Local = MySQL
     import pymysql
     pymysql.install_as_MySQLdb()
@@ -188,6 +238,47 @@ else:  # Local = MySQL
         }
     }
 
+# --------------------------------------------------------
+# CACHE
+# --------------------------------------------------------
+# Used for dashboard fragments, unread counters and session principals.
+# CACHE_REDIS_URL → any Redis-protocol server (needs the `redis` package);
+# CACHE_DIR → files shared by every worker on this machine; otherwise
+# per-process memory.
+if os.getenv("CACHE_REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.getenv("CACHE_REDIS_URL"),
+        }
+    }
+elif os.getenv("CACHE_DIR"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": os.getenv("CACHE_DIR"),
+            "OPTIONS": {"MAX_ENTRIES": 10000},
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "pms",
+            "OPTIONS": {"MAX_ENTRIES": 10000},
+        }
+    }
+
+# A per-process cache only sees the writes made in its own process, so
+# what is invalidated on write (dashboard fragment tokens, unread
+# counters) is only kept LOCAL_CACHE_TTL seconds there: that bounds how
+# long another worker serves stale data. Raise it when running one process.
+SHARED_CACHE = bool(os.getenv("CACHE_REDIS_URL") or os.getenv("CACHE_DIR"))
+LOCAL_CACHE_TTL = int(os.getenv("LOCAL_CACHE_TTL", "30"))
+
+# Sessions are read through the cache, written through to the database.
+SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"
+
 # --------------------------------------------------------
 # PASSWORD VALIDATION
 # --------------------------------------------------------
@@ -217,10 +308,55 @@ STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Chunked image uploads (projects/uploads.py): part files live here until
+# the job worker has processed them; keep it outside MEDIA_ROOT.
+CHUNKED_UPLOAD_DIR = os.getenv("CHUNKED_UPLOAD_DIR", str(BASE_DIR / "tmp" / "uploads"))
+MAX_IMAGE_UPLOAD_SIZE = 25 * 1024 * 1024
+IMAGE_PROCESS_WORKERS = int(os.getenv("IMAGE_PROCESS_WORKERS", min(4, os.cpu_count() or 1)))
+
 # --------------------------------------------------------
 # EMAIL
 # --------------------------------------------------------
 EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
 
+# --------------------------------------------------------
+# QUERY BUDGETS (dashboard/decorators.py)
+# --------------------------------------------------------
+# Fail views that exceed their @query_budget; for development and tests
+# only, since it turns a slow page into an error page.
+QUERY_BUDGET_ENFORCE = os.getenv("QUERY_BUDGET_ENFORCE", "").lower() in ("1", "true", "yes")
+
+# --------------------------------------------------------
+# BACKGROUND JOBS (jobs/queue.py, worker: manage.py run_jobs)
+# --------------------------------------------------------
+# Run queued jobs inline after commit instead of waiting for a worker.
+# A worker process only reaches the web processes' sockets and caches
+# through a shared channel layer and cache, so without both this is on.
+SHARED_BACKENDS = bool(
+    (os.getenv("REDIS_URL") or os.getenv("CHANNEL_BROKER_SOCKET")) and SHARED_CACHE
+)
+JOBS_RUN_EAGERLY = os.getenv(
+    "JOBS_RUN_EAGERLY", "" if SHARED_BACKENDS else "1"
+).lower() in ("1", "true", "yes")
+# Eager jobs run on this many threads of the web process, off the request;
+# every JOBS_EAGER_POLL seconds one of them picks up due retries. 0 runs
+# them inline on commit, as the tests do (their database is not visible
+# to other threads).
+JOBS_EAGER_THREADS = int(os.getenv("JOBS_EAGER_THREADS", "0" if sys.argv[1:2] == ["test"] else "4"))
+JOBS_EAGER_POLL = float(os.getenv("JOBS_EAGER_POLL", "10"))
+
+# --------------------------------------------------------
+# SQL PROFILING (backend/profiling.py, report: manage.py sql_profile_report)
+# --------------------------------------------------------
+# Fraction of requests whose queries are timed and logged (0 turns it off).
+# Sampled unless set explicitly; DEBUG is hard-coded on, so it cannot pick the rate.
+SQL_PROFILE_SAMPLE_RATE = float(os.getenv("SQL_PROFILE_SAMPLE_RATE", "0.05"))
+# Each process writes its own SQL_PROFILE_LOG.<pid>
+SQL_PROFILE_LOG = os.getenv("SQL_PROFILE_LOG", str(BASE_DIR / "tmp" / "sql_profile.jsonl"))
+SQL_PROFILE_LOG_MAX_BYTES = 10 * 1024 * 1024
+SQL_PROFILE_LOG_BACKUPS = 5
+SQL_PROFILE_SLOW_MS = 100
+SQL_PROFILE_TOP = 5
+
 # --------------------------------------------------------
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
@@ -0,0 +1,53 @@
+# backend/signals.py
+"""
+QuerySet.update() (and bulk_update(), which is built on it) sends no
+pre_save / post_save, so anything kept in step from those signals — the
+dashboard snapshots, the fragment cache — would silently go stale.
+Querysets that derive from UpdateSignalQuerySet send `queryset_updating`
+before every update(), with the queryset about to run and `fields` set
+to the columns it writes, and `queryset_updated` after one that changed
+rows. A receiver of the first that needs the rows as they were reads
+them there and may return a callable; it is called once the UPDATE has
+changed rows, e.g. to recompute only what those rows touched.
+
+A caller that reports its write itself, in more detail (tasks.views
+bulk_update_tasks sends tasks_bulk_updated with the old rows), wraps it
+in reported_separately() so receivers do not pay for it twice.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import models
+from django.dispatch import Signal
+
+
+queryset_updating = Signal()
+queryset_updated = Signal()
+
+_reported = ContextVar("queryset_update_reported", default=False)
+
+
+@contextmanager
+def reported_separately():
+    token = _reported.set(True)
+    try:
+        yield
+    finally:
+        _reported.reset(token)
+
+
+class UpdateSignalQuerySet(models.QuerySet):
+
+    def update(self, **kwargs):
+        if _reported.get():
+            return super().update(**kwargs)
+
+        fields = frozenset(kwargs)
+        responses = queryset_updating.send(sender=self.model, queryset=self, fields=fields)
+        rows = super().update(**kwargs)
+        if rows:
+            for _, after in responses:
+                if callable(after):
+                    after()
+            queryset_updated.send(sender=self.model, fields=fields)
+        return rows
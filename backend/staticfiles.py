@@ -0,0 +1,38 @@
+# backend/staticfiles.py
+"""
+WhiteNoise for an ASGI stack.
+
+WhiteNoiseMiddleware is sync-only. Anywhere in MIDDLEWARE, it makes
+Django run everything below it (including async views) behind an
+async_to_sync / sync_to_async pair. This subclass takes the async path
+when the stack is async. Static lookups are an in-memory dict (a file
+scan only with autorefresh, i.e. under DEBUG), so they run inline.
+Everything else is awaited directly.
+"""
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+
+class StaticFilesMiddleware(WhiteNoiseMiddleware):
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, **kwargs):
+        super().__init__(get_response, **kwargs)
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return self.serve(static_file, request)
+        return await self.get_response(request)
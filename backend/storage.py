@@ -0,0 +1,159 @@
+# backend/storage.py
+"""
+Content-addressed, deduplicating file storage for uploads.
+
+Files are named after the SHA-256 of their content, computed while the
+upload is streamed to disk:
+
+    project_images/Screenshot_28.png  →  project_images/3f/3f9a…c2.png
+
+Saving bytes that are already stored returns the existing name instead
+of writing a second copy (no more Screenshot_28_XzVIKMW.png duplicates).
+
+Several rows may then point at the same blob, so delete() only removes
+it when no FileField using this storage references the name any more.
+The reference count is read from those (indexed) columns at delete time
+rather than kept in a counter, so bulk_create / queryset updates cannot
+skew it. Derived files stored next to a blob with save_derived() (image
+renditions: "<blob stem>.<label>.<ext>") are removed together with it.
+
+A name returned by save() is not referenced until the caller's row is
+committed, so the two sides are serialised by a file lock and save()
+bumps the mtime of a blob it hands out again; delete() runs after the
+surrounding transaction commits and leaves alone anything saved within
+SAVE_GRACE. collect_garbage() (manage.py purge_media) sweeps up what
+was skipped that way.
+"""
+import fcntl
+import hashlib
+import os
+import posixpath
+import re
+import tempfile
+import time
+from contextlib import contextmanager
+from functools import partial
+
+from django.apps import apps
+from django.core.files.storage import FileSystemStorage
+from django.db import models, transaction
+
+
+SAVE_GRACE = 60 * 60  # a blob (re)saved this recently may have a row on its way
+
+BLOB_NAME = re.compile(r"(^|/)[0-9a-f]{2}/[0-9a-f]{64}(\.[^./]*)?$")
+
+
+class ContentAddressedStorage(FileSystemStorage):
+
+    incoming_dir = ".incoming"  # temp files being hashed, inside the storage root
+
+    @contextmanager
+    def _locked(self):
+        """Exclusive across processes: blob hand-out in _save() vs. unlink in delete()."""
+        incoming = self.path(self.incoming_dir)
+        os.makedirs(incoming, exist_ok=True)
+        with open(os.path.join(incoming, ".lock"), "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _save(self, name, content):
+        directory, filename = posixpath.split(name)
+        ext = posixpath.splitext(filename)[1].lower()
+
+        incoming = self.path(self.incoming_dir)
+        os.makedirs(incoming, exist_ok=True)
+        if hasattr(content, "seek") and content.seekable():
+            content.seek(0)
+
+        digest = hashlib.sha256()
+        fd, temp_path = tempfile.mkstemp(dir=incoming)
+        try:
+            with os.fdopen(fd, "wb") as out:
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    out.write(chunk)
+
+            hexdigest = digest.hexdigest()
+            final_name = posixpath.join(directory, hexdigest[:2], hexdigest + ext)
+            final_path = self.path(final_name)
+            with self._locked():
+                if os.path.exists(final_path):
+                    os.utime(final_path)  # handed out again: keeps delete() off it
+                    return final_name  # already stored: this upload costs no disk
+
+                os.makedirs(os.path.dirname(final_path), exist_ok=True)
+                os.replace(temp_path, final_path)
+                if self.file_permissions_mode is not None:
+                    os.chmod(final_path, self.file_permissions_mode)
+                return final_name
+        finally:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+
+    def save_derived(self, name, content):
+        """Store a file derived from a blob under an exact name, replacing any old copy."""
+        if self.exists(name):
+            os.remove(self.path(name))
+        return super()._save(name, content)
+
+    # ----- reference counting -----
+    def _fields(self):
+        return [
+            (model, field.name)
+            for model in apps.get_models()
+            for field in model._meta.get_fields()
+            if isinstance(field, models.FileField) and field.storage is self
+        ]
+
+    def references(self, name):
+        return sum(
+            model._default_manager.filter(**{field: name}).count()
+            for model, field in self._fields()
+        )
+
+    def delete(self, name):
+        """Remove the blob (and its derived files) once committed rows no longer reference it."""
+        if name:
+            transaction.on_commit(partial(self._delete_unreferenced, name))
+
+    def _delete_unreferenced(self, name, grace=SAVE_GRACE):
+        with self._locked():
+            try:
+                saved_at = os.path.getmtime(self.path(name))
+            except FileNotFoundError:
+                return False
+            if saved_at > time.time() - grace or self.references(name):
+                return False
+            stem = posixpath.splitext(name)[0]
+            directory, prefix = posixpath.split(stem)
+            _, files = self.listdir(directory)
+            for filename in files:
+                if filename.startswith(prefix + ".") and filename != posixpath.basename(name):
+                    super().delete(posixpath.join(directory, filename))
+            super().delete(name)
+            return True
+
+    def collect_garbage(self, grace=SAVE_GRACE):
+        """Delete every unreferenced blob older than `grace` seconds; return their names."""
+        removed = []
+        for root, _, files in os.walk(self.location):
+            directory = os.path.relpath(root, self.location).replace(os.sep, "/")
+            if directory.split("/")[0] == self.incoming_dir:
+                continue
+            for filename in files:
+                name = posixpath.join(directory, filename)
+                if BLOB_NAME.search(name) and self._delete_unreferenced(name, grace):
+                    removed.append(name)
+        return removed
+
+
+_blob_storage = ContentAddressedStorage()
+
+
+def blob_storage():
+    """Storage for FileField(storage=...); a callable keeps migrations settings-free."""
+    return _blob_storage
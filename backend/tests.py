@@ -0,0 +1,413 @@
+import asyncio
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from unittest import mock
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from channels.exceptions import ChannelFull
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.core.files.base import ContentFile
+from django.http import HttpResponse
+from django.urls import reverse
+from django.test import (
+    AsyncRequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings,
+)
+
+from accounts.models import CustomUser
+from projects.models import Project, ProjectImage
+
+from . import profiling
+from .layers import POLICY_DROP, POLICY_DROP_OLDEST, POLICY_ERROR, LocalBrokerChannelLayer
+from .routing import websocket_urlpatterns
+from .staticfiles import StaticFilesMiddleware
+from .storage import blob_storage
+
+
+class LocalBrokerLayerTests(SimpleTestCase):
+    """
+    LocalBrokerChannelLayer against a real broker process (each test
+    autostarts its own on a fresh socket).
+    """
+
+    def setUp(self):
+        directory = tempfile.mkdtemp(prefix="pms-layer-")
+        self.addCleanup(shutil.rmtree, directory, True)
+        self.path = os.path.join(directory, "broker.sock")
+
+    def layer(self, **config):
+        layer = LocalBrokerChannelLayer(path=self.path, **config)
+        self.addCleanup(self.stop_broker, layer)
+        return layer
+
+    def stop_broker(self, layer):
+        if layer.broker_process is not None:
+            layer.broker_process.terminate()
+            layer.broker_process.wait()
+
+    async def queue_length(self, layer, channel):
+        return await layer._execute("LLEN", layer._channel_key(channel))
+
+    # ----- groups -----
+    async def test_group_members_expire(self):
+        layer = self.layer(group_expiry=60)
+        await layer.group_size("room")  # start the broker before faking the clock
+        with mock.patch("backend.layers.core.time") as clock:
+            clock.time.return_value = 1000
+            await layer.group_add("room", "dead.1")  # never discarded
+            clock.time.return_value = 1050
+            await layer.group_add("room", "live.1")
+
+            clock.time.return_value = 1070
+            await layer.group_send("room", {"type": "hello"})
+            self.assertEqual(await layer.group_size("room"), 1)
+
+        self.assertEqual(await layer.receive("live.1"), {"type": "hello"})
+        self.assertEqual(await self.queue_length(layer, "dead.1"), 0)
+        await layer.close()
+
+    async def test_group_discard(self):
+        layer = self.layer()
+        await layer.group_add("room", "a.1")
+        await layer.group_add("room", "b.1")
+        await layer.group_discard("room", "a.1")
+        await layer.group_send("room", {"type": "hello"})
+
+        self.assertEqual(await self.queue_length(layer, "a.1"), 0)
+        self.assertEqual(await self.queue_length(layer, "b.1"), 1)
+        await layer.close()
+
+    # ----- capacity -----
+    async def test_send_capacity(self):
+        layer = self.layer(capacity=2)
+        await layer.send("c.1", {"n": 1})
+        await layer.send("c.1", {"n": 2})
+        with self.assertRaises(ChannelFull):
+            await layer.send("c.1", {"n": 3})
+
+        self.assertEqual(await self.queue_length(layer, "c.1"), 2)
+        self.assertEqual(await layer.receive("c.1"), {"n": 1})
+        await layer.close()
+
+    async def test_concurrent_sends_respect_capacity(self):
+        layer = self.layer(capacity=5)
+        results = await asyncio.gather(
+            *(layer.send("c.1", {"n": n}) for n in range(20)), return_exceptions=True
+        )
+
+        self.assertEqual(sum(result is None for result in results), 5)
+        self.assertTrue(all(isinstance(r, ChannelFull) for r in results if r is not None))
+        self.assertEqual(await self.queue_length(layer, "c.1"), 5)
+        await layer.close()
+
+    async def full_group(self, policy):
+        layer = self.layer(capacity=10, group_capacity={"room": 1}, group_policy={"room": policy})
+        await layer.group_add("room", "full.1")
+        await layer.group_add("room", "free.1")
+        await layer.send("full.1", {"n": "old"})
+        return layer
+
+    async def test_drop_policy(self):
+        layer = await self.full_group(POLICY_DROP)
+        await layer.group_send("room", {"n": "new"})
+
+        self.assertEqual(await layer.receive("full.1"), {"n": "old"})
+        self.assertEqual(await self.queue_length(layer, "full.1"), 0)
+        self.assertEqual(await layer.receive("free.1"), {"n": "new"})
+        self.assertEqual(layer.dropped["room"], 1)
+        await layer.close()
+
+    async def test_drop_oldest_policy(self):
+        layer = await self.full_group(POLICY_DROP_OLDEST)
+        await layer.group_send("room", {"n": "new"})
+
+        self.assertEqual(await layer.receive("full.1"), {"n": "new"})
+        self.assertEqual(await self.queue_length(layer, "full.1"), 0)
+        self.assertEqual(await layer.receive("free.1"), {"n": "new"})
+        await layer.close()
+
+    async def test_error_policy(self):
+        layer = await self.full_group(POLICY_ERROR)
+        with self.assertRaises(ChannelFull):
+            await layer.group_send("room", {"n": "new"})
+
+        # the rest of the group still got it
+        self.assertEqual(await layer.receive("free.1"), {"n": "new"})
+        self.assertEqual(await self.queue_length(layer, "full.1"), 1)
+        await layer.close()
+
+    # ----- broker lifetime -----
+    async def test_broker_outlives_the_worker_that_started_it(self):
+        script = (
+            "import asyncio, sys\n"
+            "from backend.layers import LocalBrokerChannelLayer\n"
+            "layer = LocalBrokerChannelLayer(path=sys.argv[1])\n"
+            "asyncio.run(layer.send('c.1', {'from': 'worker'}))\n"
+            "print(layer.broker_process.pid)\n"
+        )
+        worker = subprocess.run(
+            [sys.executable, "-c", script, self.path],
+            cwd=Path(__file__).resolve().parent.parent,
+            # the broker inherits stderr, so capturing it would wait for the broker
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, timeout=30, check=True,
+        )
+        broker_pid = int(worker.stdout.strip())
+        self.addCleanup(os.kill, broker_pid, 15)
+
+        layer = self.layer(autostart=False)
+        self.assertEqual(await layer.receive("c.1"), {"from": "worker"})
+        await layer.close()
+
+    async def test_broker_restart(self):
+        layer = self.layer()
+        await layer.send("c.1", {"n": 1})
+        first = layer.broker_process
+        first.terminate()
+        first.wait()
+        await asyncio.sleep(0.1)  # let the pooled connection see the hang-up
+
+        await layer.send("c.1", {"n": 2})  # reconnects, starting a new broker
+        self.assertIsNot(layer.broker_process, first)
+        # the old broker's queue is gone with it
+        self.assertEqual(await layer.receive("c.1"), {"n": 2})
+        await layer.close()
+
+
+class RealtimeConsumerTests(TransactionTestCase):
+
+    async def test_malformed_subscriptions_keep_the_socket(self):
+        user = await sync_to_async(CustomUser.objects.create_user)(username="u", password="x")
+        socket = WebsocketCommunicator(URLRouter(websocket_urlpatterns), "/ws/")
+        socket.scope["user"] = user
+        connected, _ = await socket.connect()
+        self.assertTrue(connected)
+        await socket.receive_json_from()  # unread count
+
+        await socket.send_json_to([1])
+        self.assertEqual((await socket.receive_json_from())["type"], "error")
+
+        for action in ("subscribe", "unsubscribe"):
+            await socket.send_json_to({"action": action, "topics": [[1], {"a": 1}, None]})
+            for _ in range(3):
+                self.assertEqual((await socket.receive_json_from())["type"], "error")
+            self.assertEqual(
+                await socket.receive_json_from(), {"type": "subscribed", "topics": ["notifications"]}
+            )
+
+        await socket.send_json_to({"action": "subscribe", "topics": ["announcements"]})
+        self.assertEqual((await socket.receive_json_from())["topics"], ["announcements", "notifications"])
+        await socket.disconnect()
+
+
+class ContentAddressedStorageTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        owner = CustomUser.objects.create_user(username="owner", password="x")
+        cls.project = Project.objects.create(name="p", owner=owner)
+
+    def setUp(self):
+        media = tempfile.mkdtemp(prefix="pms-media-")
+        self.addCleanup(shutil.rmtree, media, True)
+        settings = override_settings(MEDIA_ROOT=media)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.storage = blob_storage()
+
+    def save(self, name, data=b"same bytes"):
+        return self.storage.save(name, ContentFile(data))
+
+    def age(self, name, seconds=2 * 60 * 60):
+        then = time.time() - seconds
+        os.utime(self.storage.path(name), (then, then))
+
+    def delete_row(self, row):
+        with self.captureOnCommitCallbacks(execute=True):
+            row.delete()
+
+    def test_identical_content_is_stored_once(self):
+        first = self.save("project_images/a.png")
+        second = self.save("project_images/b.PNG")
+        other = self.save("project_images/a.png", b"other bytes")
+
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other)
+        self.assertRegex(first, r"^project_images/[0-9a-f]{2}/[0-9a-f]{64}\.png$")
+        _, files = self.storage.listdir(os.path.dirname(first))
+        self.assertEqual(files, [os.path.basename(first)])
+
+    def test_blob_outlives_all_but_the_last_reference(self):
+        name = self.save("project_images/a.png")
+        derived = self.storage.save_derived(name.replace(".png", ".thumb.webp"), ContentFile(b"t"))
+        rows = [ProjectImage.objects.create(project=self.project, image=name) for _ in range(2)]
+        self.age(name)
+        self.assertEqual(self.storage.references(name), 2)
+
+        self.delete_row(rows[0])
+        self.assertTrue(self.storage.exists(name))
+
+        self.delete_row(rows[1])
+        self.assertFalse(self.storage.exists(name))
+        self.assertFalse(self.storage.exists(derived))
+
+    def test_delete_waits_for_the_commit(self):
+        name = self.save("project_images/a.png")
+        row = ProjectImage.objects.create(project=self.project, image=name)
+        self.age(name)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            row.delete()
+            self.assertTrue(self.storage.exists(name))
+        self.assertEqual(len(callbacks), 1)
+
+    def test_blob_handed_out_again_is_kept(self):
+        name = self.save("project_images/a.png")
+        row = ProjectImage.objects.create(project=self.project, image=name)
+        self.age(name)
+
+        # another upload of the same bytes, whose row is not inserted yet
+        self.assertEqual(self.save("project_images/again.png"), name)
+        self.delete_row(row)
+        self.assertTrue(self.storage.exists(name))
+
+        self.assertEqual(self.storage.collect_garbage(), [])
+        self.age(name)
+        self.assertEqual(self.storage.collect_garbage(), [name])
+        self.assertFalse(self.storage.exists(name))
+
+    def test_garbage_collection_keeps_referenced_blobs(self):
+        kept = self.save("project_images/a.png")
+        ProjectImage.objects.create(project=self.project, image=kept)
+        orphan = self.save("designs/b.pdf", b"orphan")
+        for name in (kept, orphan):
+            self.age(name)
+
+        self.assertEqual(self.storage.collect_garbage(), [orphan])
+        self.assertTrue(self.storage.exists(kept))
+
+
+@override_settings(DEBUG=True)  # DEBUG must not open the endpoint
+class MetricsViewTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(username="user", password="x")
+        cls.staff = CustomUser.objects.create_user(username="staff", password="x", is_staff=True)
+
+    def get(self, **headers):
+        return self.client.get(reverse("metrics"), headers=headers)
+
+    @override_settings(METRICS_TOKEN="")
+    def test_without_a_token_only_staff(self):
+        self.assertEqual(self.get().status_code, 403)
+        self.client.force_login(self.user)
+        self.assertEqual(self.get().status_code, 403)
+        self.client.force_login(self.staff)
+        self.assertEqual(self.get().status_code, 200)
+
+    @override_settings(METRICS_TOKEN="s3cret")
+    def test_token(self):
+        self.assertEqual(self.get().status_code, 403)
+        self.assertEqual(self.get(authorization="Bearer wrong").status_code, 403)
+        response = self.get(authorization="Bearer s3cret")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+
+
+class SQLProfilingTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(username="user", password="x")
+
+    def setUp(self):
+        directory = tempfile.mkdtemp(prefix="pms-profile-")
+        self.addCleanup(shutil.rmtree, directory, True)
+        self.log = os.path.join(directory, "sql_profile.jsonl")
+        settings = override_settings(SQL_PROFILE_LOG=self.log)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        profiling.close_log()
+        self.addCleanup(profiling.close_log)
+
+    def entries(self):
+        profiling.close_log()  # writes out the queue
+        path = Path(f"{self.log}.{os.getpid()}")
+        if not path.exists():
+            return []
+        return [json.loads(line) for line in path.read_text().splitlines()]
+
+    @override_settings(SQL_PROFILE_SAMPLE_RATE=0.5)
+    def test_sampling_rate(self):
+        self.client.force_login(self.user)
+        url = reverse("notifications:list")
+        with mock.patch("backend.profiling.random") as rng:
+            rng.random.side_effect = [0.4, 0.6]
+            sampled = self.client.get(url)
+            unsampled = self.client.get(url)
+
+        self.assertIn('queries"', sampled["Server-Timing"])
+        self.assertNotIn("Server-Timing", unsampled)
+        [entry] = self.entries()
+        self.assertEqual(entry["view"], "notifications:list")
+
+    @override_settings(SQL_PROFILE_SAMPLE_RATE=0)
+    def test_zero_rate_profiles_nothing(self):
+        self.client.force_login(self.user)
+        self.assertNotIn("Server-Timing", self.client.get(reverse("notifications:list")))
+        self.assertEqual(self.entries(), [])
+
+    @override_settings(SQL_PROFILE_SAMPLE_RATE=1)
+    async def test_async_request_writes_off_the_event_loop(self):
+        writers = []
+        real_emit = RotatingFileHandler.emit
+
+        def emit(handler, record):
+            writers.append(threading.current_thread())
+            real_emit(handler, record)
+
+        await self.async_client.aforce_login(self.user)
+        with mock.patch.object(RotatingFileHandler, "emit", emit):
+            response = await self.async_client.get(reverse("notifications:unread"))
+            listener_thread = profiling._listener._thread
+            entries = await sync_to_async(self.entries)()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertRegex(response["Server-Timing"], r'db;dur=[\d.]+;desc="[1-9]\d* queries"')
+        self.assertEqual(writers, [listener_thread])
+        self.assertEqual([entry["view"] for entry in entries], ["notifications:unread"])
+
+
+class StaticFilesMiddlewareTests(SimpleTestCase):
+
+    def middleware(self):
+        async def app(request):
+            return HttpResponse("from the app")
+
+        return StaticFilesMiddleware(app)
+
+    async def test_async_stack(self):
+        middleware = self.middleware()
+        self.assertTrue(iscoroutinefunction(middleware))
+        factory = AsyncRequestFactory()
+
+        response = await middleware(factory.get("/static/css/styles.css"))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("text/css", response["Content-Type"])
+
+        response = await middleware(factory.get("/projects/"))
+        self.assertEqual(response.content, b"from the app")
+
+    async def test_served_under_asgi(self):
+        response = await self.async_client.get("/static/css/styles.css")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("text/css", response["Content-Type"])
+        response.close()
@@ -5,6 +5,8 @@ from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib.auth import views as auth_views
 
+from backend.metrics import metrics_view
+
 
 urlpatterns = [
     path("login/", auth_views.LoginView.as_view(
@@ -30,6 +32,9 @@ urlpatterns = [
     path("", lambda request: redirect("/user/login/")),
     path("design/", include("design.urls")),
     path("notifications/", include("notifications.urls")),
+
+    # Prometheus scrape target (backend/metrics.py)
+    path("metrics", metrics_view, name="metrics"),
 ]
 
 # Media files (dev only)
@@ -0,0 +1,113 @@
+# communications/feed.py
+"""
+Incremental announcement feed.
+
+Clients keep the id of the newest announcement they have and ask for
+what came after it (`since_id`). The feed's ETag is built from the newest
+id, the number of announcements and the latest `updated_at`, so a poll
+that finds nothing new — no new, edited or deleted announcement — is
+answered with a bodyless 304.
+
+That state is memoised in process memory, so the no-change path does not
+query the database. Saving or deleting a Message (communications/signals.py)
+clears the memo of the process that did it; other worker processes pick
+the change up when theirs expires, at most LATEST_ID_TTL seconds later.
+Sockets subscribed to "announcements" get new messages pushed anyway.
+"""
+import threading
+import time
+from datetime import datetime
+from typing import NamedTuple
+
+from django.db.models import Count, Max
+
+from .models import Message
+
+
+LATEST_ID_TTL = 5
+MAX_LIMIT = 100
+
+
+class FeedState(NamedTuple):
+    latest: int | None  # newest id
+    count: int
+    changed: datetime | None  # newest updated_at
+
+
+_memo = {"state": None, "expires": 0.0}
+_memo_lock = threading.Lock()
+
+
+def _memoised():
+    with _memo_lock:
+        if _memo["expires"] > time.monotonic():
+            return _memo["state"]
+    return None
+
+
+def _memoise(row):
+    value = FeedState(row["latest"], row["count"], row["changed"])
+    with _memo_lock:
+        _memo["state"], _memo["expires"] = value, time.monotonic() + LATEST_ID_TTL
+    return value
+
+
+def _aggregate():
+    return {"latest": Max("id"), "count": Count("id"), "changed": Max("updated_at")}
+
+
+def state():
+    """FeedState of the announcements table (one aggregate query, memoised)."""
+    return _memoised() or _memoise(Message.objects.aggregate(**_aggregate()))
+
+
+async def astate():
+    return _memoised() or _memoise(await Message.objects.aaggregate(**_aggregate()))
+
+
+def latest_id():
+    """Id of the newest announcement, or None when there are none."""
+    return state().latest
+
+
+def forget_state():
+    with _memo_lock:
+        _memo["expires"] = 0.0
+
+
+def etag(feed_state):
+    latest, count, changed = feed_state
+    changed = f"{changed.timestamp():.6f}" if changed else "0"
+    return f"announcements-{latest or 0}-{count}-{changed}"
+
+
+def serialize(message):
+    return {
+        "id": message.id,
+        "sender": message.sender.username if message.sender else "HR",
+        "content": message.content,
+        "created_at": message.created_at.isoformat(),
+    }
+
+
+async def amessages(latest, since_id=None, limit=1):
+    """
+    Announcements in id order (oldest first), given the newest id `latest`.
+
+    Without `since_id` these are the newest `limit`; with it, the first
+    `limit` after `since_id`, so a client that is far behind catches up
+    page by page. A `since_id` at or past the newest id returns [] without
+    a query.
+    """
+    if latest is None or (since_id is not None and since_id >= latest):
+        return []
+
+    rows = Message.objects.select_related("sender").only(
+        "id", "content", "created_at", "sender__username"
+    )
+    if since_id is None:
+        found = [m async for m in rows.order_by("-id")[:limit]]
+        found.reverse()
+    else:
+        found = [m async for m in rows.filter(id__gt=since_id).order_by("id")[:limit]]
+    return [serialize(m) for m in found]
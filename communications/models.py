@@ -10,10 +10,16 @@ class Message(models.Model):
     sender = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["-created_at"], name="message_created_idx"),
+            # feed.state()'s MAX(updated_at)
+            models.Index(fields=["updated_at"], name="message_updated_idx"),
+        ]
 
     def __str__(self):
         sender = self.sender.username if self.sender else "HR"
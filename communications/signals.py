@@ -0,0 +1,14 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import feed
+from .models import Message
+
+
+@receiver(post_save, sender=Message)
+@receiver(post_delete, sender=Message)
+def message_changed(sender, **kwargs):
+    # Now, and again after commit in case a poll re-read the old id meanwhile
+    feed.forget_state()
+    transaction.on_commit(feed.forget_state)
@@ -1,3 +1,57 @@
 from django.test import TestCase
+from django.urls import reverse
 
-# Create your tests here.
+from accounts.models import CustomUser
+
+from . import feed
+from .models import Message
+
+
+class AnnouncementFeedTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.hr = CustomUser.objects.create_user(username="hr", password="x", role=CustomUser.ROLE_HR)
+        cls.url = reverse("communications:get_announcements")
+
+    def setUp(self):
+        feed.forget_state()
+        self.addCleanup(feed.forget_state)
+
+    async def get(self, **params):
+        await self.async_client.aforce_login(self.hr)
+        headers = {"if_none_match": params.pop("etag")} if "etag" in params else {}
+        return await self.async_client.get(self.url, params, headers=headers)
+
+    async def test_async_feed(self):
+        first = await Message.objects.acreate(sender=self.hr, content="one")
+        second = await Message.objects.acreate(sender=self.hr, content="two")
+
+        response = await self.get(limit=5)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([m["id"] for m in response.json()["messages"]], [first.id, second.id])
+
+        response = await self.get(since_id=first.id)
+        self.assertEqual([m["content"] for m in response.json()["messages"]], ["two"])
+
+        self.assertEqual((await self.get(etag=response["ETag"])).status_code, 304)
+        self.assertEqual((await self.get(since_id="x")).status_code, 400)
+
+    async def test_edits_and_deletes_change_the_etag(self):
+        first = await Message.objects.acreate(sender=self.hr, content="one")
+        await Message.objects.acreate(sender=self.hr, content="two")
+        etag = (await self.get())["ETag"]
+        self.assertEqual((await self.get(etag=etag)).status_code, 304)
+
+        first.content = "one, corrected"
+        await first.asave()
+        response = await self.get(limit=2)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["messages"][0]["content"], "one, corrected")
+        self.assertNotEqual(response["ETag"], etag)
+
+        etag = response["ETag"]
+        await first.adelete()  # not the newest: the id alone would not move
+        response = await self.get(etag=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["messages"]), 1)
@@ -1,16 +1,14 @@
-from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
 from django.http import JsonResponse, HttpResponseForbidden
 from django.views.decorators.http import require_POST
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
 from django.utils import timezone
-from asgiref.sync import async_to_sync
-from channels.layers import get_channel_layer
 
-from .models import Message
+from . import feed
 from .forms import MessageForm
-from projects.models import Project
-from tasks.models import Task
-from accounts.models import CustomUser
+from dashboard import views as dashboard_views
+from backend.realtime import ANNOUNCEMENTS_GROUP, publish
 
 
 # ==========================
@@ -18,25 +16,8 @@ from accounts.models import CustomUser
 # ==========================
 @login_required
 def hr_dashboard(request):
-    """
-    HR can see everything in read-only mode:
-    ✔ All projects
-    ✔ All tasks
-    ✔ All managers & team members
-    ✔ HR message composer
-    ✔ Recent messages
-    """
-    messages_list = Message.objects.all().order_by("-created_at")[:50]
-    form = MessageForm()
-
-    context = {
-        "form": form,
-        "messages": messages_list,
-        "projects": Project.objects.all(),
-        "tasks": Task.objects.all(),
-        "team": CustomUser.objects.all(),
-    }
-    return render(request, "dashboard/hr_dashboard.html", context)
+    """Old address of the HR dashboard; same page as dashboard:hr_dashboard."""
+    return dashboard_views.hr_dashboard(request)
 
 
 # ==========================
@@ -58,17 +39,13 @@ def post_announcement(request):
         msg.save()
 
         # Send message via WebSocket broadcast
-        channel_layer = get_channel_layer()
-
-        async_to_sync(channel_layer.group_send)(
-            "announcements",
-            {
-                "type": "announce.message",
-                "id": msg.id,
-                "sender": msg.sender.username,
-                "content": msg.content,
-                "created_at": msg.created_at.isoformat(),
-            }
+        publish(
+            ANNOUNCEMENTS_GROUP,
+            "announce.message",
+            id=msg.id,
+            sender=msg.sender.username,
+            content=msg.content,
+            created_at=msg.created_at.isoformat(),
         )
 
         return JsonResponse({"success": True})
@@ -80,18 +57,30 @@ def post_announcement(request):
 # FETCH ANNOUNCEMENTS (AJAX)
 # ==========================
 @login_required
-def get_announcements(request):
-
-    msgs = Message.objects.all().order_by("-id")[:1]
-
-    data = [
-        {
-            "id": m.id,
-            "sender": m.sender.username if m.sender else "HR",
-            "content": m.content,
-            "created_at": m.created_at.isoformat(),
-        }
-        for m in msgs
-    ]
-
-    return JsonResponse({"messages": data})
+async def get_announcements(request):
+    """
+    Announcement feed. `since_id` returns only messages newer than that
+    id (up to `limit`, oldest first); without it, the newest `limit`
+    (default 1). The ETag covers new, edited and deleted announcements
+    (feed.etag), so If-None-Match polls that find no change get a 304
+    without a database query.
+    """
+    state = await feed.astate()
+    etag = quote_etag(feed.etag(state))
+    response = get_conditional_response(request, etag=etag)
+    if response is not None:
+        return response
+
+    since_id = request.GET.get("since_id")
+    limit = request.GET.get("limit")
+    if (since_id and not since_id.isdigit()) or (limit and not limit.isdigit()):
+        return JsonResponse({"error": "since_id and limit must be integers"}, status=400)
+
+    data = await feed.amessages(
+        state.latest,
+        since_id=int(since_id) if since_id else None,
+        limit=max(1, min(int(limit or 1), feed.MAX_LIMIT)),
+    )
+    response = JsonResponse({"messages": data, "latest_id": state.latest})
+    response["ETag"] = etag
+    return response
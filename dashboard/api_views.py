@@ -0,0 +1,43 @@
+from functools import wraps
+
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+
+from projects.pagination import InvalidCursor
+from . import hr
+
+
+def hr_only(view):
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if request.user.role != "HR":
+            return JsonResponse({"error": "Unauthorized access"}, status=403)
+        return view(request, *args, **kwargs)
+    return wrapper
+
+
+def _section_view(section):
+    @login_required
+    @hr_only
+    def view(request):
+        try:
+            return JsonResponse(hr.page(section, request.GET))
+        except InvalidCursor as e:
+            return JsonResponse({"error": str(e)}, status=400)
+
+    view.__name__ = f"hr_{section}_api"
+    view.__doc__ = f"One cursor page of the HR dashboard's {section} section (`cursor`, `limit`)."
+    return view
+
+
+@login_required
+@hr_only
+def hr_counts_api(request):
+    """HR stat cards: total / active projects, tasks, non-HR members."""
+    return JsonResponse(hr.counts())
+
+
+hr_projects_api = _section_view("projects")
+hr_tasks_api = _section_view("tasks")
+hr_people_api = _section_view("people")
+hr_messages_api = _section_view("messages")
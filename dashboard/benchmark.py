@@ -0,0 +1,284 @@
+# dashboard/benchmark.py
+"""
+Query-count / latency / memory benchmark for every page and endpoint in
+the dashboard, projects, tasks, notifications and design URLconfs.
+
+    USE_SQLITE=1 python manage.py benchmark_views            # compare
+    USE_SQLITE=1 python manage.py benchmark_views --update-baseline
+
+The harness seeds a synthetic dataset into a throwaway test database,
+requests each URL (GET) as every role, and records:
+  - queries  → number of SQL statements (savepoints excluded)
+  - time_ms  → best-of-N wall time
+  - peak_kb  → tracemalloc peak while handling the request
+
+Query counts are deterministic for a given dataset size and are compared
+exactly; time and memory are compared with a tolerance because they
+depend on the machine.
+"""
+import importlib
+import json
+import random
+import time
+import tracemalloc
+from datetime import date, timedelta
+from pathlib import Path
+
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern
+
+from accounts.models import CustomUser
+from communications import feed
+from communications.models import Message
+from notifications.models import Notification
+from projects.models import Project
+from tasks.models import Task
+
+
+BASELINE_PATH = Path(__file__).resolve().parent / "benchmark_baseline.json"
+
+DEFAULT_DATASET = {
+    "users": 40,
+    "projects": 120,
+    "tasks": 600,
+    "notifications": 400,
+    "messages": 30,
+}
+
+ROLES = [
+    CustomUser.ROLE_MANAGER,
+    CustomUser.ROLE_MEMBER,
+    CustomUser.ROLE_DESIGN,
+    CustomUser.ROLE_HR,
+]
+
+# URLconf module → mount prefix (see backend/urls.py)
+URLCONFS = {
+    "dashboard.urls": "/dashboard/",
+    "projects.urls": "/projects/",
+    "tasks.urls": "/tasks/",
+    "notifications.urls": "/notifications/",
+    "design.urls": "/design/",
+}
+
+
+# -----------------------------------------------------
+# Dataset
+# -----------------------------------------------------
+def seed(users, projects, tasks, notifications, messages, rng_seed=0):
+    """Bulk-insert a synthetic dataset and return the ids the URLs need."""
+    rng = random.Random(rng_seed)
+    password = make_password("benchmark")
+    # The bulk inserts below skip the signals that expire cached counters,
+    # dashboard fragments and the announcement feed's latest id, so start
+    # from an empty cache.
+    cache.clear()
+    feed.forget_state()
+
+    CustomUser.objects.bulk_create([
+        CustomUser(
+            username=f"bench_{i}",
+            email=f"bench_{i}@example.com",
+            password=password,
+            role=ROLES[i % len(ROLES)],
+            is_role_selected=True,
+        )
+        for i in range(users)
+    ])
+    people = list(CustomUser.objects.filter(username__startswith="bench_").order_by("id"))
+    by_role = {role: [u for u in people if u.role == role] for role in ROLES}
+    managers = by_role[CustomUser.ROLE_MANAGER]
+    members = by_role[CustomUser.ROLE_MEMBER]
+
+    statuses = [value for value, _ in Project.STATUS_CHOICES]
+    priorities = [value for value, _ in Project.PRIORITY_CHOICES]
+    today = date.today()
+
+    Project.objects.bulk_create([
+        Project(
+            name=f"Project {i}",
+            description="Synthetic benchmark project " * 4,
+            owner=rng.choice(managers),
+            status=rng.choice(statuses),
+            priority=rng.choice(priorities),
+            completion=rng.randint(0, 100),
+            assigned_date=today - timedelta(days=rng.randint(0, 90)),
+            delivery_date=today + timedelta(days=rng.randint(-10, 60)),
+        )
+        for i in range(projects)
+    ])
+    project_list = list(Project.objects.order_by("id"))
+
+    Through = Project.assigned_to.through
+    Through.objects.bulk_create([
+        Through(project_id=project.id, customuser_id=member.id)
+        for project in project_list
+        for member in rng.sample(members, k=min(len(members), rng.randint(0, 3)))
+    ])
+
+    task_statuses = [value for value, _ in Task.STATUS_CHOICES]
+    Task.objects.bulk_create([
+        Task(
+            title=f"Task {i}",
+            description="Synthetic benchmark task",
+            project=rng.choice(project_list),
+            assigned_to=rng.choice(members),
+            due_date=today + timedelta(days=rng.randint(-10, 30)),
+            status=rng.choice(task_statuses),
+            completion=rng.randint(0, 100),
+        )
+        for i in range(tasks)
+    ])
+
+    Notification.objects.bulk_create([
+        Notification(
+            user=rng.choice(people),
+            message=f"Synthetic notification {i}",
+            project=rng.choice(project_list),
+            is_read=rng.random() < 0.5,
+        )
+        for i in range(notifications)
+    ])
+
+    hr = by_role[CustomUser.ROLE_HR]
+    Message.objects.bulk_create([
+        Message(sender=rng.choice(hr), content=f"Synthetic announcement {i}")
+        for i in range(messages)
+    ])
+
+    return {role: by_role[role][0] for role in ROLES if by_role[role]}
+
+
+def url_kwargs(module):
+    """Route kwarg → value, per URLconf (pk means a project in projects.urls, a task in tasks.urls)."""
+    project = Project.objects.order_by("id").first()
+    task = Task.objects.order_by("id").first()
+    member = CustomUser.objects.filter(role=CustomUser.ROLE_MEMBER).order_by("id").first()
+    note = Notification.objects.order_by("id").first()
+    image = project.images.first() if project else None
+
+    values = {
+        "project_id": project and project.id,
+        "user_id": member and member.id,
+        "note_id": note and note.id,
+        "image_id": image and image.id,
+        "pk": task and task.id if module == "tasks.urls" else project and project.id,
+    }
+    return {key: value for key, value in values.items() if value is not None}
+
+
+def iter_urls():
+    """Yield (label, path) for every concrete GET-able route."""
+    seen = set()
+    for module, prefix in URLCONFS.items():
+        kwargs = url_kwargs(module)
+        for pattern in importlib.import_module(module).urlpatterns:
+            if not isinstance(pattern, URLPattern):
+                continue
+            route = str(pattern.pattern)
+            params = pattern.pattern.converters.keys()
+            if any(param not in kwargs for param in params):
+                continue  # nothing to point it at in this dataset
+
+            path = prefix + route
+            for param in params:
+                path = path.replace(f"<int:{param}>", str(kwargs[param]))
+            if path in seen:
+                continue
+            seen.add(path)
+            yield f"{module}:{pattern.name}", path
+
+
+# -----------------------------------------------------
+# Measuring
+# -----------------------------------------------------
+def measure(client, path, repeat=3):
+    client.get(path)  # warm-up: lazy caches / snapshots are built here
+
+    best, queries, status = None, 0, None
+    for _ in range(repeat):
+        with CaptureQueriesContext(connection) as ctx:
+            start = time.perf_counter()
+            response = client.get(path)
+            elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+        status = response.status_code
+        queries = sum(
+            1 for q in ctx.captured_queries
+            if not q["sql"].startswith(("SAVEPOINT", "RELEASE SAVEPOINT"))
+        )
+
+    tracemalloc.start()
+    try:
+        client.get(path)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "status": status,
+        "queries": queries,
+        "time_ms": round(best * 1000, 2),
+        "peak_kb": round(peak / 1024, 1),
+    }
+
+
+def run(dataset=None, repeat=3):
+    """Seed the current database and benchmark every URL as every role."""
+    dataset = {**DEFAULT_DATASET, **(dataset or {})}
+    users = seed(**dataset)
+
+    results = {}
+    for role, user in users.items():
+        client = Client(raise_request_exception=False)
+        client.force_login(user)
+        for label, path in iter_urls():
+            results[f"{label} [{role}]"] = {"path": path, **measure(client, path, repeat)}
+    return {"dataset": dataset, "results": results}
+
+
+# -----------------------------------------------------
+# Baselines
+# -----------------------------------------------------
+def load_baseline(path=BASELINE_PATH):
+    path = Path(path)
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())
+
+
+def save_baseline(report, path=BASELINE_PATH):
+    Path(path).write_text(json.dumps(report, indent=2, sort_keys=True) + "\n")
+
+
+def compare(report, baseline, time_tolerance=1.0, memory_tolerance=0.5, check_timing=True):
+    """
+    Return a list of human-readable regressions.
+    time_tolerance=1.0 means "flag when more than 2× the baseline time".
+    """
+    regressions = []
+    if baseline is None:
+        return regressions
+
+    old_results = baseline.get("results", {})
+    for key, new in report["results"].items():
+        old = old_results.get(key)
+        if old is None:
+            continue
+
+        if new["status"] >= 500 > old["status"]:
+            regressions.append(f"{key}: status {old['status']} → {new['status']}")
+        if new["queries"] > old["queries"]:
+            regressions.append(f"{key}: queries {old['queries']} → {new['queries']}")
+        if not check_timing:
+            continue
+        if new["time_ms"] > old["time_ms"] * (1 + time_tolerance) and new["time_ms"] - old["time_ms"] > 5:
+            regressions.append(f"{key}: time {old['time_ms']}ms → {new['time_ms']}ms")
+        if new["peak_kb"] > old["peak_kb"] * (1 + memory_tolerance) and new["peak_kb"] - old["peak_kb"] > 256:
+            regressions.append(f"{key}: peak memory {old['peak_kb']}KB → {new['peak_kb']}KB")
+
+    return regressions
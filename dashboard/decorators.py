@@ -0,0 +1,42 @@
+# dashboard/decorators.py
+from functools import wraps
+
+from django.conf import settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def query_budget(max_queries):
+    """
+    Development / test guard: fail the view if it (including template
+    rendering) runs more than `max_queries` SQL statements (savepoints
+    aside). Catches N+1 loops in templates as soon as someone reintroduces
+    them. Only active with settings.QUERY_BUDGET_ENFORCE, never by default.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if not getattr(settings, "QUERY_BUDGET_ENFORCE", False):
+                return view_func(request, *args, **kwargs)
+
+            with CaptureQueriesContext(connection) as ctx:
+                response = view_func(request, *args, **kwargs)
+                if hasattr(response, "render") and not getattr(response, "is_rendered", True):
+                    response.render()
+
+            statements = [
+                q["sql"] for q in ctx.captured_queries
+                if not q["sql"].startswith(("SAVEPOINT", "RELEASE SAVEPOINT"))
+            ]
+            if len(statements) > max_queries:
+                raise QueryBudgetExceeded(
+                    f"{view_func.__name__} ran {len(statements)} queries "
+                    f"(budget {max_queries}):\n" + "\n".join(statements)
+                )
+            return response
+        return wrapper
+    return decorator
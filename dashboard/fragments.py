@@ -0,0 +1,60 @@
+# dashboard/fragments.py
+"""
+Generation tokens for the {% cache %} fragments in the dashboard templates.
+
+Every cached fragment lists the tokens of the data it shows among its
+vary-on arguments, e.g.
+
+    {% cache 3600 manager_projects user_role frag.projects frag.team %}
+
+A write to that data (dashboard/signals.py) drops the token, so the next
+render gets a fresh one and therefore a new cache key. Stale fragments
+are never looked up again and expire on their own, so there is no need
+to know which users / roles had a copy.
+
+Tokens only reach other processes through a shared cache. With a
+per-process one (settings.SHARED_CACHE off) they live LOCAL_CACHE_TTL
+seconds, so a worker that did not see the write renders afresh soon.
+
+    projects      → Project rows and their assignees
+    tasks         → Task rows (chart data, progress)
+    announcements → communications.Message
+    team          → user names and roles shown in pickers / lists
+"""
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+PROJECTS = "projects"
+TASKS = "tasks"
+ANNOUNCEMENTS = "announcements"
+TEAM = "team"
+ALL = (PROJECTS, TASKS, ANNOUNCEMENTS, TEAM)
+
+TOKEN_TTL = 60 * 60 * 24
+
+
+def _key(name):
+    return f"fragment_gen:{name}"
+
+
+def _token_ttl():
+    return TOKEN_TTL if settings.SHARED_CACHE else settings.LOCAL_CACHE_TTL
+
+
+def generations():
+    """{name: token} for every fragment group, in one cache round trip."""
+    keys = {_key(name): name for name in ALL}
+    found = cache.get_many(keys)
+    missing = {key: uuid.uuid4().hex for key in keys if key not in found}
+    if missing:
+        cache.set_many(missing, _token_ttl())
+        found.update(missing)
+    return {name: found[key] for key, name in keys.items()}
+
+
+def bump(*names):
+    """Invalidate every fragment that depends on one of `names`."""
+    cache.delete_many([_key(name) for name in names])
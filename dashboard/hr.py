@@ -0,0 +1,146 @@
+# dashboard/hr.py
+"""
+Data for the HR dashboard sections.
+
+The HR page itself renders no company data. Each section (projects,
+tasks, people, messages) is fetched from its own JSON endpoint
+(dashboard/api_views.py) one page at a time, and the stat cards come
+from `counts()`. First paint therefore costs the same for a team of
+five as for a company of five thousand.
+
+Pages are keyset-paginated on the primary key, newest first: the cursor
+is the id of the last row sent, so every page is an index range scan
+(`WHERE id < cursor ORDER BY id DESC LIMIT n`), never an OFFSET.
+"""
+from django.db.models import Count, Value
+
+from accounts.models import CustomUser
+from communications.models import Message
+from projects.models import Project
+from projects.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, InvalidCursor
+from tasks.models import Task
+
+
+# -----------------------------------------------------
+# Stat cards
+# -----------------------------------------------------
+def _count(queryset, key):
+    return (
+        queryset.order_by()
+        .values(key=Value(key))
+        .annotate(n=Count("pk"))
+        .values_list("key", "n")
+    )
+
+
+def counts():
+    """The four HR stat cards in one round trip (a UNION ALL of COUNTs)."""
+    rows = _count(Project.objects.all(), "total_projects").union(
+        _count(Project.objects.exclude(status=Project.STATUS_COMPLETED), "active_projects"),
+        _count(Task.objects.all(), "total_tasks"),
+        _count(CustomUser.objects.exclude(role=CustomUser.ROLE_HR), "total_members"),
+        all=True,
+    )
+    return dict(rows)
+
+
+# -----------------------------------------------------
+# Sections
+# -----------------------------------------------------
+def _date(value):
+    return value.strftime("%Y-%m-%d") if value else None
+
+
+def _projects():
+    return Project.objects.for_listing("summary")
+
+
+def _project(p):
+    return {
+        "id": p.id,
+        "name": p.name,
+        "status": p.status,
+        "manager": p.owner.username if p.owner else None,
+    }
+
+
+def _tasks():
+    return Task.objects.select_related("project", "assigned_to").only(
+        "id", "title", "status", "completion", "due_date",
+        "project__name", "assigned_to__username",
+    )
+
+
+def _task(t):
+    return {
+        "id": t.id,
+        "title": t.title,
+        "status": t.status,
+        "completion": t.completion,
+        "due_date": _date(t.due_date),
+        "project": t.project.name,
+        "assigned_to": t.assigned_to.username,
+    }
+
+
+def _people():
+    return CustomUser.objects.only("id", "username", "role", "department")
+
+
+def _person(u):
+    return {"id": u.id, "username": u.username, "role": u.role, "department": u.department}
+
+
+def _messages():
+    return Message.objects.select_related("sender").only(
+        "id", "content", "created_at", "sender__username"
+    )
+
+
+def _message(m):
+    return {
+        "id": m.id,
+        "sender": m.sender.username if m.sender else "HR",
+        "content": m.content,
+        "created_at": m.created_at.isoformat(),
+    }
+
+
+# section name → (queryset factory, row serializer)
+SECTIONS = {
+    "projects": (_projects, _project),
+    "tasks": (_tasks, _task),
+    "people": (_people, _person),
+    "messages": (_messages, _message),
+}
+
+
+def page(section, params):
+    """
+    One page of a section as {"results": [...], "next_cursor": id or None}.
+    Accepts `cursor` (id of the last row already shown) and `limit`.
+    Raises InvalidCursor for a cursor that is not an id.
+    """
+    queryset, serialize = SECTIONS[section]
+
+    try:
+        limit = int(params.get("limit") or DEFAULT_PAGE_SIZE)
+    except ValueError:
+        limit = DEFAULT_PAGE_SIZE
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+    rows = queryset().order_by("-id")
+    cursor = params.get("cursor")
+    if cursor:
+        if not cursor.isdigit():
+            raise InvalidCursor("Malformed cursor")
+        rows = rows.filter(id__lt=int(cursor))
+
+    rows = list(rows[: limit + 1])
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    return {
+        "results": [serialize(row) for row in rows],
+        "next_cursor": rows[-1].id if has_more else None,
+    }
@@ -0,0 +1,66 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import get_runner, setup_test_environment, teardown_test_environment
+from django.conf import settings
+
+from dashboard import benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a synthetic dataset into a throwaway test database and record "
+        "query count, wall time and peak memory for every view. "
+        "Run with USE_SQLITE=1 to benchmark on SQLite."
+    )
+
+    def add_arguments(self, parser):
+        for name, default in benchmark.DEFAULT_DATASET.items():
+            parser.add_argument(f"--{name}", type=int, default=default)
+        parser.add_argument("--repeat", type=int, default=3)
+        parser.add_argument("--baseline", default=str(benchmark.BASELINE_PATH))
+        parser.add_argument(
+            "--update-baseline", action="store_true",
+            help="Write this run's numbers as the new baseline.",
+        )
+        parser.add_argument(
+            "--no-timing", action="store_true",
+            help="Only compare query counts and status codes.",
+        )
+
+    def handle(self, *args, **options):
+        dataset = {name: options[name] for name in benchmark.DEFAULT_DATASET}
+
+        setup_test_environment()
+        runner = get_runner(settings)(verbosity=0, interactive=False)
+        old_config = runner.setup_databases()
+        try:
+            report = benchmark.run(dataset, repeat=options["repeat"])
+        finally:
+            runner.teardown_databases(old_config)
+            teardown_test_environment()
+
+        width = max(len(key) for key in report["results"])
+        self.stdout.write(f"{'view':<{width}}  status  queries   time_ms   peak_kb")
+        for key, row in sorted(report["results"].items()):
+            self.stdout.write(
+                f"{key:<{width}}  {row['status']:>6}  {row['queries']:>7}  "
+                f"{row['time_ms']:>8}  {row['peak_kb']:>8}"
+            )
+
+        if options["update_baseline"]:
+            benchmark.save_baseline(report, options["baseline"])
+            self.stdout.write(self.style.SUCCESS(f"Baseline written to {options['baseline']}"))
+            return
+
+        baseline = benchmark.load_baseline(options["baseline"])
+        if baseline is None:
+            self.stdout.write(self.style.WARNING("No baseline found; run with --update-baseline."))
+            return
+        if baseline.get("dataset") != report["dataset"]:
+            raise CommandError("Dataset size differs from the baseline; numbers are not comparable.")
+
+        regressions = benchmark.compare(report, baseline, check_timing=not options["no_timing"])
+        if regressions:
+            for line in regressions:
+                self.stdout.write(self.style.ERROR(line))
+            raise CommandError(f"{len(regressions)} regression(s) against the baseline.")
+        self.stdout.write(self.style.SUCCESS("No regressions against the baseline."))
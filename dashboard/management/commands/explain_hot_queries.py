@@ -0,0 +1,118 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+
+from accounts.models import CustomUser
+from dashboard import benchmark
+
+
+# Plan lines that mean "read the whole table", per backend
+FULL_SCAN_MARKERS = {
+    "sqlite": lambda line: line.startswith("SCAN ") and " USING " not in line,
+    "postgresql": lambda line: "Seq Scan" in line,
+    "mysql": lambda line: line.split("\t")[4:5] == ["ALL"],  # the "type" column
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Request every dashboard/project/task/notification/design view as the "
+        "first user of each role and print the EXPLAIN plan of each SELECT it "
+        "runs against the configured database. Writes made by the views are "
+        "rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "views", nargs="*",
+            help="Only views whose label or path contains one of these strings.",
+        )
+        parser.add_argument("--user", help="Username to use instead of one user per role.")
+        parser.add_argument(
+            "--analyze", action="store_true",
+            help="EXPLAIN ANALYZE on PostgreSQL (executes the query).",
+        )
+        parser.add_argument(
+            "--full-scans", action="store_true",
+            help="Only print queries whose plan reads a whole table.",
+        )
+
+    def handle(self, *args, **options):
+        vendor = connection.vendor
+        if vendor not in FULL_SCAN_MARKERS:
+            raise CommandError(f"EXPLAIN is not supported for the {vendor} backend.")
+
+        if options["user"]:
+            users = CustomUser.objects.filter(username=options["user"])
+            if not users:
+                raise CommandError(f"No user named {options['user']!r}.")
+        else:
+            users = [
+                user for role in benchmark.ROLES
+                if (user := CustomUser.objects.filter(role=role).order_by("id").first())
+            ]
+        if not users:
+            raise CommandError("No users in the database; seed some data first.")
+
+        # Lets the test client reach the views (ALLOWED_HOSTS); already done under the test runner
+        try:
+            setup_test_environment()
+            owns_environment = True
+        except RuntimeError:
+            owns_environment = False
+        try:
+            seen = set()
+            for user in users:
+                client = Client(raise_request_exception=False)
+                client.force_login(user)
+                for label, path in benchmark.iter_urls():
+                    if options["views"] and not any(v in label or v in path for v in options["views"]):
+                        continue
+                    for sql in self.capture(client, path):
+                        if sql in seen:
+                            continue
+                        seen.add(sql)
+                        self.explain(f"{label} [{user.role}]", sql, vendor, options)
+        finally:
+            if owns_environment:
+                teardown_test_environment()
+
+        self.stdout.write(f"\n{len(seen)} distinct SELECT statement(s) explained.")
+
+    def capture(self, client, path):
+        """SELECTs run while serving `path`, with anything the view wrote rolled back."""
+        with transaction.atomic():
+            with CaptureQueriesContext(connection) as ctx:
+                client.get(path)
+            transaction.set_rollback(True)
+        return [q["sql"] for q in ctx.captured_queries if q["sql"].lstrip().upper().startswith("SELECT")]
+
+    def explain(self, label, sql, vendor, options):
+        if vendor == "sqlite":
+            prefix = "EXPLAIN QUERY PLAN"
+        elif vendor == "postgresql" and options["analyze"]:
+            prefix = "EXPLAIN ANALYZE"
+        else:
+            prefix = "EXPLAIN"
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"{prefix} {sql}")
+            rows = cursor.fetchall()
+
+        if vendor == "sqlite":
+            lines = [row[-1] for row in rows]
+        elif vendor == "postgresql":
+            lines = [row[0] for row in rows]
+        else:
+            lines = ["\t".join("" if col is None else str(col) for col in row) for row in rows]
+
+        full_scan = any(FULL_SCAN_MARKERS[vendor](line.strip()) for line in lines)
+        if options["full_scans"] and not full_scan:
+            return
+
+        heading = f"{label}  FULL SCAN" if full_scan else label
+        self.stdout.write(self.style.WARNING(heading) if full_scan else self.style.MIGRATE_HEADING(heading))
+        self.stdout.write(f"  {sql}")
+        for line in lines:
+            self.stdout.write(f"    {line}")
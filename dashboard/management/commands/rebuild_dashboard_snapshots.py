@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from dashboard.models import DashboardSnapshot
+from dashboard.snapshots import rebuild_all, rebuild_snapshot
+
+
+class Command(BaseCommand):
+    help = "Recompute dashboard snapshots from the Project and Task tables."
+
+    def handle(self, *args, **options):
+        rebuild_all()
+        rebuild_snapshot(DashboardSnapshot.SCOPE_GLOBAL)
+        self.stdout.write(self.style.SUCCESS(
+            "Dashboard snapshots reset; member/owner scopes rebuild on next view."
+        ))
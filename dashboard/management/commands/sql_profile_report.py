@@ -0,0 +1,67 @@
+import json
+from collections import defaultdict
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "Summarise the SQL profiling log (backend/profiling.py) per view: "
+        "sampled requests, queries and DB time, ordered by total DB time."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--log", default=settings.SQL_PROFILE_LOG,
+            help="Log path as configured; every process's file is read (default: %(default)s).",
+        )
+        parser.add_argument("--limit", type=int, default=20, help="Number of views to show.")
+        parser.add_argument(
+            "--duplicates", action="store_true",
+            help="Also list the most repeated statement of each view.",
+        )
+
+    def handle(self, *args, **options):
+        path = Path(options["log"])
+        # One log per process (<log>.<pid>) plus its rotations (<log>.<pid>.N)
+        files = sorted(path.parent.glob(path.name + "*"))
+        if not files:
+            raise CommandError(f"No profiling log at {path}.")
+
+        views = defaultdict(lambda: {"requests": 0, "queries": [], "db_ms": [], "slow": 0, "repeated": {}})
+        for log in files:
+            with open(log, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # truncated by a rotation mid-write
+                    row = views[entry.get("view") or entry["path"]]
+                    row["requests"] += 1
+                    row["queries"].append(entry["queries"])
+                    row["db_ms"].append(entry["db_ms"])
+                    row["slow"] += entry.get("slow", 0)
+                    for dup in entry.get("duplicates", []):
+                        row["repeated"][dup["sql"]] = max(row["repeated"].get(dup["sql"], 0), dup["count"])
+
+        if not views:
+            raise CommandError(f"{path} has no entries yet.")
+
+        ranked = sorted(views.items(), key=lambda item: sum(item[1]["db_ms"]), reverse=True)
+        width = max(len(name) for name, _ in ranked[:options["limit"]])
+        self.stdout.write(
+            f"{'view':<{width}}  requests  avg_q  max_q  avg_db_ms  p95_db_ms  total_db_ms  slow"
+        )
+        for name, row in ranked[:options["limit"]]:
+            db_ms = sorted(row["db_ms"])
+            p95 = db_ms[min(len(db_ms) - 1, int(len(db_ms) * 0.95))]
+            self.stdout.write(
+                f"{name:<{width}}  {row['requests']:>8}  "
+                f"{sum(row['queries']) / row['requests']:>5.1f}  {max(row['queries']):>5}  "
+                f"{sum(db_ms) / row['requests']:>9.2f}  {p95:>9.2f}  {sum(db_ms):>11.2f}  {row['slow']:>4}"
+            )
+            if options["duplicates"] and row["repeated"]:
+                sql, count = max(row["repeated"].items(), key=lambda item: item[1])
+                self.stdout.write(f"    ×{count}  {sql}")
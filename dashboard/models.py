@@ -12,3 +12,88 @@ class DesignUpload(models.Model):
 
     def __str__(self):
         return f"{self.project_name} → {self.assigned_to.username}"
+
+
+class DashboardSnapshot(models.Model):
+    """
+    Pre-aggregated dashboard counters, kept in sync by the Project/Task
+    signals in dashboard/signals.py so the dashboards can read their
+    charts and totals from a single row instead of scanning the tables.
+
+    Scopes:
+      - global → every project and task
+      - member → projects assigned to `user` and tasks assigned to `user`
+      - owner  → projects owned by `user` and the tasks of those projects
+    """
+
+    SCOPE_GLOBAL = "global"
+    SCOPE_MEMBER = "member"
+    SCOPE_OWNER = "owner"
+
+    SCOPE_CHOICES = [
+        (SCOPE_GLOBAL, "Global"),
+        (SCOPE_MEMBER, "Member"),
+        (SCOPE_OWNER, "Owner"),
+    ]
+
+    # Project.priority / Task.status value → counter column
+    PRIORITY_FIELDS = {
+        "High": "priority_high",
+        "Medium": "priority_medium",
+        "Low": "priority_low",
+    }
+    STATUS_FIELDS = {
+        "Pending": "tasks_pending",
+        "In Progress": "tasks_in_progress",
+        "Completed": "tasks_completed",
+    }
+
+    scope = models.CharField(max_length=10, choices=SCOPE_CHOICES)
+    user = models.ForeignKey(
+        CustomUser,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="dashboard_snapshots",
+    )
+
+    projects_count = models.IntegerField(default=0)
+    priority_high = models.IntegerField(default=0)
+    priority_medium = models.IntegerField(default=0)
+    priority_low = models.IntegerField(default=0)
+
+    tasks_count = models.IntegerField(default=0)
+    tasks_pending = models.IntegerField(default=0)
+    tasks_in_progress = models.IntegerField(default=0)
+    tasks_completed = models.IntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["scope", "user"], name="dashboard_snapshot_scope_user"),
+        ]
+
+    def __str__(self):
+        return f"{self.scope} snapshot ({self.user_id or 'all'})"
+
+    # ----- Readers (same shape as the old values().annotate() queries) -----
+    def priority_data(self):
+        data = [
+            {"priority": priority, "count": getattr(self, field)}
+            for priority, field in self.PRIORITY_FIELDS.items()
+        ]
+        return sorted((row for row in data if row["count"]), key=lambda row: row["priority"])
+
+    def status_data(self):
+        data = [
+            {"status": status, "count": getattr(self, field)}
+            for status, field in self.STATUS_FIELDS.items()
+        ]
+        return sorted((row for row in data if row["count"]), key=lambda row: row["status"])
+
+    @property
+    def progress_percent(self):
+        if not self.tasks_count:
+            return 0
+        return round(self.tasks_completed / self.tasks_count * 100, 2)
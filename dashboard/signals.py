@@ -0,0 +1,333 @@
+# dashboard/signals.py
+"""
+Keep DashboardSnapshot rows in step with Project / Task writes.
+
+pre_* receivers stash the row as it was in the database, post_* receivers
+turn "old contribution → new contribution" into F() increments.
+
+The receivers at the bottom also expire the cached dashboard fragments
+(dashboard/fragments.py) that show the changed data. Task bulk updates
+send tasks_bulk_updated instead of per-row signals; it is handled in one
+netted pass.
+
+Any other QuerySet.update() on Project / Task arrives as queryset_updating
+/ queryset_updated (backend/signals.py) without per-row old values. When
+it writes a counted column, the scopes the rows belong to before and
+after the update are dropped and rebuilt on their next read. Raw SQL
+bypasses all of this; run `rebuild_all()` after it.
+"""
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from accounts.models import CustomUser
+from backend.signals import queryset_updated, queryset_updating
+from communications.models import Message
+from projects.models import Project
+from tasks.models import Task
+from tasks.signals import tasks_bulk_updated
+from . import fragments
+from .snapshots import (
+    GLOBAL, MEMBER, OWNER, apply_change, apply_changes, invalidate_scopes, project_contribution,
+    task_contribution,
+)
+
+
+PROJECT_TRACKED_FIELDS = {"priority", "owner", "owner_id"}
+TASK_TRACKED_FIELDS = {"status", "assigned_to", "assigned_to_id", "project", "project_id"}
+
+# Project columns no dashboard shows; updates to only these expire nothing
+# (design.versions bumps design_version on every design upload).
+PROJECT_UNRENDERED_FIELDS = {"design_version"}
+
+
+def _tracks(update_fields, tracked):
+    return update_fields is None or bool(tracked & set(update_fields))
+
+
+# -----------------------------------------------------
+# Project
+# -----------------------------------------------------
+@receiver(pre_save, sender=Project)
+def stash_project(sender, instance, raw=False, update_fields=None, **kwargs):
+    instance._snapshot_old = None
+    if raw or not instance.pk or not _tracks(update_fields, PROJECT_TRACKED_FIELDS):
+        return
+    instance._snapshot_old = (
+        Project.objects.filter(pk=instance.pk).values("priority", "owner_id").first()
+    )
+
+
+@receiver(post_save, sender=Project)
+def project_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+
+    if created:
+        apply_change(new=project_contribution(instance.priority, instance.owner_id))
+        return
+
+    old = getattr(instance, "_snapshot_old", None)
+    if old is None:
+        return
+    if old["priority"] == instance.priority and old["owner_id"] == instance.owner_id:
+        return
+
+    member_ids = list(instance.assigned_to.values_list("id", flat=True))
+    apply_change(
+        old=project_contribution(old["priority"], old["owner_id"], member_ids),
+        new=project_contribution(instance.priority, instance.owner_id, member_ids),
+    )
+
+    # The project's tasks follow it into the new owner's scope.
+    if old["owner_id"] != instance.owner_id:
+        task_rows = (
+            Task.objects.filter(project=instance)
+            .order_by()
+            .values("status")
+            .annotate(n=Count("id"))
+        )
+        for row in task_rows:
+            apply_change(
+                old=_only(task_contribution(row["status"], None, old["owner_id"]), OWNER),
+                new=_only(task_contribution(row["status"], None, instance.owner_id), OWNER),
+                times=row["n"],
+            )
+
+
+@receiver(pre_delete, sender=Project)
+def stash_project_members(sender, instance, **kwargs):
+    instance._snapshot_members = list(instance.assigned_to.values_list("id", flat=True))
+
+
+@receiver(post_delete, sender=Project)
+def project_deleted(sender, instance, **kwargs):
+    apply_change(
+        old=project_contribution(
+            instance.priority,
+            instance.owner_id,
+            getattr(instance, "_snapshot_members", ()),
+        )
+    )
+
+
+@receiver(m2m_changed, sender=Project.assigned_to.through)
+def project_members_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == "pre_clear":
+        if reverse:
+            instance._snapshot_cleared = list(instance.assigned_projects.values_list("id", flat=True))
+        else:
+            instance._snapshot_cleared = list(instance.assigned_to.values_list("id", flat=True))
+        return
+
+    if action == "post_clear":
+        pk_set = getattr(instance, "_snapshot_cleared", None)
+        sign = -1
+    elif action == "post_add":
+        sign = 1
+    elif action == "post_remove":
+        sign = -1
+    else:
+        return
+
+    if not pk_set:
+        return
+
+    if reverse:
+        # user.assigned_projects.add(...) → one member, many projects
+        rows = (
+            Project.objects.filter(pk__in=pk_set)
+            .order_by()
+            .values("priority")
+            .annotate(n=Count("id"))
+        )
+        for row in rows:
+            contribution = _member_contribution(row["priority"], instance.pk)
+            if sign > 0:
+                apply_change(new=contribution, times=row["n"])
+            else:
+                apply_change(old=contribution, times=row["n"])
+    else:
+        for member_id in pk_set:
+            contribution = _member_contribution(instance.priority, member_id)
+            if sign > 0:
+                apply_change(new=contribution)
+            else:
+                apply_change(old=contribution)
+
+
+def _member_contribution(priority, member_id):
+    return _only(project_contribution(priority, None, [member_id]), MEMBER)
+
+
+def _only(contribution, scope):
+    return {key: fields for key, fields in contribution.items() if key[0] == scope}
+
+
+# -----------------------------------------------------
+# Task
+# -----------------------------------------------------
+@receiver(pre_save, sender=Task)
+def stash_task(sender, instance, raw=False, update_fields=None, **kwargs):
+    instance._snapshot_old = None
+    if raw or not instance.pk or not _tracks(update_fields, TASK_TRACKED_FIELDS):
+        return
+    instance._snapshot_old = (
+        Task.objects.filter(pk=instance.pk)
+        .values("status", "assigned_to_id", "project_id", "project__owner_id")
+        .first()
+    )
+
+
+@receiver(post_save, sender=Task)
+def task_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+
+    old = None if created else getattr(instance, "_snapshot_old", None)
+    if not created and old is None:
+        return
+
+    if old and old["project_id"] == instance.project_id:
+        owner_id = old["project__owner_id"]
+    else:
+        owner_id = _project_owner_id(instance.project_id)
+
+    apply_change(
+        old=old and task_contribution(old["status"], old["assigned_to_id"], old["project__owner_id"]),
+        new=task_contribution(instance.status, instance.assigned_to_id, owner_id),
+    )
+
+
+@receiver(pre_delete, sender=Task)
+def stash_task_owner(sender, instance, **kwargs):
+    instance._snapshot_owner = _project_owner_id(instance.project_id)
+
+
+@receiver(post_delete, sender=Task)
+def task_deleted(sender, instance, **kwargs):
+    apply_change(
+        old=task_contribution(
+            instance.status,
+            instance.assigned_to_id,
+            getattr(instance, "_snapshot_owner", None),
+        )
+    )
+
+
+@receiver(tasks_bulk_updated)
+def tasks_bulk_saved(sender, changes, **kwargs):
+    # Only status moves between buckets here; assignee and project stay put
+    apply_changes(
+        (
+            task_contribution(old["status"], old["assigned_to_id"], old["project__owner_id"]),
+            task_contribution(task.status, old["assigned_to_id"], old["project__owner_id"]),
+        )
+        for old, task in changes
+    )
+    _expire(fragments.TASKS)
+
+
+@receiver(queryset_updating, sender=Project)
+@receiver(queryset_updating, sender=Task)
+def rows_updating(sender, queryset, fields, **kwargs):
+    tracked = PROJECT_TRACKED_FIELDS if sender is Project else TASK_TRACKED_FIELDS
+    if not tracked & fields:
+        return None
+
+    # No old values to net against: drop the scopes the rows are in now
+    # and the ones they move to, and let those rebuild on their next read.
+    pks, scopes = _scopes_of(sender, queryset)
+    if not pks:
+        return None
+
+    def rows_updated():
+        _, moved_to = _scopes_of(sender, sender._default_manager.filter(pk__in=pks))
+        invalidate_scopes(scopes | moved_to)
+
+    return rows_updated
+
+
+def _scopes_of(model, queryset):
+    """(pks, {(scope, user_id)}) for the snapshot scopes the rows count in."""
+    if model is Project:
+        rows = list(queryset.order_by().values_list("pk", "owner_id"))
+        pks = [pk for pk, _ in rows]
+        scopes = {(OWNER, owner_id) for _, owner_id in rows if owner_id}
+        scopes |= {
+            (MEMBER, member_id)
+            for member_id in Project.assigned_to.through.objects.filter(project_id__in=pks)
+            .values_list("customuser_id", flat=True)
+        }
+    else:
+        rows = list(queryset.order_by().values_list("pk", "assigned_to_id", "project__owner_id"))
+        pks = [pk for pk, _, _ in rows]
+        scopes = {(MEMBER, assignee_id) for _, assignee_id, _ in rows if assignee_id}
+        scopes |= {(OWNER, owner_id) for _, _, owner_id in rows if owner_id}
+    if pks:
+        scopes.add((GLOBAL, None))
+    return pks, scopes
+
+
+@receiver(queryset_updated, sender=Project)
+@receiver(queryset_updated, sender=Task)
+def rows_updated(sender, fields, **kwargs):
+    if sender is Project and fields <= PROJECT_UNRENDERED_FIELDS:
+        return
+    _expire(fragments.PROJECTS if sender is Project else fragments.TASKS)
+
+
+def _project_owner_id(project_id):
+    return (
+        Project.objects.filter(pk=project_id).values_list("owner_id", flat=True).first()
+    )
+
+
+# -----------------------------------------------------
+# Fragment cache
+# -----------------------------------------------------
+def _expire(*names):
+    # Now for readers in this transaction, and again after commit so a
+    # page rendered from pre-commit data in the meantime is not kept.
+    fragments.bump(*names)
+    transaction.on_commit(lambda: fragments.bump(*names))
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+def project_fragments(sender, raw=False, **kwargs):
+    if not raw:
+        _expire(fragments.PROJECTS)
+
+
+@receiver(m2m_changed, sender=Project.assigned_to.through)
+def project_members_fragments(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        _expire(fragments.PROJECTS)
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def task_fragments(sender, raw=False, **kwargs):
+    if not raw:
+        _expire(fragments.TASKS)
+
+
+@receiver(post_save, sender=Message)
+@receiver(post_delete, sender=Message)
+def message_fragments(sender, raw=False, **kwargs):
+    if not raw:
+        _expire(fragments.ANNOUNCEMENTS)
+
+
+@receiver(post_save, sender=CustomUser)
+def user_fragments(sender, raw=False, update_fields=None, **kwargs):
+    # Logins only touch last_login; names and roles are what fragments show
+    if not raw and _tracks(update_fields, {"username", "role"}):
+        _expire(fragments.TEAM)
+
+
+@receiver(post_delete, sender=CustomUser)
+def user_deleted_fragments(sender, **kwargs):
+    _expire(fragments.TEAM)
@@ -0,0 +1,186 @@
+# dashboard/snapshots.py
+"""
+Read / rebuild / increment helpers for DashboardSnapshot.
+
+Snapshots are built lazily from the Project/Task tables the first time a
+scope is read, and after that they are only nudged by the deltas the
+signals in dashboard/signals.py compute. A missing row is never patched —
+it is simply rebuilt on the next read — so dropping a snapshot is always a
+safe way to invalidate it.
+"""
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from projects.models import Project
+from tasks.models import Task
+from .models import DashboardSnapshot
+
+
+GLOBAL = DashboardSnapshot.SCOPE_GLOBAL
+MEMBER = DashboardSnapshot.SCOPE_MEMBER
+OWNER = DashboardSnapshot.SCOPE_OWNER
+
+
+# -----------------------------------------------------
+# Reading
+# -----------------------------------------------------
+def get_snapshot(scope, user=None):
+    """Return the snapshot row for a scope, building it on first use."""
+    user_id = getattr(user, "pk", user)
+    snapshot = DashboardSnapshot.objects.filter(scope=scope, user_id=user_id).first()
+    if snapshot is None:
+        snapshot = rebuild_snapshot(scope, user_id)
+    return snapshot
+
+
+def rebuild_snapshot(scope, user_id=None):
+    """
+    Recompute one scope from the source tables and store it.
+
+    The existing row is locked before counting, so an F() increment from
+    a concurrent write (apply_changes) either committed first — and the
+    count sees its rows — or waits and lands on top of the new counters;
+    it is never overwritten by a count that missed it.
+    """
+    if scope == GLOBAL:
+        projects, tasks = Project.objects.all(), Task.objects.all()
+        user_id = None
+    elif scope == MEMBER:
+        projects = Project.objects.filter(assigned_to=user_id)
+        tasks = Task.objects.filter(assigned_to=user_id)
+    elif scope == OWNER:
+        projects = Project.objects.filter(owner=user_id)
+        tasks = Task.objects.filter(project__owner=user_id)
+    else:
+        raise ValueError(f"Unknown dashboard scope: {scope}")
+
+    with transaction.atomic():
+        snapshot = (
+            DashboardSnapshot.objects.select_for_update()
+            .filter(scope=scope, user_id=user_id)
+            .first()
+        )
+        counters = _count(projects, tasks)
+        if snapshot is None:
+            try:
+                with transaction.atomic():
+                    return DashboardSnapshot.objects.create(scope=scope, user_id=user_id, **counters)
+            except IntegrityError:
+                pass  # built concurrently; recount with that row locked
+        else:
+            for field, value in counters.items():
+                setattr(snapshot, field, value)
+            snapshot.save()
+            return snapshot
+    return rebuild_snapshot(scope, user_id)
+
+
+def _count(projects, tasks):
+    counters = dict.fromkeys(_counter_fields(), 0)
+
+    for row in projects.order_by().values("priority").annotate(n=Count("id")):
+        counters["projects_count"] += row["n"]
+        field = DashboardSnapshot.PRIORITY_FIELDS.get(row["priority"])
+        if field:
+            counters[field] += row["n"]
+
+    for row in tasks.order_by().values("status").annotate(n=Count("id")):
+        counters["tasks_count"] += row["n"]
+        field = DashboardSnapshot.STATUS_FIELDS.get(row["status"])
+        if field:
+            counters[field] += row["n"]
+    return counters
+
+
+def rebuild_all():
+    """Drop every snapshot; each scope is rebuilt on its next read."""
+    DashboardSnapshot.objects.all().delete()
+
+
+def invalidate(scope, user_id=None):
+    DashboardSnapshot.objects.filter(scope=scope, user_id=user_id).delete()
+
+
+def invalidate_scopes(keys):
+    """Drop the snapshots for many (scope, user_id) keys in one DELETE."""
+    condition = Q()
+    for scope in {scope for scope, _ in keys}:
+        user_ids = [user_id for key_scope, user_id in keys if key_scope == scope]
+        if scope == GLOBAL:
+            condition |= Q(scope=GLOBAL)
+        else:
+            condition |= Q(scope=scope, user_id__in=user_ids)
+    if condition:
+        DashboardSnapshot.objects.filter(condition).delete()
+
+
+# -----------------------------------------------------
+# Incremental updates
+# -----------------------------------------------------
+def project_contribution(priority, owner_id, member_ids=()):
+    """What one project adds to each scope it belongs to."""
+    fields = {"projects_count": 1}
+    priority_field = DashboardSnapshot.PRIORITY_FIELDS.get(priority)
+    if priority_field:
+        fields[priority_field] = 1
+
+    keys = [(GLOBAL, None)]
+    if owner_id:
+        keys.append((OWNER, owner_id))
+    keys += [(MEMBER, member_id) for member_id in member_ids]
+    return {key: fields for key in keys}
+
+
+def task_contribution(status, assigned_to_id, owner_id):
+    """What one task adds to each scope it belongs to."""
+    fields = {"tasks_count": 1}
+    status_field = DashboardSnapshot.STATUS_FIELDS.get(status)
+    if status_field:
+        fields[status_field] = 1
+
+    keys = [(GLOBAL, None)]
+    if assigned_to_id:
+        keys.append((MEMBER, assigned_to_id))
+    if owner_id:
+        keys.append((OWNER, owner_id))
+    return {key: fields for key in keys}
+
+
+def apply_change(old=None, new=None, times=1):
+    """
+    Move `times` rows' worth of counters from the `old` contribution to
+    the `new` one. Scopes present in both with the same bucket net out
+    to nothing, so an unrelated save costs no UPDATE at all.
+    """
+    apply_changes([(old, new)], times)
+
+
+def apply_changes(changes, times=1):
+    """
+    apply_change() for many (old, new) pairs at once: everything is netted
+    first, so a batch costs at most one UPDATE per affected scope.
+    """
+    deltas = defaultdict(lambda: defaultdict(int))
+    for old, new in changes:
+        for sign, contribution in ((-1, old or {}), (1, new or {})):
+            for key, fields in contribution.items():
+                for field, value in fields.items():
+                    deltas[key][field] += sign * value * times
+
+    for (scope, user_id), fields in deltas.items():
+        changes = {field: F(field) + value for field, value in fields.items() if value}
+        if changes:
+            DashboardSnapshot.objects.filter(scope=scope, user_id=user_id).update(
+                updated_at=timezone.now(), **changes
+            )
+
+
+def _counter_fields():
+    return (
+        ["projects_count", "tasks_count"]
+        + list(DashboardSnapshot.PRIORITY_FIELDS.values())
+        + list(DashboardSnapshot.STATUS_FIELDS.values())
+    )
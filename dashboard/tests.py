@@ -1,3 +1,338 @@
-from django.test import TestCase
+import io
+from datetime import date
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from accounts.models import CustomUser
+from communications.models import Message
+from projects.models import Project
+from tasks.models import Task
+
+from notifications.models import Notification
+from notifications.unread import unread_count
+
+from . import benchmark, fragments, hr
+from .models import DashboardSnapshot
+from .snapshots import GLOBAL, MEMBER, OWNER, get_snapshot, rebuild_snapshot
+
+
+class ViewQueryBudgetTests(TestCase):
+    """
+    Replays the view benchmark against the stored baseline and fails when a
+    view starts issuing more queries (or starts returning 5xx). Timing is
+    left to `manage.py benchmark_views`, since it depends on the machine.
+    """
+
+    def test_no_query_regressions(self):
+        baseline = benchmark.load_baseline()
+        if baseline is None:
+            self.skipTest("No benchmark baseline recorded")
+
+        report = benchmark.run(baseline["dataset"], repeat=1)
+        regressions = benchmark.compare(report, baseline, check_timing=False)
+
+        self.assertEqual(regressions, [], "\n".join(regressions))
+
+
+@override_settings(QUERY_BUDGET_ENFORCE=True)
+class ListingDeferredFieldTests(TestCase):
+    """
+    The listing pages load projects through Project.objects.for_listing(),
+    which leaves most columns in the database. If a template starts using
+    one of them, Django would quietly fetch it with one extra query per
+    row; these tests make that a failure instead (and hold the views to
+    their @query_budget).
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = benchmark.seed(users=8, projects=6, tasks=12, notifications=0, messages=2)
+
+    def assert_no_deferred_loads(self, role, path):
+        loads = []
+
+        def recording(model):
+            original = model.refresh_from_db
+
+            def refresh_from_db(instance, *args, **kwargs):
+                loads.append(f"{model.__name__}.{kwargs.get('fields')}")
+                return original(instance, *args, **kwargs)
+
+            return mock.patch.object(model, "refresh_from_db", refresh_from_db)
+
+        cache.clear()  # render the templates, not cached fragments
+        self.client.force_login(self.users[role])
+        with recording(Project), recording(CustomUser):
+            response = self.client.get(path)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(loads, [], f"{path} lazily loaded deferred fields: {loads}")
+
+    def test_global_dashboard(self):
+        self.assert_no_deferred_loads(CustomUser.ROLE_MEMBER, reverse("dashboard:global_dashboard"))
+
+    def test_global_dashboard_queries_do_not_grow_with_projects(self):
+        def queries():
+            cache.clear()
+            with CaptureQueriesContext(connection) as captured:
+                self.assertEqual(self.client.get(reverse("dashboard:global_dashboard")).status_code, 200)
+            return len(captured)
+
+        self.client.force_login(self.users[CustomUser.ROLE_MEMBER])
+        before = queries()
+        owner = self.users[CustomUser.ROLE_MANAGER]
+        for n in range(3):
+            Project.objects.create(name=f"extra {n}", owner=owner).assigned_to.add(*self.users.values())
+        self.assertEqual(queries(), before)
+
+    def test_manager_dashboard(self):
+        self.assert_no_deferred_loads(CustomUser.ROLE_MANAGER, reverse("dashboard:manager_dashboard"))
+
+    def test_member_dashboard(self):
+        member = self.users[CustomUser.ROLE_MEMBER]
+        self.assert_no_deferred_loads(
+            CustomUser.ROLE_MEMBER, reverse("dashboard:member_dashboard", args=[member.id])
+        )
+
+    def test_hr_dashboard(self):
+        self.assert_no_deferred_loads(CustomUser.ROLE_HR, reverse("communications:hr_dashboard"))
+
+    def test_design_dashboard(self):
+        self.assert_no_deferred_loads(CustomUser.ROLE_DESIGN, reverse("design:design_dashboard"))
+
+
+class SnapshotReplayTests(TestCase):
+    """
+    The signal-maintained DashboardSnapshot counters must always equal a
+    rebuild from the source tables, whatever sequence of writes got them
+    there.
+    """
+
+    COUNTERS = (
+        ["projects_count", "tasks_count"]
+        + list(DashboardSnapshot.PRIORITY_FIELDS.values())
+        + list(DashboardSnapshot.STATUS_FIELDS.values())
+    )
+
+    def setUp(self):
+        self.users = [
+            CustomUser.objects.create_user(username=f"u{i}", password="x", role=CustomUser.ROLE_MEMBER)
+            for i in range(4)
+        ]
+
+    def project(self, owner, priority="Medium"):
+        return Project.objects.create(name=f"p-{owner.username}", owner=owner, priority=priority)
+
+    def task(self, project, assignee, status="Pending"):
+        return Task.objects.create(
+            title="t", project=project, assigned_to=assignee, status=status, due_date=date.today()
+        )
+
+    def read_all(self):
+        """Materialise every scope, so later writes have rows to increment."""
+        get_snapshot(GLOBAL)
+        for user in CustomUser.objects.all():
+            get_snapshot(MEMBER, user)
+            get_snapshot(OWNER, user)
+
+    def assert_consistent(self):
+        stored = list(DashboardSnapshot.objects.all())
+        self.assertTrue(stored)
+        for snapshot in stored:
+            counters = {field: getattr(snapshot, field) for field in self.COUNTERS}
+            rebuilt = rebuild_snapshot(snapshot.scope, snapshot.user_id)
+            expected = {field: getattr(rebuilt, field) for field in self.COUNTERS}
+            self.assertEqual(counters, expected, f"{snapshot.scope} / user {snapshot.user_id}")
+
+    def test_mixed_writes(self):
+        a, b, c, d = self.users
+        self.read_all()
+
+        p1 = self.project(a, "High")
+        p2 = self.project(b, "Low")
+        p1.assigned_to.add(b, c)
+        c.assigned_projects.add(p2)
+        t1 = self.task(p1, b)
+        t2 = self.task(p1, c, "In Progress")
+        t3 = self.task(p2, c)
+        self.assert_consistent()
+
+        t1.status = "Completed"
+        t1.save()
+        t2.assigned_to = d  # reassignment
+        t2.save()
+        t3.project = p1  # moves to another owner
+        t3.save(update_fields=["project"])
+        p1.owner = c  # its tasks follow
+        p1.priority = "Low"
+        p1.save()
+        self.assert_consistent()
+
+        p1.assigned_to.remove(b)
+        c.assigned_projects.clear()
+        p2.assigned_to.set([a, d])
+        self.assert_consistent()
+
+        p2.delete()  # cascades to its tasks
+        b.delete()  # cascades to owned projects and assigned tasks
+        t2.delete()
+        self.assert_consistent()
+
+    def stored_scopes(self):
+        return set(DashboardSnapshot.objects.values_list("scope", "user_id"))
+
+    def test_queryset_update_drops_only_affected_scopes(self):
+        a, b, c, d = self.users
+        project = self.project(a)
+        project.assigned_to.add(c)
+        self.task(project, b)
+        self.read_all()
+        everything = self.stored_scopes()
+
+        Task.objects.filter(project=project).update(status="Completed")
+        self.assertEqual(everything - self.stored_scopes(), {(GLOBAL, None), (MEMBER, b.id), (OWNER, a.id)})
+        self.assertEqual(get_snapshot(MEMBER, b).tasks_completed, 1)
+        self.assert_consistent()
+
+        self.read_all()
+        Task.objects.filter(project=project).update(assigned_to=d)  # old and new assignee
+        self.assertEqual(
+            everything - self.stored_scopes(),
+            {(GLOBAL, None), (MEMBER, b.id), (MEMBER, d.id), (OWNER, a.id)},
+        )
+        self.assert_consistent()
+
+        self.read_all()
+        Project.objects.filter(pk=project.pk).update(priority="High", owner=b)
+        self.assertEqual(
+            everything - self.stored_scopes(),
+            {(GLOBAL, None), (OWNER, a.id), (OWNER, b.id), (MEMBER, c.id)},
+        )
+        self.assertEqual(get_snapshot(OWNER, b).priority_high, 1)
+        self.assert_consistent()
+
+        self.read_all()
+        Project.objects.filter(pk=project.pk).update(name="renamed")  # not counted
+        Project.objects.filter(pk=-1).update(priority="Low")  # no rows
+        self.assertEqual(self.stored_scopes(), everything)
+
+
+class ProcessLocalCacheTests(TestCase):
+    """Invalidation on write only reaches this process's LocMem cache, so entries stay short-lived there."""
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def timeouts(self, call):
+        with mock.patch.object(cache, "set_many", wraps=cache.set_many) as set_many:
+            call()
+        return {c.args[1] for c in set_many.call_args_list}
+
+    @override_settings(SHARED_CACHE=False, LOCAL_CACHE_TTL=7)
+    def test_local_cache(self):
+        self.assertEqual(self.timeouts(fragments.generations), {7})
+        with mock.patch.object(cache, "set", wraps=cache.set) as cache_set:
+            unread_count(1)
+        self.assertEqual(cache_set.call_args.args[2], 7)
+
+    @override_settings(SHARED_CACHE=True, LOCAL_CACHE_TTL=7)
+    def test_shared_cache(self):
+        self.assertEqual(self.timeouts(fragments.generations), {fragments.TOKEN_TTL})
+
+
+class HRSectionTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.hr = CustomUser.objects.create_user(username="hr", password="x", role=CustomUser.ROLE_HR)
+        cls.member = CustomUser.objects.create_user(username="member", password="x", role=CustomUser.ROLE_MEMBER)
+
+    def setUp(self):
+        self.client.force_login(self.hr)
+
+    def get(self, name, **params):
+        return self.client.get(reverse(f"dashboard:{name}"), params)
+
+    def test_counts(self):
+        self.assertEqual(
+            self.get("hr_counts_api").json(),
+            {"total_projects": 0, "active_projects": 0, "total_tasks": 0, "total_members": 1},
+        )
+
+        done = Project.objects.create(name="done", owner=self.member, status=Project.STATUS_COMPLETED)
+        Project.objects.create(name="open", owner=self.member)
+        Task.objects.create(title="t", project=done, assigned_to=self.member, due_date=date.today())
+        with self.assertNumQueries(1):
+            counts = hr.counts()
+        self.assertEqual(
+            counts,
+            {"total_projects": 2, "active_projects": 1, "total_tasks": 1, "total_members": 1},
+        )
+
+    def test_empty_sections(self):
+        Message.objects.all().delete()
+        for section in ("projects", "tasks", "messages"):
+            response = self.get(f"hr_{section}_api")
+            self.assertEqual(response.json(), {"results": [], "next_cursor": None}, section)
+
+    def test_pages_cross_the_boundary(self):
+        projects = [Project.objects.create(name=f"p{i}", owner=self.member) for i in range(5)]
+        newest_first = [p.id for p in reversed(projects)]
+
+        first = self.get("hr_projects_api", limit=2).json()
+        self.assertEqual([row["id"] for row in first["results"]], newest_first[:2])
+        self.assertEqual(first["next_cursor"], newest_first[1])
+
+        second = self.get("hr_projects_api", limit=2, cursor=first["next_cursor"]).json()
+        self.assertEqual([row["id"] for row in second["results"]], newest_first[2:4])
+
+        last = self.get("hr_projects_api", limit=2, cursor=second["next_cursor"]).json()
+        self.assertEqual([row["id"] for row in last["results"]], newest_first[4:])
+        self.assertIsNone(last["next_cursor"])
+
+        # A page that ends exactly on the last row has no next page
+        exact = self.get("hr_projects_api", limit=5).json()
+        self.assertEqual(len(exact["results"]), 5)
+        self.assertIsNone(exact["next_cursor"])
+
+        self.assertEqual(self.get("hr_projects_api", cursor="abc").status_code, 400)
+
+    def test_non_hr_users_are_refused(self):
+        self.client.force_login(self.member)
+        for name in ("counts", "projects", "tasks", "people", "messages"):
+            response = self.get(f"hr_{name}_api")
+            self.assertEqual(response.status_code, 403, name)
+
+
+class ExplainHotQueriesTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        benchmark.seed(users=8, projects=4, tasks=8, notifications=4, messages=2)
+
+    def explain(self, *args):
+        out = io.StringIO()
+        call_command("explain_hot_queries", *args, stdout=out)
+        return out.getvalue()
+
+    def test_explains_the_selects_of_each_view(self):
+        output = self.explain("notifications")
+        self.assertIn("notifications.urls:", output)
+        self.assertIn('FROM "notifications_notification"', output)
+        self.assertRegex(output, r"\n([1-9]\d*) distinct SELECT statement\(s\) explained\.")
+
+    def test_writes_are_rolled_back(self):
+        before = Notification.objects.filter(is_read=False).count()
+        self.explain("notifications")
+        self.assertEqual(Notification.objects.filter(is_read=False).count(), before)
+
+    def test_unknown_user(self):
+        with self.assertRaisesMessage(CommandError, "No user named 'nobody'"):
+            self.explain("--user", "nobody")
@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import views, api_views
 
 app_name = "dashboard"
 
@@ -18,6 +18,11 @@ urlpatterns = [
 
     # HR Dashboard
     path("hr/", views.hr_dashboard, name="hr_dashboard"),
+    path("hr/api/counts/", api_views.hr_counts_api, name="hr_counts_api"),
+    path("hr/api/projects/", api_views.hr_projects_api, name="hr_projects_api"),
+    path("hr/api/tasks/", api_views.hr_tasks_api, name="hr_tasks_api"),
+    path("hr/api/people/", api_views.hr_people_api, name="hr_people_api"),
+    path("hr/api/messages/", api_views.hr_messages_api, name="hr_messages_api"),
 
     # Design Team Dashboard
     path("design/", views.design_dashboard, name="design_dashboard"),
@@ -1,11 +1,18 @@
 # dashboard/views.py
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import render, get_object_or_404, redirect
-from django.db.models import Count
+from django.db.models import Prefetch
+from django.utils.functional import SimpleLazyObject
 from accounts.models import CustomUser
 from projects.models import Project
 from tasks.models import Task
+from communications import feed
+from communications.forms import MessageForm
 from communications.models import Message
+from . import fragments
+from .models import DashboardSnapshot
+from .snapshots import get_snapshot
+from .decorators import query_budget
 
 
 # 🌍 Default dashboard redirect
@@ -14,36 +21,39 @@ def dashboard(request):
     return redirect("dashboard:global_dashboard")
 
 
-# 🌍 Global Overview (All users — Read-Only)
-@login_required
-def global_dashboard(request):
-    projects = Project.objects.select_related("owner").all()
+# 🔹 Context helpers. Everything a cached fragment shows is passed lazily
+# (a callable or SimpleLazyObject), so a fragment served from the cache
+# costs no queries; see dashboard/fragments.py.
+def _latest_announcement():
+    latest_id = feed.latest_id()  # memoised; no query when there are none
+    if latest_id is None:
+        return []
+    return list(Message.objects.select_related("sender").filter(pk=latest_id))
 
-    latest = Message.objects.order_by("-created_at").first()
-    announcements = [latest] if latest else []
 
-    # 🔹 Chart data
-    project_priority_data = (
-        projects.values("priority")
-        .annotate(count=Count("priority"))
-        .order_by("priority")
-    )
+def _lazy_snapshot(scope, user_id=None):
+    return SimpleLazyObject(lambda: get_snapshot(scope, user_id))
 
-    task_status_data = (
-        Task.objects.values("status")
-        .annotate(count=Count("status"))
-        .order_by("status")
-    )
 
+# 🌍 Global Overview (All users — Read-Only)
+@login_required
+def global_dashboard(request):
     show_role_hint = not getattr(request.user, "is_role_selected", False)
 
     context = {
-        "projects": projects,
+        "projects": Project.objects.for_listing("card").prefetch_related(
+            Prefetch(
+                "assigned_to",
+                queryset=CustomUser.objects.only("id", "username"),
+                to_attr="assignees",
+            )
+        ),
         "user_role": getattr(request.user, "role", None),
-        "announcements": announcements,
+        "announcements": _latest_announcement,
         "show_role_hint": show_role_hint,
-        "project_priority_data": list(project_priority_data),
-        "task_status_data": list(task_status_data),
+        # 🔹 Chart data (pre-aggregated, see dashboard/snapshots.py)
+        "snapshot": _lazy_snapshot(DashboardSnapshot.SCOPE_GLOBAL),
+        "frag": fragments.generations(),
     }
 
     return render(request, "dashboard/global_dashboard.html", context)
@@ -55,60 +65,50 @@ def hr_dashboard(request):
     if request.user.role != "HR":
         return render(request, "dashboard/403.html", {"message": "Unauthorized access"})
 
+    # Counts and every section are fetched by the page (dashboard/hr.py),
+    # so rendering it reads nothing company-sized.
     context = {
-        "total_projects": Project.objects.count(),
-        "active_projects": Project.objects.exclude(status="Completed").count(),
-        "total_tasks": Task.objects.count(),
-        "total_members": CustomUser.objects.exclude(role="HR").count(),
-        "messages": Message.objects.order_by("-created_at")[:50],
+        "form": MessageForm(),
         "allow_edit": True,
     }
 
     return render(request, "dashboard/hr_dashboard.html", context)
 
 
+def _manager_projects():
+    # One extra query for every project's assignees (via the M2M table)
+    # instead of assigned_to.exists / assigned_to.all per row in the template.
+    projects = list(
+        Project.objects.for_listing("table").prefetch_related(
+            Prefetch(
+                "assigned_to",
+                queryset=CustomUser.objects.only("id", "username"),
+                to_attr="assignees",
+            )
+        )
+    )
+    for project in projects:
+        project.assignee_ids = {member.id for member in project.assignees}
+    return projects
+
+
 # 🟦 Manager Dashboard
 @login_required
+@query_budget(10)
 def manager_dashboard(request):
     if request.user.role != "Manager":
         return render(request, "dashboard/403.html", {"message": "Unauthorized access"})
 
-    user = request.user
-    latest = Message.objects.order_by("-created_at").first()
-    announcements = [latest] if latest else []
-
-    projects = Project.objects.select_related("owner").all()
-    tasks = Task.objects.all()
-
-    project_priority_data = (
-        projects.values("priority")
-        .annotate(count=Count("priority"))
-        .order_by("priority")
-    )
-
-    task_status_data = (
-        tasks.values("status")
-        .annotate(count=Count("status"))
-        .order_by("status")
-    )
-
-    total_tasks = tasks.count()
-    completed_tasks = tasks.filter(status="Completed").count()
-    progress_percent = (completed_tasks / total_tasks * 100) if total_tasks else 0
-
     context = {
-        "user": user,
+        "user": request.user,
         "user_role": "Manager",
-        "projects": projects,
-        "tasks": tasks,
-        "projects_count": projects.count(),
-        "tasks_count": tasks.count(),
-        "project_priority_data": list(project_priority_data),
-        "task_status_data": list(task_status_data),
-        "progress_percent": round(progress_percent, 2),
-        "team_summary": CustomUser.objects.filter(role="Team Member"),
+        "projects": _manager_projects,
+        "tasks": Task.objects.all(),
+        "snapshot": _lazy_snapshot(DashboardSnapshot.SCOPE_GLOBAL),
+        "team_summary": CustomUser.objects.filter(role="Team Member").only("id", "username"),
         "pending_projects": Project.objects.none(),
-        "announcements": announcements,
+        "announcements": _latest_announcement,
+        "frag": fragments.generations(),
     }
 
     return render(request, "dashboard/manager_dashboard.html", context)
@@ -117,47 +117,24 @@ def manager_dashboard(request):
 # 🟩 Member Dashboard
 @login_required
 def member_dashboard_view(request, user_id):
-    member = get_object_or_404(CustomUser, id=user_id)
-
-    if request.user != member and request.user.role != "Manager":
-        return render(request, "dashboard/403.html", {"message": "Unauthorized access"})
-
-    assigned_projects = Project.objects.filter(assigned_to=member)
-    tasks = Task.objects.filter(assigned_to=member)
-
-    project_priority_data = (
-        assigned_projects.values("priority")
-        .annotate(count=Count("priority"))
-        .order_by("priority")
-    )
-
-    task_status_data = (
-        tasks.values("status")
-        .annotate(count=Count("status"))
-        .order_by("status")
-    )
-
-    total_tasks = tasks.count()
-    completed_tasks = tasks.filter(status="Completed").count()
-    progress_percent = (completed_tasks / total_tasks * 100) if total_tasks else 0
-
-    latest = Message.objects.order_by("-created_at").first()
-    announcements = [latest] if latest else []
+    if request.user.id == user_id:
+        member = request.user  # id / username come from the session principal
+    else:
+        member = get_object_or_404(CustomUser, id=user_id)
+        if request.user.role != "Manager":
+            return render(request, "dashboard/403.html", {"message": "Unauthorized access"})
 
     context = {
         "member": member,
         "user_role": "Team Member",
         "projects": Project.objects.none(),
-        "assigned_projects": assigned_projects,
-        "tasks": tasks,
-        "projects_count": assigned_projects.count(),
-        "tasks_count": tasks.count(),
-        "project_priority_data": list(project_priority_data),
-        "task_status_data": list(task_status_data),
-        "progress_percent": round(progress_percent, 2),
-        "viewing_as_manager": request.user.role == "Manager" and request.user != member,
-        "announcements": announcements,
+        "assigned_projects": Project.objects.filter(assigned_to=user_id).for_listing("member"),
+        "tasks": Task.objects.filter(assigned_to_id=user_id),
+        "snapshot": _lazy_snapshot(DashboardSnapshot.SCOPE_MEMBER, user_id),
+        "viewing_as_manager": request.user.id != user_id,
+        "announcements": _latest_announcement,
         "user": request.user,
+        "frag": fragments.generations(),
     }
     return render(request, "dashboard/member_dashboard.html", context)
 
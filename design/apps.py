@@ -3,3 +3,6 @@ from django.apps import AppConfig
 class DesignConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'design'
+
+    def ready(self):
+        from . import signals  # noqa: F401  (releases stored design files on delete)
@@ -0,0 +1,41 @@
+from django.core.mail import send_mail
+
+from jobs.queue import job
+from notifications.utils import notify_many
+from .models import DesignUpload
+
+
+def _load(upload_id):
+    upload = (
+        DesignUpload.objects.select_related("project", "uploaded_by")
+        .get(pk=upload_id)
+    )
+    return upload, list(upload.project.assigned_to.all())
+
+
+@job
+def notify_design_upload(upload_id):
+    """In-app notification to every assignee of the project."""
+    upload, assignees = _load(upload_id)
+    project = upload.project
+    notify_many(
+        assignees,
+        message=f"New design uploaded - {project.name} (v{upload.version})",
+        link=f"/design/{project.id}/detail/",
+        project=project,
+    )
+
+
+# Separate job so a mail server hiccup retries the email only, not the notifications
+@job
+def mail_design_upload(upload_id):
+    upload, assignees = _load(upload_id)
+    recipients = [user.email for user in assignees if user.email]
+    if not recipients:
+        return
+    send_mail(
+        subject=f"New Design Uploaded for {upload.project.name}",
+        message=f"A new design version {upload.version} was uploaded by {upload.uploaded_by.username}",
+        from_email="noreply@pms.com",
+        recipient_list=recipients,
+    )
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:58
+
+import backend.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('design', '0003_rename_link_designupload_design_link_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='designupload',
+            name='design_file',
+            field=models.FileField(blank=True, null=True, storage=backend.storage.blob_storage, upload_to='designs/'),
+        ),
+    ]
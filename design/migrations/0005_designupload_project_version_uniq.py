@@ -0,0 +1,44 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:59
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def number_versions(apps, schema_editor):
+    """
+    Give duplicate (project, version) pairs fresh numbers after the
+    project's highest version, then seed Project.design_version.
+    """
+    DesignUpload = apps.get_model("design", "DesignUpload")
+    Project = apps.get_model("projects", "Project")
+
+    project_ids = DesignUpload.objects.values_list("project_id", flat=True).distinct()
+    for project_id in project_ids:
+        uploads = DesignUpload.objects.filter(project_id=project_id).order_by("version", "uploaded_at", "id")
+        top = uploads.aggregate(top=Max("version"))["top"] or 0
+        seen = set()
+        for upload in uploads:
+            if upload.version in seen:
+                top += 1
+                upload.version = top
+                upload.save(update_fields=["version"])
+            seen.add(upload.version)
+        Project.objects.filter(pk=project_id).update(design_version=top)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('design', '0004_content_addressed_storage'),
+        ('projects', '0008_project_design_version'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(number_versions, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='designupload',
+            constraint=models.UniqueConstraint(fields=('project', 'version'), name='design_project_version_uniq'),
+        ),
+    ]
@@ -0,0 +1,97 @@
+# Generated by Django 5.2.7 on 2026-10-18 20:01
+
+import datetime
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.utils.dateparse import parse_datetime
+
+
+def _entry(raw):
+    """Best-effort read of one legacy JSON item: a bare link or a dict."""
+    if isinstance(raw, str):
+        return {"link": raw}
+    if not isinstance(raw, dict):
+        return None
+    when = raw.get("timestamp") or raw.get("uploaded_at") or raw.get("created_at") or raw.get("date")
+    return {
+        "link": str(raw.get("link") or raw.get("url") or "")[:500],
+        "version": raw.get("version") if isinstance(raw.get("version"), int) else None,
+        "user": raw.get("user") or raw.get("uploaded_by") or raw.get("username") or "",
+        "when": _parse_when(when),
+    }
+
+
+def _parse_when(value):
+    """A legacy timestamp as an aware datetime, or None if it cannot be read."""
+    if not isinstance(value, str):
+        return None
+    try:
+        when = parse_datetime(value)
+    except ValueError:  # well formatted but out of range, e.g. month 13
+        return None
+    if when is not None and django.utils.timezone.is_naive(when):
+        when = django.utils.timezone.make_aware(when, datetime.timezone.utc)
+    return when
+
+
+def copy_json_history(apps, schema_editor):
+    Project = apps.get_model("projects", "Project")
+    DesignHistory = apps.get_model("design", "DesignHistory")
+    CustomUser = apps.get_model("accounts", "CustomUser")
+    users = dict(CustomUser.objects.values_list("username", "id"))
+
+    projects = (
+        Project.objects.exclude(design_links=[], design_history=[])
+        .only("id", "created_at", "design_links", "design_history")
+    )
+    for project in projects.iterator():
+        rows, seen_links = [], set()
+        for raw in list(project.design_history or []) + list(project.design_links or []):
+            entry = _entry(raw)
+            if not entry or not (entry["link"] or entry.get("version")):
+                continue
+            if "user" not in entry and entry["link"] in seen_links:
+                continue  # a design_links item already recorded in design_history
+            seen_links.add(entry["link"])
+            name = str(entry.get("user") or "")[:150]
+            rows.append(DesignHistory(
+                project_id=project.id,
+                link=entry["link"],
+                version=entry.get("version"),
+                uploaded_by_id=users.get(name),
+                uploaded_by_name=name,
+                created_at=entry.get("when") or project.created_at,
+            ))
+        DesignHistory.objects.bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('design', '0005_designupload_project_version_uniq'),
+        ('projects', '0009_project_base_manager'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DesignHistory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('link', models.CharField(blank=True, max_length=500)),
+                ('version', models.PositiveIntegerField(blank=True, null=True)),
+                ('uploaded_by_name', models.CharField(blank=True, max_length=150)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='design_history_entries', to='projects.project')),
+                ('uploaded_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at', '-id'],
+                'indexes': [models.Index(fields=['project', '-created_at'], name='design_history_project_idx')],
+            },
+        ),
+        migrations.RunPython(copy_json_history, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-18 21:11
+
+import backend.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('design', '0006_designhistory'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='designupload',
+            name='design_file',
+            field=models.FileField(blank=True, db_index=True, null=True, storage=backend.storage.blob_storage, upload_to='designs/'),
+        ),
+    ]
@@ -1,6 +1,8 @@
 # design/models.py
 from django.db import models
+from django.utils import timezone
 from accounts.models import CustomUser
+from backend.storage import blob_storage
 from projects.models import Project
 
 class DesignUpload(models.Model):
@@ -9,12 +11,42 @@ class DesignUpload(models.Model):
     
     version = models.PositiveIntegerField(default=1)
 
-    design_file = models.FileField(upload_to="designs/", blank=True, null=True)
+    design_file = models.FileField(upload_to="designs/", storage=blob_storage, blank=True, null=True, db_index=True)
     design_link = models.URLField(blank=True, null=True)
 
     notes = models.TextField(blank=True, null=True)
 
     uploaded_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        constraints = [
+            # also serves design_detail's WHERE project = ? ORDER BY version DESC
+            models.UniqueConstraint(fields=["project", "version"], name="design_project_version_uniq"),
+        ]
+
     def __str__(self):
         return f"{self.project.name} - v{self.version}"
+
+
+class DesignHistory(models.Model):
+    """
+    One row per design event on a project (upload, shared link). Replaces
+    the unbounded Project.design_links / design_history JSON lists.
+    """
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name="design_history_entries")
+    link = models.CharField(max_length=500, blank=True)
+    version = models.PositiveIntegerField(null=True, blank=True)
+
+    uploaded_by = models.ForeignKey(CustomUser, on_delete=models.SET_NULL, null=True, blank=True)
+    uploaded_by_name = models.CharField(max_length=150, blank=True)  # kept if the user is deleted
+
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ["-created_at", "-id"]
+        indexes = [
+            models.Index(fields=["project", "-created_at"], name="design_history_project_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.project_id} - {self.link or f'v{self.version}'}"
@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from .models import DesignUpload
+
+
+@receiver(post_delete, sender=DesignUpload)
+def design_upload_deleted(sender, instance, **kwargs):
+    # Shared blobs survive until their last referencing row is gone
+    if instance.design_file:
+        instance.design_file.storage.delete(instance.design_file.name)
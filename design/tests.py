@@ -1,3 +1,100 @@
-from django.test import TestCase
+import threading
+from datetime import date, datetime, timezone
+from importlib import import_module
+from unittest import skipIf
 
-# Create your tests here.
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+
+from accounts.models import CustomUser
+from dashboard import fragments
+from projects.models import Project
+
+from .models import DesignHistory
+from .versions import allocate_version
+
+
+history_migration = import_module("design.migrations.0006_designhistory")
+
+
+class DesignHistoryTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.designer = CustomUser.objects.create_user(username="designer", password="x", role="Design Team")
+        cls.project = Project.objects.create(name="p", owner=cls.designer, delivery_date=date(2024, 1, 1))
+
+    def test_detail_page_shows_uploads_from_the_table(self):
+        self.client.force_login(self.designer)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse("design:upload_design", args=[self.project.id]),
+                {"design_link": "https://example.com/mockup", "notes": ""},
+            )
+        self.assertEqual(response.status_code, 302)
+
+        entry = DesignHistory.objects.get(project=self.project)
+        self.assertEqual((entry.version, entry.uploaded_by_name), (1, "designer"))
+
+        response = self.client.get(reverse("design:design_detail", args=[self.project.id]))
+        self.assertEqual(list(response.context["history"]), [entry])
+        self.assertContains(response, "https://example.com/mockup")
+
+    def test_legacy_timestamps(self):
+        entry = history_migration._entry
+        self.assertEqual(
+            entry({"link": "a", "timestamp": "2024-03-01T10:00:00"})["when"],
+            datetime(2024, 3, 1, 10, tzinfo=timezone.utc),
+        )
+        # Malformed or out-of-range values fall back instead of aborting migrate
+        self.assertIsNone(entry({"link": "a", "timestamp": "2024-13-45T10:00:00"})["when"])
+        self.assertIsNone(entry({"link": "a", "timestamp": "yesterday"})["when"])
+        self.assertIsNone(entry({"link": "a", "timestamp": 1700000000})["when"])
+
+
+class AllocateVersionTests(TransactionTestCase):
+
+    def setUp(self):
+        owner = CustomUser.objects.create_user(username="owner", password="x")
+        self.project = Project.objects.create(name="p", owner=owner, delivery_date=date(2024, 1, 1))
+
+    def test_stale_instances_get_distinct_versions(self):
+        first, second = Project.objects.get(pk=self.project.pk), Project.objects.get(pk=self.project.pk)
+        with transaction.atomic():
+            a = allocate_version(first)
+        with transaction.atomic():
+            b = allocate_version(second)  # still holds design_version 0
+        self.assertEqual((a, b), (1, 2))
+
+    @skipIf(connection.vendor == "sqlite", "SQLite's in-memory test database locks tables, not rows")
+    def test_concurrent_allocations_get_distinct_versions(self):
+        workers = 4
+        barrier = threading.Barrier(workers)
+        versions, errors = [], []
+
+        def allocate():
+            try:
+                project = Project.objects.get(pk=self.project.pk)
+                barrier.wait()
+                with transaction.atomic():
+                    versions.append(allocate_version(project))
+            except Exception as exc:  # surfaced below; a thread cannot fail the test
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=allocate) for _ in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(sorted(versions), [1, 2, 3, 4])
+
+    def test_allocation_keeps_project_fragments(self):
+        tokens = fragments.generations()
+        with transaction.atomic():
+            self.assertEqual(allocate_version(self.project), 1)
+        self.assertEqual(fragments.generations(), tokens)
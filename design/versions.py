@@ -0,0 +1,28 @@
+# design/versions.py
+"""
+Per-project design version numbers.
+
+Project.design_version holds the last number handed out. Allocating the
+next one is a single `UPDATE ... SET design_version = design_version + 1`,
+which row-locks the project until the transaction commits, so two
+concurrent uploads can never receive the same version (and the
+(project, version) unique constraint backs that up).
+"""
+from django.db import transaction
+from django.db.models import F
+
+from projects.models import Project
+
+
+def next_version(project):
+    """Version the next upload will get (for display; not reserved)."""
+    return project.design_version + 1
+
+
+def allocate_version(project):
+    """Reserve the next version; must run inside the transaction that saves the upload."""
+    if not transaction.get_connection().in_atomic_block:
+        raise RuntimeError("allocate_version() must be called inside transaction.atomic()")
+    Project.objects.filter(pk=project.pk).update(design_version=F("design_version") + 1)
+    project.refresh_from_db(fields=["design_version"])
+    return project.design_version
@@ -1,13 +1,16 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
-from django.core.mail import send_mail
 from django.contrib import messages
+from django.db import transaction
 from django.http import HttpResponseForbidden
 from projects.models import Project
-from .models import DesignUpload
+from .models import DesignHistory, DesignUpload
 from .forms import DesignUploadForm
 from accounts.models import CustomUser
-from notifications.utils import notify
+from .jobs import mail_design_upload, notify_design_upload
+from .versions import allocate_version, next_version
+
+HISTORY_LIMIT = 50
 
 
 @login_required
@@ -15,7 +18,7 @@ def design_dashboard(request):
     """
     Only Design Team can upload — others get read-only dashboard
     """
-    projects = Project.objects.all().order_by("-created_at")
+    projects = Project.objects.for_listing("design").order_by("-created_at")
     uploads = DesignUpload.objects.all().order_by("-uploaded_at")
 
     return render(request, "design/dashboard.html", {
@@ -32,32 +35,26 @@ def upload_design(request, project_id):
     if request.user.role != "Design Team":
         return HttpResponseForbidden("You are not allowed to upload designs.")
 
-    last_upload = DesignUpload.objects.filter(project=project).order_by("-version").first()
-    next_version = (last_upload.version + 1) if last_upload else 1
-
     if request.method == "POST":
         form = DesignUploadForm(request.POST, request.FILES)
         if form.is_valid():
             upload = form.save(commit=False)
             upload.project = project
             upload.uploaded_by = request.user
-            upload.version = next_version
-            upload.save()
-
-            if project.assigned_to:
-                notify(
-                    user=project.assigned_to,
-                    message=f"New design uploaded - {project.name} (v{upload.version})",
-                    link=f"/design/{project.id}/detail/"
+            with transaction.atomic():
+                upload.version = allocate_version(project)
+                upload.save()
+                DesignHistory.objects.create(
+                    project=project,
+                    link=upload.design_link or (upload.design_file.url if upload.design_file else ""),
+                    version=upload.version,
+                    uploaded_by=request.user,
+                    uploaded_by_name=request.user.username,
                 )
 
-                send_mail(
-                    subject=f"New Design Uploaded for {project.name}",
-                    message=f"A new design version {upload.version} was uploaded by {request.user.username}",
-                    from_email="noreply@pms.com",
-                    recipient_list=[project.assigned_to.email],
-                    fail_silently=True,
-                )
+            # Notifications and email run as background jobs (jobs/queue.py)
+            notify_design_upload.delay(upload.id)
+            mail_design_upload.delay(upload.id)
 
             messages.success(request, "🎨 Design uploaded successfully!")
             return redirect("design:design_detail", project_id=project.id)
@@ -67,7 +64,7 @@ def upload_design(request, project_id):
     return render(request, "design/upload_design.html", {
         "project": project,
         "form": form,
-        "next_version": next_version,
+        "next_version": next_version(project),
     })
 
 
@@ -75,8 +72,13 @@ def upload_design(request, project_id):
 def design_detail(request, project_id):
     project = get_object_or_404(Project, id=project_id)
     uploads = DesignUpload.objects.filter(project=project).order_by("-version")
+    history = (
+        DesignHistory.objects.filter(project=project)
+        .only("link", "version", "uploaded_by_name", "created_at")[:HISTORY_LIMIT]
+    )
 
     return render(request, "design/design_detail.html", {
         "project": project,
         "uploads": uploads,
+        "history": history,
     })
@@ -0,0 +1,56 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs.queue import process_local_backends, purge_finished, run_pending
+
+
+class Command(BaseCommand):
+    help = "Run queued background jobs (email, notifications) on a thread pool."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=4)
+        parser.add_argument("--batch", type=int, default=20, help="Jobs claimed per poll.")
+        parser.add_argument("--poll", type=float, default=1.0, help="Seconds to sleep when idle.")
+        parser.add_argument("--once", action="store_true", help="Drain due jobs and exit.")
+        parser.add_argument(
+            "--keep-days", type=int, default=7,
+            help="Delete finished jobs older than this many days.",
+        )
+
+    def handle(self, *args, **options):
+        local = process_local_backends()
+        if local:
+            raise CommandError(
+                "Jobs would run against a per-process "
+                + " and ".join(local)
+                + ": their socket pushes and cache updates would not reach the web "
+                "processes. Configure REDIS_URL or CHANNEL_BROKER_SOCKET, and "
+                "CACHE_REDIS_URL or CACHE_DIR, or leave JOBS_RUN_EAGERLY on instead."
+            )
+
+        keep = timedelta(days=options["keep_days"])
+        total = 0
+
+        with ThreadPoolExecutor(max_workers=options["threads"]) as executor:
+            self.stdout.write(f"Job worker started with {options['threads']} thread(s).")
+            last_purge = 0
+            try:
+                while True:
+                    ran = run_pending(executor, options["batch"])
+                    total += ran
+
+                    if time.monotonic() - last_purge > 3600:
+                        purge_finished(keep)
+                        last_purge = time.monotonic()
+
+                    if options["once"] and not ran:
+                        break
+                    if not ran:
+                        time.sleep(options["poll"])
+            except KeyboardInterrupt:
+                pass
+
+        self.stdout.write(self.style.SUCCESS(f"Ran {total} job(s)."))
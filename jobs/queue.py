@@ -0,0 +1,312 @@
+# jobs/queue.py
+"""
+Database-backed job queue for side effects that should not hold up a
+request (email, notifications, socket pushes).
+
+    from jobs.queue import job
+
+    @job(max_attempts=3)
+    def send_welcome(user_id):
+        ...
+
+    send_welcome.delay(user.id)   # queued; runs after the transaction commits
+
+Jobs are rows in jobs.Job, executed by `python manage.py run_jobs`.
+Arguments must be JSON-serialisable, so pass ids rather than model
+instances. A failing job is retried with exponential backoff until
+max_attempts, then left as "failed" with its traceback.
+
+While a job runs, its lock is renewed every HEARTBEAT_INTERVAL, so only
+a job whose worker has really gone away is taken over by another one.
+
+With settings.JOBS_RUN_EAGERLY the web process runs its own jobs
+instead. That is the default unless the channel layer and the cache are
+shared between processes: a separate worker's socket pushes and cache
+updates would otherwise never reach the web processes (see
+process_local_backends). On commit the job is handed to a pool of
+JOBS_EAGER_THREADS threads, so the response does not wait for it, and a
+sweeper thread claims due retries (and jobs left behind by a process
+that exited) every JOBS_EAGER_POLL seconds. With JOBS_EAGER_THREADS = 0
+(the test suite) the job runs inline on commit and a failure is retried
+straight away until max_attempts, so no job is left pending.
+"""
+import logging
+import os
+import socket
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Job
+
+
+logger = logging.getLogger(__name__)
+
+BACKOFF_BASE = 10           # seconds before the first retry
+BACKOFF_MAX = 60 * 60       # never wait more than an hour between attempts
+LOCK_TIMEOUT = 60 * 15      # a "running" job not renewed for this long is presumed orphaned
+HEARTBEAT_INTERVAL = 60     # how often a running job renews its lock
+
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+_registry = {}
+
+_eager_pool = None
+_eager_stop = None
+_eager_lock = threading.Lock()
+
+
+class UnknownJob(LookupError):
+    pass
+
+
+def job(func=None, *, max_attempts=5):
+    """Register `func` as a job and give it a `.delay(*args, **kwargs)`."""
+
+    def register(func):
+        name = f"{func.__module__}.{func.__qualname__}"
+        _registry[name] = func
+        func.job_name = name
+        func.max_attempts = max_attempts
+        func.delay = lambda *args, **kwargs: enqueue(func, *args, **kwargs)
+        return func
+
+    return register(func) if func is not None else register
+
+
+def enqueue(func, *args, **kwargs):
+    """Insert a Job row; execution waits until the surrounding transaction commits."""
+    entry = Job.objects.create(
+        name=func.job_name,
+        args=list(args),
+        kwargs=kwargs,
+        max_attempts=func.max_attempts,
+    )
+    if getattr(settings, "JOBS_RUN_EAGERLY", False):
+        transaction.on_commit(lambda: _dispatch(entry.id))
+    return entry
+
+
+# -----------------------------------------------------
+# Eager mode (no separate worker)
+# -----------------------------------------------------
+def _dispatch(pk):
+    if settings.JOBS_EAGER_THREADS:
+        _eager_executor().submit(_run_eagerly_in_thread, pk)
+    else:
+        _run_eagerly(pk)
+
+
+def _run_eagerly(pk):
+    # Claimed like a worker would, so a worker polling too cannot run it again
+    if not _take(pk, Job.STATUS_PENDING, timezone.now()):
+        return
+    status = run_job(pk)
+    if not settings.JOBS_EAGER_THREADS:
+        while status == Job.STATUS_PENDING:  # nothing polls for the retry
+            Job.objects.filter(pk=pk).update(status=Job.STATUS_RUNNING, locked_by=WORKER_ID)
+            status = run_job(pk)
+
+
+def _run_eagerly_in_thread(pk):
+    close_old_connections()
+    try:
+        _run_eagerly(pk)
+    except Exception:
+        logger.exception("Could not run job %s", pk)
+    finally:
+        close_old_connections()
+
+
+def _sweep(stop):
+    """Claim due jobs (retries, or left behind by an exited process) until `stop` is set."""
+    while not stop.wait(settings.JOBS_EAGER_POLL):
+        try:
+            with _eager_lock:
+                pool = _eager_pool
+            if pool is None:
+                break
+            for pk in claim(settings.JOBS_EAGER_THREADS):
+                pool.submit(_run_in_thread, pk)
+        except Exception:
+            logger.exception("Job sweep failed")
+        finally:
+            close_old_connections()
+
+
+def _eager_executor():
+    """This process's job threads and sweeper, started on first use."""
+    global _eager_pool, _eager_stop
+    with _eager_lock:
+        if _eager_pool is None:
+            _eager_pool = ThreadPoolExecutor(settings.JOBS_EAGER_THREADS, thread_name_prefix="jobs")
+            _eager_stop = threading.Event()
+            threading.Thread(target=_sweep, args=(_eager_stop,), name="jobs-sweep", daemon=True).start()
+        return _eager_pool
+
+
+def stop_eager_executor(wait=True):
+    """Stop the sweeper and the job threads (they are started again on the next job)."""
+    global _eager_pool, _eager_stop
+    with _eager_lock:
+        pool, stop = _eager_pool, _eager_stop
+        _eager_pool = _eager_stop = None
+    if pool is not None:
+        stop.set()
+        pool.shutdown(wait=wait)
+
+
+def process_local_backends():
+    """
+    Which of the default channel layer / cache live in process memory.
+    A worker process using them can neither reach the web processes'
+    sockets nor expire what they cache, so run_jobs refuses to start.
+    """
+    local = []
+    layer = settings.CHANNEL_LAYERS.get("default", {}).get("BACKEND", "")
+    if layer == "channels.layers.InMemoryChannelLayer":
+        local.append(f"channel layer ({layer})")
+    if isinstance(caches["default"], (LocMemCache, DummyCache)):
+        local.append(f"cache ({settings.CACHES['default']['BACKEND']})")
+    return local
+
+
+def resolve(name):
+    if name not in _registry:
+        # The worker may not have imported the module yet
+        try:
+            import_string(name)
+        except ImportError:
+            pass
+    try:
+        return _registry[name]
+    except KeyError:
+        raise UnknownJob(name) from None
+
+
+def backoff(attempts):
+    return timedelta(seconds=min(BACKOFF_BASE * 2 ** (attempts - 1), BACKOFF_MAX))
+
+
+# -----------------------------------------------------
+# Worker side
+# -----------------------------------------------------
+def _due(now):
+    return (
+        Q(status=Job.STATUS_PENDING, run_at__lte=now)
+        | Q(status=Job.STATUS_RUNNING, locked_at__lt=now - timedelta(seconds=LOCK_TIMEOUT))
+    )
+
+
+def _take(pk, status, now):
+    return Job.objects.filter(pk=pk, status=status).filter(_due(now)).update(
+        status=Job.STATUS_RUNNING,
+        locked_by=WORKER_ID,
+        locked_at=now,
+        updated_at=now,
+    )
+
+
+def claim(limit):
+    """
+    Atomically take up to `limit` due jobs for this worker. The status
+    check in the UPDATE makes the claim safe with several workers and
+    does not need SELECT ... FOR UPDATE SKIP LOCKED support.
+    """
+    now = timezone.now()
+    return [
+        pk
+        for pk, status in Job.objects.filter(_due(now)).values_list("pk", "status")[:limit]
+        if _take(pk, status, now)
+    ]
+
+
+@contextmanager
+def _heartbeat(pk):
+    """Renew the job's lock every HEARTBEAT_INTERVAL until the block exits."""
+    stop = threading.Event()
+
+    def beat():
+        try:
+            while not stop.wait(HEARTBEAT_INTERVAL):
+                Job.objects.filter(
+                    pk=pk, status=Job.STATUS_RUNNING, locked_by=WORKER_ID
+                ).update(locked_at=timezone.now())
+        finally:
+            connection.close()  # this thread's own connection, if it opened one
+
+    thread = threading.Thread(target=beat, name=f"job-{pk}-heartbeat", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def run_job(pk):
+    """Execute one job and record the outcome. Returns the final status."""
+    entry = Job.objects.get(pk=pk)
+    entry.attempts += 1
+    try:
+        with _heartbeat(entry.pk):
+            resolve(entry.name)(*entry.args, **entry.kwargs)
+    except Exception:
+        entry.last_error = traceback.format_exc()
+        if entry.attempts >= entry.max_attempts:
+            entry.status = Job.STATUS_FAILED
+            logger.exception("Job %s (%s) failed permanently", entry.pk, entry.name)
+        else:
+            entry.status = Job.STATUS_PENDING
+            entry.run_at = timezone.now() + backoff(entry.attempts)
+            logger.warning("Job %s (%s) failed, retry %d/%d at %s",
+                           entry.pk, entry.name, entry.attempts,
+                           entry.max_attempts, entry.run_at)
+    else:
+        entry.status = Job.STATUS_DONE
+        entry.last_error = ""
+
+    entry.locked_by = ""
+    entry.locked_at = None
+    entry.save(update_fields=[
+        "attempts", "status", "run_at", "last_error",
+        "locked_by", "locked_at", "updated_at",
+    ])
+    return entry.status
+
+
+def _run_in_thread(pk):
+    # Pool threads keep their own DB connections; recycle them like a request would
+    close_old_connections()
+    try:
+        return run_job(pk)
+    finally:
+        close_old_connections()
+
+
+def run_pending(executor, limit):
+    """Claim a batch of due jobs and run them on `executor`. Returns how many ran."""
+    pks = claim(limit)
+    for _ in executor.map(_run_in_thread, pks):
+        pass
+    return len(pks)
+
+
+def purge_finished(older_than):
+    """Delete done jobs last touched before `older_than` (a timedelta)."""
+    deleted, _ = Job.objects.filter(
+        status=Job.STATUS_DONE,
+        updated_at__lt=timezone.now() - older_than,
+    ).delete()
+    return deleted
@@ -0,0 +1,199 @@
+import threading
+import time
+from datetime import timedelta
+from unittest import mock
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from . import queue
+from .models import Job
+from .queue import job
+
+
+calls = []
+
+
+@job(max_attempts=2)
+def record(value):
+    calls.append(value)
+
+
+@job(max_attempts=2)
+def explode():
+    raise RuntimeError("boom")
+
+
+@job
+def record_thread():
+    calls.append(threading.current_thread().name)
+
+
+@override_settings(JOBS_RUN_EAGERLY=False)
+class QueueTests(TestCase):
+
+    def setUp(self):
+        calls.clear()
+
+    def add(self, func, *args, **fields):
+        entry = queue.enqueue(func, *args)
+        Job.objects.filter(pk=entry.pk).update(**fields)
+        return entry.pk
+
+    def status(self, pk):
+        return Job.objects.get(pk=pk).status
+
+    def test_claim_takes_due_jobs_once(self):
+        due = self.add(record, 1)
+        later = self.add(record, 2, run_at=timezone.now() + timedelta(minutes=5))
+
+        self.assertEqual(queue.claim(10), [due])
+        self.assertEqual(queue.claim(10), [])
+        entry = Job.objects.get(pk=due)
+        self.assertEqual((entry.status, entry.locked_by), (Job.STATUS_RUNNING, queue.WORKER_ID))
+        self.assertEqual(self.status(later), Job.STATUS_PENDING)
+
+    def test_claim_respects_limit(self):
+        for n in range(3):
+            self.add(record, n)
+        self.assertEqual(len(queue.claim(2)), 2)
+        self.assertEqual(len(queue.claim(2)), 1)
+
+    def test_success(self):
+        pk = self.add(record, "x")
+        queue.claim(1)
+        self.assertEqual(queue.run_job(pk), Job.STATUS_DONE)
+        self.assertEqual(calls, ["x"])
+        entry = Job.objects.get(pk=pk)
+        self.assertEqual((entry.attempts, entry.locked_by, entry.locked_at), (1, "", None))
+
+    def test_retry_with_backoff_then_fail(self):
+        pk = self.add(explode)
+        queue.claim(1)
+        before = timezone.now()
+        self.assertEqual(queue.run_job(pk), Job.STATUS_PENDING)
+
+        entry = Job.objects.get(pk=pk)
+        self.assertEqual(entry.attempts, 1)
+        self.assertIn("RuntimeError: boom", entry.last_error)
+        self.assertGreaterEqual(entry.run_at, before + queue.backoff(1))
+        self.assertEqual(queue.claim(1), [])  # not due yet
+
+        Job.objects.filter(pk=pk).update(run_at=timezone.now())
+        self.assertEqual(queue.claim(1), [pk])
+        self.assertEqual(queue.run_job(pk), Job.STATUS_FAILED)
+        self.assertEqual(queue.claim(1), [])
+
+    def test_reclaims_only_expired_locks(self):
+        now = timezone.now()
+        alive = self.add(
+            record, 1, status=Job.STATUS_RUNNING, locked_by="other:1",
+            locked_at=now - timedelta(seconds=queue.LOCK_TIMEOUT - 60),
+        )
+        orphaned = self.add(
+            record, 2, status=Job.STATUS_RUNNING, locked_by="other:2",
+            locked_at=now - timedelta(seconds=queue.LOCK_TIMEOUT + 60),
+        )
+
+        self.assertEqual(queue.claim(10), [orphaned])
+        self.assertEqual(Job.objects.get(pk=alive).locked_by, "other:1")
+        self.assertEqual(Job.objects.get(pk=orphaned).locked_by, queue.WORKER_ID)
+
+    @override_settings(JOBS_RUN_EAGERLY=True)
+    def test_eager_run_claims_first(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            first = record.delay("eager")
+        self.assertEqual(calls, ["eager"])
+        self.assertEqual(self.status(first.pk), Job.STATUS_DONE)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second = record.delay("worker")
+            queue.claim(10)  # a worker got there first
+        self.assertEqual(calls, ["eager"])
+        self.assertEqual(self.status(second.pk), Job.STATUS_RUNNING)
+
+
+# The heartbeat and the command's pool threads use their own connections,
+# which must see committed rows.
+@override_settings(JOBS_RUN_EAGERLY=False)
+class HeartbeatTests(TransactionTestCase):
+
+    def test_running_job_renews_its_lock(self):
+        pk = queue.enqueue(record, 1).pk
+        queue.claim(1)
+        claimed_at = Job.objects.get(pk=pk).locked_at
+
+        with mock.patch.object(queue, "HEARTBEAT_INTERVAL", 0.05):
+            with queue._heartbeat(pk):
+                time.sleep(0.3)  # a long job; no reads here while the heartbeat writes
+
+        self.assertGreater(Job.objects.get(pk=pk).locked_at, claimed_at)
+        self.assertEqual(queue.claim(1), [])
+
+
+@override_settings(JOBS_RUN_EAGERLY=False)
+class RunJobsCommandTests(TransactionTestCase):
+
+    def setUp(self):
+        calls.clear()
+
+    @override_settings(
+        CHANNEL_LAYERS={"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}},
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+    )
+    def test_refuses_process_local_backends(self):
+        with self.assertRaisesMessage(CommandError, "channel layer"):
+            call_command("run_jobs", "--once")
+
+    @override_settings(
+        CHANNEL_LAYERS={"default": {"BACKEND": "backend.layers.LocalBrokerChannelLayer"}},
+        CACHES={"default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": "/tmp/pms-test-cache",
+        }},
+    )
+    def test_runs_with_shared_backends(self):
+        pk = queue.enqueue(record, "cmd").pk
+        call_command("run_jobs", "--once", "--threads", "1", stdout=open("/dev/null", "w"))
+        self.assertEqual(Job.objects.get(pk=pk).status, Job.STATUS_DONE)
+        self.assertEqual(calls, ["cmd"])
+
+
+@override_settings(JOBS_RUN_EAGERLY=True)
+class EagerJobTests(TransactionTestCase):
+
+    def setUp(self):
+        calls.clear()
+
+    def wait_for(self, pk, status):
+        deadline = time.monotonic() + 5
+        while Job.objects.get(pk=pk).status != status and time.monotonic() < deadline:
+            time.sleep(0.02)
+        return Job.objects.get(pk=pk)
+
+    @override_settings(JOBS_EAGER_THREADS=0)
+    def test_inline_failure_is_retried_then_failed(self):
+        with transaction.atomic():
+            pk = explode.delay().pk
+            self.assertEqual(Job.objects.get(pk=pk).attempts, 0)  # nothing before commit
+
+        entry = Job.objects.get(pk=pk)
+        self.assertEqual((entry.status, entry.attempts), (Job.STATUS_FAILED, 2))
+        self.assertIn("RuntimeError: boom", entry.last_error)
+
+    @override_settings(JOBS_EAGER_THREADS=2, JOBS_EAGER_POLL=0.05)
+    def test_pool_runs_jobs_off_the_request_and_retries_them(self):
+        self.addCleanup(queue.stop_eager_executor)
+
+        pk = record_thread.delay().pk
+        self.assertEqual(self.wait_for(pk, Job.STATUS_DONE).status, Job.STATUS_DONE)
+        self.assertEqual(len(calls), 1)
+        self.assertNotEqual(calls[0], threading.current_thread().name)
+
+        with mock.patch.object(queue, "backoff", return_value=timedelta(0)):
+            pk = explode.delay().pk
+            entry = self.wait_for(pk, Job.STATUS_FAILED)  # the retry came from the sweeper
+        self.assertEqual((entry.status, entry.attempts), (Job.STATUS_FAILED, 2))
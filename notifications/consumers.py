@@ -1,25 +0,0 @@
-import json
-from channels.generic.websocket import AsyncWebsocketConsumer
-
-class NotificationConsumer(AsyncWebsocketConsumer):
-    async def connect(self):
-        self.user_id = self.scope["url_route"]["kwargs"]["user_id"]
-        self.group_name = f"notif_{self.user_id}"
-
-        await self.channel_layer.group_add(
-            self.group_name,
-            self.channel_name,
-        )
-        await self.accept()
-
-    async def disconnect(self, close_code):
-        await self.channel_layer.group_discard(
-            self.group_name,
-            self.channel_name,
-        )
-
-    async def send_notification(self, event):
-        await self.send(text_data=json.dumps({
-            "message": event["message"],
-            "link": event["link"]
-        }))
@@ -5,12 +5,24 @@ from projects.models import Project
 class Notification(models.Model):
     user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name="notifications")
     message = models.CharField(max_length=300)
+    link = models.CharField(max_length=300, blank=True, null=True)
     project = models.ForeignKey(Project, on_delete=models.CASCADE, null=True, blank=True)
     is_read = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # notification list: WHERE user = ? ORDER BY created_at DESC
+            models.Index(fields=["user", "-created_at"], name="notif_user_created_idx"),
+            # unread badge / dropdown. Partial, so it only holds unread rows;
+            # MySQL cannot build partial indexes and uses the one above.
+            models.Index(
+                fields=["user", "-created_at"],
+                condition=models.Q(is_read=False),
+                name="notif_user_unread_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.message}"
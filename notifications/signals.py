@@ -0,0 +1,12 @@
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from .models import Notification
+from .unread import adjust_unread
+
+
+@receiver(post_delete, sender=Notification)
+def notification_deleted(sender, instance, **kwargs):
+    # Also reached through cascades (a deleted project or user)
+    if not instance.is_read:
+        adjust_unread(instance.user_id, -1)
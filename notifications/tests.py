@@ -1,3 +1,98 @@
+from datetime import date
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import transaction
 from django.test import TestCase
+from django.urls import reverse
+
+from accounts.models import CustomUser
+from projects.models import Project
+
+from .models import Notification
+from .unread import unread_count
+from .utils import notify, notify_many
+
+
+class UnreadCounterTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(username="member", password="x")
+        cls.other = CustomUser.objects.create_user(username="other", password="x")
+        cls.project = Project.objects.create(name="p", owner=cls.other, delivery_date=date(2024, 1, 1))
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def cached(self, user=None):
+        return cache.get(f"notif_unread:{(user or self.user).id}")
+
+    def notify(self, *args, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return notify(self.user, "hello", *args, **kwargs)
+
+    def test_counter_moves_on_commit(self):
+        self.assertEqual(unread_count(self.user.id), 0)
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            notify(self.user, "hello")
+            notify_many([self.user, self.other, self.user], "to many")
+            self.assertEqual(self.cached(), 0)  # not before the commit
+        self.assertTrue(callbacks)
+        self.assertEqual(self.cached(), 2)
+        self.assertEqual(unread_count(self.other.id), 1)
+
+    def test_rollback_leaves_the_counter(self):
+        self.assertEqual(unread_count(self.user.id), 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    notify(self.user, "hello")
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertEqual(self.cached(), 0)
+        self.assertFalse(Notification.objects.exists())
+
+    def test_read_and_deleted_notifications(self):
+        first = self.notify()
+        self.notify(project=self.project)
+        read = self.notify(project=self.project)
+        self.assertEqual(unread_count(self.user.id), 3)
+
+        self.client.force_login(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.get(reverse("notifications:mark_read", args=[read.id]))
+        self.assertEqual(self.cached(), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project.delete()  # cascades to one unread and one read notification
+        self.assertEqual(self.cached(), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertEqual(self.cached(), 0)
+
+    def test_read_pushes_the_remaining_items(self):
+        kept = self.notify()
+        read = self.notify()
+
+        self.client.force_login(self.user)
+        with mock.patch("notifications.utils.publish") as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.get(reverse("notifications:mark_read", args=[read.id]))
+                publish.assert_not_called()  # not before the commit
+
+        (group, event_type), payload = publish.call_args
+        self.assertEqual((group, event_type), (f"notif_{self.user.id}", "unread_update"))
+        self.assertEqual(payload["count"], 1)
+        self.assertEqual([item["id"] for item in payload["items"]], [kept.id])
 
-# Create your tests here.
+    async def test_async_unread_endpoint(self):
+        note = await sync_to_async(self.notify)()
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse("notifications:unread"))
+        self.assertEqual(response.json()["count"], 1)
+        self.assertEqual([item["id"] for item in response.json()["items"]], [note.id])
@@ -0,0 +1,122 @@
+# notifications/unread.py
+"""
+Per-user unread notification counter, kept in the cache so the navbar
+badge does not need a COUNT(*) on every page / socket connect.
+
+The cached value is adjusted in place when notifications are created,
+read or deleted, once the change has committed (a rollback must not
+move it); if it is missing (expired, evicted, never computed) the next read
+recounts it from the database. Only the process that made the change
+adjusts a per-process cache, so there the counter is kept for
+LOCAL_CACHE_TTL seconds instead (settings.SHARED_CACHE).
+"""
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+
+from .models import Notification
+
+
+UNREAD_TTL = 60 * 30
+LATEST_LIMIT = 10
+
+
+def _key(user_id):
+    return f"notif_unread:{user_id}"
+
+
+def _ttl():
+    return UNREAD_TTL if settings.SHARED_CACHE else settings.LOCAL_CACHE_TTL
+
+
+def unread_count(user_id):
+    count = cache.get(_key(user_id))
+    if count is None or count < 0:
+        count = Notification.objects.filter(user_id=user_id, is_read=False).count()
+        cache.set(_key(user_id), count, _ttl())
+    return count
+
+
+async def aunread_count(user_id):
+    count = await cache.aget(_key(user_id))
+    if count is None or count < 0:
+        count = await Notification.objects.filter(user_id=user_id, is_read=False).acount()
+        await cache.aset(_key(user_id), count, _ttl())
+    return count
+
+
+def unread_counts(user_ids):
+    """{user_id: count} for many users: one cache round trip, one grouped recount for misses."""
+    keys = {_key(user_id): user_id for user_id in user_ids}
+    cached = cache.get_many(keys)
+    counts = {keys[key]: value for key, value in cached.items() if value >= 0}
+
+    missing = [user_id for user_id in keys.values() if user_id not in counts]
+    if missing:
+        recounted = dict.fromkeys(missing, 0)
+        recounted.update(
+            Notification.objects.filter(user_id__in=missing, is_read=False)
+            .order_by()
+            .values_list("user_id")
+            .annotate(n=Count("id"))
+        )
+        cache.set_many({_key(user_id): n for user_id, n in recounted.items()}, _ttl())
+        counts.update(recounted)
+    return counts
+
+
+def adjust_unread(user_id, delta):
+    """Shift the cached counter after the current transaction commits."""
+    transaction.on_commit(partial(_adjust, user_id, delta))
+
+
+def _adjust(user_id, delta):
+    # A missing counter is simply recounted later
+    try:
+        if delta >= 0:
+            cache.incr(_key(user_id), delta)
+        else:
+            cache.decr(_key(user_id), -delta)
+    except ValueError:
+        pass
+
+
+def forget_unread(user_id):
+    cache.delete(_key(user_id))
+
+
+def serialize(note):
+    return {
+        "id": note.id,
+        "message": note.message,
+        "link": note.link or "#",
+        "created_at": note.created_at.strftime("%Y-%m-%d %H:%M"),
+    }
+
+
+def _latest_unread(user_id, limit):
+    return (
+        Notification.objects.filter(user_id=user_id, is_read=False)
+        .only("id", "message", "link", "created_at")
+        .order_by("-created_at")[:limit]
+    )
+
+
+def latest_unread(user_id, limit=LATEST_LIMIT):
+    return [serialize(n) for n in _latest_unread(user_id, limit)]
+
+
+def unread_summary(user_id, limit=LATEST_LIMIT):
+    """Badge payload: cached count + the newest `limit` unread items."""
+    return {"count": unread_count(user_id), "items": latest_unread(user_id, limit)}
+
+
+async def aunread_summary(user_id, limit=LATEST_LIMIT):
+    """unread_summary() for async views."""
+    return {
+        "count": await aunread_count(user_id),
+        "items": [serialize(n) async for n in _latest_unread(user_id, limit)],
+    }
@@ -1,21 +1,75 @@
-from channels.layers import get_channel_layer
-from asgiref.sync import async_to_sync
+from functools import partial
+
+from django.db import transaction
+
+from backend.realtime import publish, publish_many, user_group
 from .models import Notification
+from .unread import adjust_unread, serialize, unread_count, unread_counts, unread_summary
+
 
-def notify(user, message, link=None):
-    Notification.objects.create(
+def notify(user, message, link=None, project=None):
+    note = Notification.objects.create(
         user=user,
         message=message,
-        link=link
+        link=link,
+        project=project,
     )
+    adjust_unread(user.id, 1)
+
+    # After the counter moved, and never for a notification that was rolled back
+    transaction.on_commit(lambda: publish(
+        user_group(user.id),
+        "send_notification",
+        message=message,
+        link=link or "",
+        item=serialize(note),
+        count=unread_count(user.id),
+    ))
+    return note
+
+
+def notify_many(users, message, link=None, project=None):
+    """
+    notify() for many recipients: one INSERT for all rows and one batched
+    channel-layer dispatch. Duplicate users are notified once.
+    """
+    recipients = list({user.id: user for user in users}.values())
+    if not recipients:
+        return []
+
+    notes = Notification.objects.bulk_create([
+        Notification(user=user, message=message, link=link, project=project)
+        for user in recipients
+    ])
+    for user in recipients:
+        adjust_unread(user.id, 1)
+    transaction.on_commit(partial(_publish_new, notes, message, link))
+    return notes
+
+
+def _publish_new(notes, message, link):
+    counts = unread_counts([note.user_id for note in notes])
+    publish_many([
+        (
+            user_group(note.user_id),
+            "send_notification",
+            {
+                "message": message,
+                "link": link or "",
+                "item": serialize(note),
+                "count": counts[note.user_id],
+            },
+        )
+        for note in notes
+    ])
 
-    channel_layer = get_channel_layer()
 
-    async_to_sync(channel_layer.group_send)(
-        f"notif_{user.id}",
-        {
-            "type": "send_notification",
-            "message": message,
-            "link": link or "",
-        }
+def push_unread_count(user_id):
+    """
+    Tell the user's open sockets the unread set changed (e.g. after a read):
+    the new count and the latest items, so read ones leave the dropdown.
+    Sent once the change has committed, after the counter moved.
+    """
+    transaction.on_commit(
+        lambda: publish(user_group(user_id), "unread_update", **unread_summary(user_id))
     )
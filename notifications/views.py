@@ -2,6 +2,8 @@ from django.http import JsonResponse
 from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
 from .models import Notification
+from .unread import adjust_unread, aunread_summary
+from .utils import push_unread_count
 
 @login_required
 def notification_list(request):
@@ -10,24 +12,23 @@ def notification_list(request):
     return render(request, "notifications/list.html", {"notifications": notifications})
 
 @login_required
-def get_unread_notifications(request):
-    """API endpoint for unread badge count"""
-    notes = Notification.objects.filter(user=request.user, is_read=False)
-
-    return JsonResponse({
-        "count": notes.count(),
-        "items": [
-            {
-                "id": n.id,
-                "message": n.message,
-                "link": n.link or "#",
-                "created_at": n.created_at.strftime("%Y-%m-%d %H:%M")
-            }
-            for n in notes
-        ]
-    })
+async def get_unread_notifications(request):
+    """
+    API endpoint for unread badge count.
+    Fallback for browsers without a socket; the badge is normally pushed
+    over the WebSocket (see backend/consumers.py).
+    """
+    user = await request.auser()
+    return JsonResponse(await aunread_summary(user.id))
 
 @login_required
 def mark_as_read(request, note_id):
-    Notification.objects.filter(id=note_id, user=request.user).update(is_read=True)
+    updated = Notification.objects.filter(
+        id=note_id, user=request.user, is_read=False
+    ).update(is_read=True)
+
+    if updated:
+        adjust_unread(request.user.id, -updated)
+        push_unread_count(request.user.id)
+
     return JsonResponse({"success": True})
@@ -1,14 +1,23 @@
 from django.http import JsonResponse
-from django.shortcuts import get_object_or_404
+from django.shortcuts import aget_object_or_404
 from django.contrib.auth.decorators import login_required
+from backend.conditional import conditional_on_updated_at, loaded
 from .models import Project
+from .pagination import InvalidCursor, filter_projects, paginate, visible_projects
 
 @login_required
-def project_api(request, pk):
+@conditional_on_updated_at(Project, visible=visible_projects)
+async def project_api(request, pk):
     """
-    Returns full project data for modal display
+    Returns full project data for modal display.
+    Sends ETag / Last-Modified from updated_at; revalidations that still
+    match get a 304 before the project is loaded. The manager and members
+    are sent as ids: a renamed user does not move the project's updated_at.
     """
-    project = get_object_or_404(Project, pk=pk)
+    user = await request.auser()
+    project = await aget_object_or_404(visible_projects(user), pk=pk)
+    loaded(request, project)
+    assigned_to = [user_id async for user_id in project.assigned_to.order_by("pk").values_list("pk", flat=True)]
 
     return JsonResponse({
         "id": project.id,
@@ -18,9 +27,43 @@ def project_api(request, pk):
         "priority": project.priority,
         "completion": project.completion,
         "progress_color": project.get_progress_color(),
-        "assigned_to": project.assigned_to.username if project.assigned_to else None,
-        "manager": project.owner.username if project.owner else None,
+        "assigned_to": assigned_to,
+        "manager": project.owner_id,
         "live_link": project.live_link,
         "assigned_date": project.assigned_date.strftime("%Y-%m-%d") if project.assigned_date else None,
         "delivery_date": project.delivery_date.strftime("%Y-%m-%d") if project.delivery_date else None,
     })
+
+
+@login_required
+def project_list_api(request):
+    """
+    Cursor-paginated project list.
+    Accepts the same filters as the list page (q, status, priority, owner,
+    assignee, delivery_from, delivery_to, sort) plus `cursor` and `limit`.
+    """
+    projects = filter_projects(
+        visible_projects(request.user).select_related("owner"), request.GET
+    )
+    try:
+        page, next_cursor = paginate(projects, request.GET)
+    except InvalidCursor as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    return JsonResponse({
+        "results": [
+            {
+                "id": p.id,
+                "name": p.name,
+                "status": p.status,
+                "priority": p.priority,
+                "completion": p.completion,
+                "progress_color": p.get_progress_color(),
+                "manager": p.owner.username if p.owner else None,
+                "assigned_date": p.assigned_date.strftime("%Y-%m-%d") if p.assigned_date else None,
+                "delivery_date": p.delivery_date.strftime("%Y-%m-%d") if p.delivery_date else None,
+            }
+            for p in page
+        ],
+        "next_cursor": next_cursor,
+    })
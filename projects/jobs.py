@@ -0,0 +1,127 @@
+import logging
+import multiprocessing
+import posixpath
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.core.files import File
+from django.urls import reverse
+
+from accounts.models import CustomUser
+from backend.realtime import publish_project_update
+from jobs.queue import job
+from notifications.utils import notify_many
+from . import uploads
+from .models import Project, ProjectImage
+from .renditions import render_path, save_files
+
+
+logger = logging.getLogger(__name__)
+
+INLINE_BATCH_SIZE = 2  # smaller batches render in the job worker itself
+
+# The process pool belongs to a run_jobs worker. An eager job runs on a
+# thread of a web process (off the request, see jobs.queue), where each
+# server process would otherwise start a pool of its own; it renders inline.
+
+_render_pool = None
+_render_pool_lock = threading.Lock()
+
+
+@job
+def announce_assignment(project_id, user_ids):
+    """Notify newly assigned members and push the change to project followers."""
+    project = Project.objects.get(pk=project_id)
+    assignees = list(CustomUser.objects.filter(id__in=user_ids))
+
+    notify_many(
+        assignees,
+        f"You have been assigned to project: {project.name}",
+        link=reverse("projects:project_detail", args=[project.id]),
+        project=project,
+    )
+    publish_project_update(project, assigned=[user.username for user in assignees])
+
+
+def _pool():
+    """The worker's render pool, started on first use and kept for every later job."""
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is None:
+            # spawn, not fork: the worker process is multi-threaded
+            _render_pool = ProcessPoolExecutor(
+                settings.IMAGE_PROCESS_WORKERS, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _render_pool
+
+
+def _render_all(paths):
+    global _render_pool
+    if (
+        settings.JOBS_RUN_EAGERLY
+        or len(paths) <= INLINE_BATCH_SIZE
+        or settings.IMAGE_PROCESS_WORKERS <= 1
+    ):
+        return [render_path(path) for path in paths]
+    try:
+        return list(_pool().map(render_path, paths))
+    except BrokenProcessPool:
+        # a child died (e.g. killed for memory); the job is retried on a fresh pool
+        with _render_pool_lock:
+            if _render_pool is not None:
+                _render_pool.shutdown(wait=False)
+            _render_pool = None
+        raise
+
+
+@job(max_attempts=3)
+def process_image_uploads(project_id, user_id, upload_ids):
+    """
+    Validate and render a batch of finished chunked uploads (in the
+    run_jobs worker's process pool unless the batch is small), store the originals
+    and renditions, then insert every ProjectImage row with one bulk_create.
+    Anything that is not a JPEG, PNG, GIF or WebP image is rejected.
+    """
+    project = Project.objects.get(pk=project_id)
+    sessions = []
+    for upload_id in upload_ids:
+        try:
+            meta = uploads.load(upload_id, project=project)
+        except uploads.UploadError:
+            continue  # already processed by an earlier attempt
+        if meta["offset"] == meta["size"]:
+            sessions.append(meta)
+    if not sessions:
+        return
+
+    rendered = _render_all([meta["path"] for meta in sessions])
+
+    storage = ProjectImage._meta.get_field("image").storage
+    rows, rejected = [], []
+    for meta, result in zip(sessions, rendered):
+        if result is None:
+            rejected.append(meta["filename"])
+            continue
+        extension, result = result
+        stem = posixpath.splitext(meta["filename"])[0]
+        with open(meta["path"], "rb") as part:
+            name = storage.save(f"project_images/{stem}.{extension}", File(part))
+        width, height, renditions = save_files(storage, name, result)
+        rows.append(ProjectImage(
+            project=project,
+            image=name,
+            uploaded_by_id=user_id,
+            width=width,
+            height=height,
+            renditions=renditions,
+        ))
+
+    ProjectImage.objects.bulk_create(rows)
+    for meta in sessions:
+        uploads.discard(meta["upload_id"])
+
+    if rejected:
+        logger.warning("Rejected unsupported uploads for project %s: %s", project_id, rejected)
+    publish_project_update(project, images_added=len(rows), images_rejected=rejected)
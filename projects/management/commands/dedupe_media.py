@@ -0,0 +1,55 @@
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+from backend.storage import BLOB_NAME, blob_storage
+
+
+class Command(BaseCommand):
+    help = (
+        "Move uploads stored under their original names into the content-addressed "
+        "layout, collapsing duplicate copies into one blob."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **options):
+        storage = blob_storage()
+        moved, old_names, rerender = 0, set(), False
+
+        for model, field in storage._fields():
+            rows = (
+                model._default_manager.exclude(**{field: ""})
+                .exclude(**{f"{field}__isnull": True})
+                .values_list("pk", field)
+            )
+            for pk, name in rows.iterator():
+                if BLOB_NAME.search(name) or not storage.exists(name):
+                    continue
+                moved += 1
+                if options["dry_run"]:
+                    self.stdout.write(f"{model.__name__} {pk}: {name}")
+                    continue
+
+                with storage.open(name, "rb") as f:
+                    new_name = storage.save(name, f)
+                changes = {field: new_name}
+                if any(f.name == "renditions" for f in model._meta.fields):
+                    changes["renditions"] = {}  # named after the old file; rebuilt below
+                    rerender = True
+                model._default_manager.filter(pk=pk).update(**changes)
+                old_names.add(name)
+
+        if options["dry_run"]:
+            self.stdout.write(f"{moved} file(s) would be moved.")
+            return
+
+        # Every row now points at the blob; drop the old copies (and their renditions)
+        for name in old_names:
+            storage.delete(name)
+
+        if rerender:
+            call_command("generate_image_renditions", stdout=self.stdout)
+        self.stdout.write(self.style.SUCCESS(
+            f"Moved {moved} file(s); removed {len(old_names)} old copies."
+        ))
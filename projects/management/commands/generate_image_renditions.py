@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from PIL import UnidentifiedImageError
+
+from projects.models import ProjectImage
+from projects.renditions import generate_renditions
+
+
+class Command(BaseCommand):
+    help = "Create thumbnail / medium / large WebP + JPEG copies for project images."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all", action="store_true",
+            help="Regenerate every image, not only those without renditions.",
+        )
+
+    def handle(self, *args, **options):
+        images = ProjectImage.objects.order_by("id")
+        if not options["all"]:
+            images = images.filter(renditions={})
+
+        done = failed = 0
+        for image in images.iterator():
+            try:
+                generate_renditions(image)
+                done += 1
+            except (OSError, UnidentifiedImageError) as e:
+                failed += 1
+                self.stdout.write(self.style.WARNING(f"{image.image.name}: {e}"))
+
+        self.stdout.write(self.style.SUCCESS(f"Rendered {done} image(s), {failed} failed."))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from backend.storage import SAVE_GRACE, blob_storage
+
+
+class Command(BaseCommand):
+    help = (
+        "Remove uploaded blobs (and their renditions) that no row references any more. "
+        "Run it periodically: deletes that raced with a fresh upload of the same file are left for it."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--grace", type=int, default=SAVE_GRACE,
+            help="Keep blobs saved within this many seconds (default: %(default)s).",
+        )
+
+    def handle(self, *args, **options):
+        removed = blob_storage().collect_garbage(grace=options["grace"])
+        for name in removed:
+            self.stdout.write(name)
+        self.stdout.write(self.style.SUCCESS(f"Removed {len(removed)} unreferenced file(s)."))
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:58
+
+import backend.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0006_projectimage_renditions'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='projectimage',
+            name='image',
+            field=models.ImageField(storage=backend.storage.blob_storage, upload_to='project_images/'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0007_content_addressed_storage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='design_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-18 20:01
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0008_project_design_version'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='project',
+            options={'base_manager_name': 'objects', 'ordering': ['-created_at'], 'verbose_name': 'Project', 'verbose_name_plural': 'Projects'},
+        ),
+    ]
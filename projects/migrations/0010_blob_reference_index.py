@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-18 21:11
+
+import backend.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0009_project_base_manager'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='projectimage',
+            name='image',
+            field=models.ImageField(db_index=True, storage=backend.storage.blob_storage, upload_to='project_images/'),
+        ),
+    ]
@@ -1,6 +1,47 @@
 from django.contrib.postgres.fields import ArrayField
 from django.db import models
 from accounts.models import CustomUser
+from backend.signals import UpdateSignalQuerySet
+from backend.storage import blob_storage
+
+
+class ProjectQuerySet(UpdateSignalQuerySet):
+
+    # Columns each listing template actually renders. Anything else
+    # (remark, the JSON blobs, description on table views) stays in the DB.
+    LISTING_FIELDS = {
+        # dashboard/global_dashboard.html project cards
+        "card": (
+            "name", "description", "status", "priority", "completion",
+            "progress_color", "assigned_date", "delivery_date", "owner__username",
+        ),
+        # dashboard/manager_dashboard.html project table
+        "table": (
+            "name", "status", "priority", "completion", "progress_color", "owner__username",
+        ),
+        # dashboard/member_dashboard.html assigned projects
+        "member": (
+            "name", "status", "completion", "progress_color", "assigned_date", "delivery_date",
+        ),
+        # HR dashboard project section (dashboard/hr.py)
+        "summary": ("name", "status", "owner__username"),
+        # design/dashboard.html
+        "design": ("name", "description"),
+    }
+
+    def for_listing(self, profile="table"):
+        """Load only the columns the `profile` template reads (plus the FKs it follows)."""
+        fields = self.LISTING_FIELDS[profile]
+        related = sorted({field.split("__")[0] for field in fields if "__" in field})
+        queryset = self.select_related(*related) if related else self
+        return queryset.only("id", *related, *fields)
+
+
+class ProjectManager(models.Manager.from_queryset(ProjectQuerySet)):
+    def get_queryset(self):
+        # Legacy JSON lists (now design.DesignHistory); can grow without
+        # bound, so they are only read when explicitly asked for
+        return super().get_queryset().defer("design_links", "design_history")
 
 
 class Project(models.Model):
@@ -65,6 +106,18 @@ class Project(models.Model):
         choices=PRIORITY_CHOICES,
         default=PRIORITY_MEDIUM
     )
+    # High → 0, Medium → 1, Low → 2: sorting by priority means by rank, not
+    # alphabetically. Computed by the database, so update() cannot skew it.
+    priority_rank = models.GeneratedField(
+        expression=models.Case(
+            models.When(priority=PRIORITY_HIGH, then=0),
+            models.When(priority=PRIORITY_MEDIUM, then=1),
+            models.When(priority=PRIORITY_LOW, then=2),
+            default=3,
+        ),
+        output_field=models.PositiveSmallIntegerField(),
+        db_persist=True,
+    )
 
     completion = models.PositiveIntegerField(default=0)
     progress_color = models.CharField(max_length=50, default="#26c6da")
@@ -76,11 +129,20 @@ class Project(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = ProjectManager()
+
     # ----- Meta -----
     class Meta:
+        base_manager_name = "objects"  # task.project etc. skip the JSON too
         ordering = ["-created_at"]
         verbose_name = "Project"
         verbose_name_plural = "Projects"
+        indexes = [
+            # keyset pagination on the list page / API (see pagination.py)
+            models.Index(fields=["created_at", "id"], name="project_created_id_idx"),
+            models.Index(fields=["name", "id"], name="project_name_id_idx"),
+            models.Index(fields=["priority_rank", "id"], name="project_priority_id_idx"),
+        ]
 
     # ----- Helper Methods -----
     def __str__(self):
@@ -104,15 +166,52 @@ class Project(models.Model):
             return "#fbc02d"  # Yellow
         return "#43a047"      # Green
     
-    design_links = models.JSONField(default=list, blank=True)   # List of uploaded links
-    design_history = models.JSONField(default=list, blank=True) # Stores full history (who uploaded, link, timestamp)
+    # Last DesignUpload.version handed out; bumped atomically by design.versions
+    design_version = models.PositiveIntegerField(default=0)
+
+    # Deprecated: superseded by design.DesignHistory (copied over in
+    # design/migrations/0006); kept for rollback, deferred by default
+    design_links = models.JSONField(default=list, blank=True)
+    design_history = models.JSONField(default=list, blank=True)
 
 
 class ProjectImage(models.Model):
     project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name="images")
-    image = models.ImageField(upload_to="project_images/")
+    image = models.ImageField(upload_to="project_images/", storage=blob_storage, db_index=True)
     uploaded_by = models.ForeignKey(CustomUser, on_delete=models.SET_NULL, null=True, blank=True)
     uploaded_at = models.DateTimeField(auto_now_add=True)
 
+    # Filled in by projects.renditions once the upload has been processed
+    width = models.PositiveIntegerField(null=True, blank=True)
+    height = models.PositiveIntegerField(null=True, blank=True)
+    renditions = models.JSONField(default=dict, blank=True)
+
     def __str__(self):
         return f"Image for {self.project.name} uploaded by {self.uploaded_by}"
+
+    # ----- Responsive image helpers -----
+    def rendition_url(self, label="thumb", fmt="jpeg"):
+        """URL of a resized copy, or of the original until renditions exist."""
+        name = self.renditions.get(label, {}).get(fmt)
+        if name is None and self.renditions:
+            # Small originals have no larger sizes; use the biggest there is
+            largest = max(self.renditions.values(), key=lambda entry: entry["width"])
+            name = largest.get(fmt)
+        return self.image.storage.url(name) if name else self.image.url
+
+    @property
+    def thumbnail_url(self):
+        return self.rendition_url("thumb")
+
+    @property
+    def large_url(self):
+        return self.rendition_url("large")
+
+    def srcset(self, fmt="jpeg"):
+        """`url 320w, url 960w, ...` for <img srcset> / <source srcset>."""
+        storage = self.image.storage
+        return ", ".join(
+            f"{storage.url(entry[fmt])} {entry['width']}w"
+            for entry in sorted(self.renditions.values(), key=lambda entry: entry["width"])
+            if entry.get(fmt)
+        )
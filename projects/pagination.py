@@ -0,0 +1,167 @@
+# projects/pagination.py
+"""
+Server-side filtering and keyset (cursor) pagination for project lists.
+
+A cursor encodes the sort value and id of the last row on the page, so
+fetching the next page is a `WHERE (key, id) < (last_key, last_id)` range
+scan on an index instead of an OFFSET that reads and discards every
+earlier row.
+"""
+import base64
+import json
+from datetime import date, datetime
+
+from django.db.models import Q
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import Project
+
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+# ?sort= value → (field, descending)
+SORT_KEYS = {
+    "": ("created_at", True),
+    "-created_at": ("created_at", True),
+    "created_at": ("created_at", False),
+    "name": ("name", False),
+    "-name": ("name", True),
+    "priority": ("priority_rank", False),  # High first
+}
+
+# Sort field → type a cursor value must have (created_at is checked by parsing)
+CURSOR_TYPES = {
+    "name": str,
+    "priority_rank": int,
+}
+
+STATUS_VALUES = {value for value, _ in Project.STATUS_CHOICES}
+PRIORITY_VALUES = {value for value, _ in Project.PRIORITY_CHOICES}
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def visible_projects(user):
+    """Projects the user may list: everything for HR/Manager, else own + assigned."""
+    if getattr(user, "role", None) in ["HR", "Manager"]:
+        return Project.objects.all()
+
+    # Subquery on the M2M table instead of a JOIN, so no .distinct() is needed.
+    assigned_ids = Project.assigned_to.through.objects.filter(
+        customuser_id=user.pk
+    ).values("project_id")
+    # user.pk, not user: the session principal answers it without loading the row
+    return Project.objects.filter(Q(owner=user.pk) | Q(pk__in=assigned_ids))
+
+
+def filter_projects(queryset, params):
+    """Apply the ?q / status / priority / owner / assignee / delivery_* filters."""
+    q = (params.get("q") or "").strip()
+    if q:
+        queryset = queryset.filter(name__icontains=q)
+
+    status = params.get("status")
+    if status in STATUS_VALUES:
+        queryset = queryset.filter(status=status)
+
+    priority = params.get("priority")
+    if priority in PRIORITY_VALUES:
+        queryset = queryset.filter(priority=priority)
+
+    owner = params.get("owner")
+    if owner and owner.isdigit():
+        queryset = queryset.filter(owner_id=int(owner))
+
+    assignee = params.get("assignee")
+    if assignee and assignee.isdigit():
+        queryset = queryset.filter(
+            pk__in=Project.assigned_to.through.objects.filter(
+                customuser_id=int(assignee)
+            ).values("project_id")
+        )
+
+    delivery_from = _date(params.get("delivery_from"))
+    if delivery_from:
+        queryset = queryset.filter(delivery_date__gte=delivery_from)
+
+    delivery_to = _date(params.get("delivery_to"))
+    if delivery_to:
+        queryset = queryset.filter(delivery_date__lte=delivery_to)
+
+    return queryset
+
+
+def _date(value):
+    # Like the other filters, a bad value (2024-02-30 included) is ignored
+    try:
+        return parse_date(value or "")
+    except ValueError:
+        return None
+
+
+def paginate(queryset, params):
+    """
+    Return (page_items, next_cursor). next_cursor is None on the last page.
+    Raises InvalidCursor for a tampered / stale cursor.
+    """
+    field, descending = SORT_KEYS.get(params.get("sort") or "", SORT_KEYS[""])
+
+    try:
+        limit = int(params.get("limit") or DEFAULT_PAGE_SIZE)
+    except ValueError:
+        limit = DEFAULT_PAGE_SIZE
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+    prefix = "-" if descending else ""
+    queryset = queryset.order_by(f"{prefix}{field}", f"{prefix}id")
+
+    cursor = params.get("cursor")
+    if cursor:
+        last_value, last_id = decode_cursor(cursor, field)
+        op = "lt" if descending else "gt"
+        queryset = queryset.filter(
+            Q(**{f"{field}__{op}": last_value})
+            | Q(**{field: last_value, f"id__{op}": last_id})
+        )
+
+    rows = list(queryset[: limit + 1])
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    next_cursor = encode_cursor(rows[-1], field) if has_more else None
+    return rows, next_cursor
+
+
+def encode_cursor(project, field):
+    value = getattr(project, field)
+    if isinstance(value, (date, datetime)):
+        value = value.isoformat()
+    raw = json.dumps([field, value, project.pk]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor, field):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_field, value, pk = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError):
+        raise InvalidCursor("Malformed cursor")
+
+    if cursor_field != field or not isinstance(pk, int) or isinstance(pk, bool):
+        raise InvalidCursor("Cursor does not match the requested sort")
+
+    expected = CURSOR_TYPES.get(field)
+    if expected and type(value) is not expected:  # also rejects None and bools
+        raise InvalidCursor("Malformed cursor")
+
+    if field == "created_at":
+        try:
+            value = parse_datetime(value or "")
+        except (ValueError, TypeError):
+            value = None
+        if value is None:
+            raise InvalidCursor("Malformed cursor")
+    return value, pk
@@ -0,0 +1,145 @@
+# projects/renditions.py
+"""
+Resized WebP / JPEG copies of uploaded project images.
+
+Each original gets one file per (size, format), stored next to it:
+
+    project_images/Screenshot_28.png
+    project_images/Screenshot_28.thumb.webp
+    project_images/Screenshot_28.thumb.jpg
+    project_images/Screenshot_28.medium.webp
+    ...
+
+ProjectImage.renditions records what exists, e.g.
+    {"thumb": {"width": 320, "webp": "<name>", "jpeg": "<name>"}, ...}
+so pages can serve a thumbnail (with srcset) instead of the original.
+
+render() works on raw bytes and returns raw bytes, so it can run in a
+worker process without touching the database or storage.
+"""
+import io
+import posixpath
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+
+# label → max width in px (never upscaled)
+SIZES = {
+    "thumb": 320,
+    "medium": 960,
+    "large": 1920,
+}
+
+# key → (Pillow format, file extension, save options)
+FORMATS = {
+    "webp": ("WEBP", "webp", {"quality": 80, "method": 4}),
+    "jpeg": ("JPEG", "jpg", {"quality": 82, "optimize": True, "progressive": True}),
+}
+
+# Pillow format → extension an uploaded original is stored under; other formats are rejected
+UPLOAD_FORMATS = {
+    "JPEG": "jpg",
+    "PNG": "png",
+    "GIF": "gif",
+    "WEBP": "webp",
+}
+
+
+def rendition_name(original_name, label, fmt):
+    stem, _ = posixpath.splitext(original_name)
+    return f"{stem}.{label}.{FORMATS[fmt][1]}"
+
+
+def _flatten(image):
+    """RGB copy with any transparency composited onto white (JPEG has no alpha)."""
+    if image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info):
+        image = image.convert("RGBA")
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel("A"))
+        return background
+    return image.convert("RGB")
+
+
+def render(data):
+    """
+    Original image bytes → (width, height, {label: (width, {fmt: bytes})}).
+    Raises PIL.UnidentifiedImageError for anything that is not an image.
+    """
+    with Image.open(io.BytesIO(data)) as source:
+        source = _flatten(ImageOps.exif_transpose(source))
+    width, height = source.size
+
+    out = {}
+    for label, max_width in sorted(SIZES.items(), key=lambda item: item[1]):
+        if out and max_width > width:
+            break  # larger sizes would only repeat the original
+        target = min(max_width, width)
+        resized = source if target == width else source.resize(
+            (target, max(1, round(height * target / width))), Image.LANCZOS
+        )
+        files = {}
+        for fmt, (pil_format, _, options) in FORMATS.items():
+            buffer = io.BytesIO()
+            resized.save(buffer, pil_format, **options)
+            files[fmt] = buffer.getvalue()
+        out[label] = (target, files)
+    return width, height, out
+
+
+def save_files(storage, original_name, rendered):
+    """Write render() output next to `original_name`; return (width, height, renditions)."""
+    width, height, sizes = rendered
+    renditions = {}
+    for label, (target, files) in sizes.items():
+        entry = {"width": target}
+        for fmt, data in files.items():
+            entry[fmt] = storage.save_derived(
+                rendition_name(original_name, label, fmt), ContentFile(data)
+            )
+        renditions[label] = entry
+    return width, height, renditions
+
+
+def store(project_image, rendered):
+    """Save render() output next to the original and record it on the row."""
+    delete_renditions(project_image)
+    width, height, renditions = save_files(
+        project_image.image.storage, project_image.image.name, rendered
+    )
+    project_image.width = width
+    project_image.height = height
+    project_image.renditions = renditions
+    project_image.save(update_fields=["width", "height", "renditions"])
+
+
+def render_path(path):
+    """
+    (extension, render() output) for an upload on disk, or None if it is not
+    an image in UPLOAD_FORMATS (process-pool safe). The extension comes from
+    the decoded content, never from the client's filename.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+        with Image.open(io.BytesIO(data)) as probe:
+            extension = UPLOAD_FORMATS.get(probe.format)
+        if extension is None:
+            return None
+        return extension, render(data)
+    except (OSError, UnidentifiedImageError, Image.DecompressionBombError):
+        return None
+
+
+def generate_renditions(project_image):
+    with project_image.image.open("rb") as f:
+        data = f.read()
+    store(project_image, render(data))
+
+
+def delete_renditions(project_image):
+    storage = project_image.image.storage
+    for entry in (project_image.renditions or {}).values():
+        for fmt in FORMATS:
+            if entry.get(fmt):
+                storage.delete(entry[fmt])
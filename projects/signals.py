@@ -0,0 +1,31 @@
+from django.db.models.signals import m2m_changed, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Project, ProjectImage
+
+
+@receiver(post_delete, sender=ProjectImage)
+def project_image_deleted(sender, instance, **kwargs):
+    # Content-addressed: the blob and its renditions are only removed
+    # once no other row points at the same file (backend/storage.py)
+    instance.image.storage.delete(instance.image.name)
+
+
+@receiver(m2m_changed, sender=Project.assigned_to.through)
+def project_members_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    # The assignee list is part of the project JSON, but M2M writes do not
+    # touch auto_now; move updated_at so its ETag changes too.
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            project_ids = [instance.pk]
+        else:
+            return
+    elif action in ("post_add", "post_remove"):
+        project_ids = pk_set
+    elif action == "pre_clear":
+        project_ids = list(instance.assigned_projects.values_list("pk", flat=True))
+    else:
+        return
+    if project_ids:
+        Project.objects.filter(pk__in=project_ids).update(updated_at=timezone.now())
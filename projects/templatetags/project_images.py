@@ -0,0 +1,33 @@
+from django import template
+from django.utils.html import format_html
+
+register = template.Library()
+
+
+@register.simple_tag
+def picture(image, sizes="(min-width: 768px) 33vw, 100vw", css_class="img-fluid rounded"):
+    """
+    <picture> for a ProjectImage: WebP renditions first, JPEG fallback,
+    thumbnail as the default src. Falls back to the original until the
+    renditions have been generated.
+
+        {% load project_images %}
+        {% picture img %}
+    """
+    if not image.renditions:
+        return format_html(
+            '<img src="{}" class="{}" loading="lazy" alt="">',
+            image.image.url, css_class,
+        )
+
+    return format_html(
+        '<picture>'
+        '<source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}" width="{}" height="{}" '
+        'class="{}" loading="lazy" decoding="async" alt="" data-full="{}">'
+        '</picture>',
+        image.srcset("webp"), sizes,
+        image.thumbnail_url, image.srcset("jpeg"), sizes,
+        image.width or "", image.height or "",
+        css_class, image.large_url,
+    )
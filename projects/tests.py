@@ -1,3 +1,400 @@
-from django.test import TestCase
+import base64
+import io
+import json
+import shutil
+import tempfile
+from datetime import date
+from unittest import mock
 
-# Create your tests here.
+from django.template import Context, Template
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image, UnidentifiedImageError
+
+from accounts.models import CustomUser
+
+from . import jobs, renditions
+from .models import Project, ProjectImage
+
+
+class ProjectListFilterTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.manager = CustomUser.objects.create_user(
+            username="manager", password="x", role=CustomUser.ROLE_MANAGER
+        )
+        Project.objects.create(name="early", owner=cls.manager, delivery_date=date(2024, 2, 10))
+        Project.objects.create(name="late", owner=cls.manager, delivery_date=date(2024, 3, 10))
+
+    def setUp(self):
+        self.client.force_login(self.manager)
+
+    def names(self, **params):
+        response = self.client.get(reverse("projects:project_list_api"), params)
+        self.assertEqual(response.status_code, 200)
+        return sorted(row["name"] for row in response.json()["results"])
+
+    def test_delivery_range(self):
+        self.assertEqual(self.names(delivery_from="2024-03-01"), ["late"])
+        self.assertEqual(self.names(delivery_to="2024-03-01"), ["early"])
+
+    def test_impossible_dates_are_ignored(self):
+        self.assertEqual(self.names(delivery_from="2024-02-30"), ["early", "late"])
+        self.assertEqual(self.names(delivery_to="2024-13-01"), ["early", "late"])
+
+        response = self.client.get(reverse("projects:project_list"), {"delivery_from": "2024-02-30"})
+        self.assertEqual(response.status_code, 200)
+
+    def test_bad_cursor_is_a_400(self):
+        response = self.client.get(reverse("projects:project_list_api"), {"cursor": "garbage"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_tampered_cursor_values_are_a_400(self):
+        for sort, payload in (
+            ("name", ["name", None, 5]),
+            ("-name", ["name", 3, 5]),
+            ("name", ["name", "a", True]),
+            ("priority", ["priority_rank", "High", 5]),
+            ("priority", ["priority_rank", None, 5]),
+        ):
+            cursor = base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+            response = self.client.get(reverse("projects:project_list_api"), {"sort": sort, "cursor": cursor})
+            self.assertEqual(response.status_code, 400, payload)
+
+    def test_priority_sorts_by_rank_across_pages(self):
+        Project.objects.create(name="high", owner=self.manager, priority=Project.PRIORITY_HIGH)
+        Project.objects.create(name="low", owner=self.manager, priority=Project.PRIORITY_LOW)
+        Project.objects.filter(name="early").update(priority=Project.PRIORITY_LOW)
+
+        names, params = [], {"sort": "priority", "limit": 1}
+        while True:
+            data = self.client.get(reverse("projects:project_list_api"), params).json()
+            names += [row["name"] for row in data["results"]]
+            if not data["next_cursor"]:
+                break
+            params["cursor"] = data["next_cursor"]
+        self.assertEqual(names, ["high", "late", "early", "low"])
+
+
+class ProjectApiTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = CustomUser.objects.create_user(username="owner", password="x")
+        cls.member = CustomUser.objects.create_user(username="member", password="x")
+        cls.outsider = CustomUser.objects.create_user(username="outsider", password="x")
+        cls.hr = CustomUser.objects.create_user(username="hr", password="x", role=CustomUser.ROLE_HR)
+        cls.project = Project.objects.create(name="p", owner=cls.owner)
+        cls.project.assigned_to.add(cls.member)
+        cls.url = reverse("projects:project_api", args=[cls.project.pk])
+
+    def get(self, user, **headers):
+        self.client.force_login(user)
+        return self.client.get(self.url, headers=headers)
+
+    def test_visibility(self):
+        for user in (self.owner, self.member, self.hr):
+            self.assertEqual(self.get(user).status_code, 200, user.username)
+        self.assertEqual(self.get(self.outsider).status_code, 404)
+
+    def test_revalidation(self):
+        response = self.get(self.member)
+        self.assertEqual(response.json()["manager"], self.owner.pk)
+        self.assertEqual(response.json()["assigned_to"], [self.member.pk])
+        etag = response.headers["ETag"]
+
+        self.assertEqual(self.get(self.member, if_none_match=etag).status_code, 304)
+        self.assertEqual(self.get(self.outsider, if_none_match=etag).status_code, 404)
+
+    async def test_async_revalidation(self):
+        await self.async_client.aforce_login(self.member)
+        response = await self.async_client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        etag = response.headers["ETag"]
+
+        response = await self.async_client.get(self.url, headers={"if_none_match": etag})
+        self.assertEqual(response.status_code, 304)
+
+        await Project.objects.filter(pk=self.project.pk).aupdate(name="renamed", updated_at=timezone.now())
+        response = await self.async_client.get(self.url, headers={"if_none_match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["ETag"], etag)
+
+        await self.async_client.aforce_login(self.outsider)
+        response = await self.async_client.get(self.url, headers={"if_none_match": etag})
+        self.assertEqual(response.status_code, 404)
+
+
+class AsyncProjectUpdateTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = CustomUser.objects.create_user(username="owner", password="x")
+        cls.project = Project.objects.create(name="p", owner=cls.owner)
+
+    async def post(self, name, data):
+        await self.async_client.aforce_login(self.owner)
+        with mock.patch("projects.views.apublish_project_update") as publish:
+            response = await self.async_client.post(reverse(name, args=[self.project.pk]), data)
+        await self.project.arefresh_from_db()
+        return response, publish
+
+    async def test_status_update_is_published(self):
+        response, publish = await self.post("projects:update_status_ajax", {"status": "On Hold"})
+        self.assertEqual(response.json(), {"success": True, "status": "On Hold"})
+        self.assertEqual(self.project.status, "On Hold")
+        publish.assert_awaited_once_with(self.project, status="On Hold")
+
+        response, publish = await self.post("projects:update_status_ajax", {"status": "Done"})
+        self.assertFalse(response.json()["success"])
+        publish.assert_not_awaited()
+
+    async def test_completion_update_is_published(self):
+        response, publish = await self.post("projects:update_completion_ajax", {"completion": "70"})
+        self.assertEqual(response.json(), {"success": True, "completion": 70})
+        self.assertEqual(self.project.completion, 70)
+        publish.assert_awaited_once_with(self.project, completion=70)
+
+        response, publish = await self.post("projects:update_completion_ajax", {"completion": "101"})
+        self.assertFalse(response.json()["success"])
+        publish.assert_not_awaited()
+
+
+def image_bytes(fmt="PNG", size=(40, 30)):
+    buffer = io.BytesIO()
+    Image.new("RGB", size, (200, 30, 30)).save(buffer, fmt)
+    return buffer.getvalue()
+
+
+class ChunkedUploadTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = CustomUser.objects.create_user(username="owner", password="x")
+        cls.member = CustomUser.objects.create_user(username="member", password="x")
+        cls.outsider = CustomUser.objects.create_user(username="outsider", password="x")
+        cls.project = Project.objects.create(name="p", owner=cls.owner)
+        cls.project.assigned_to.add(cls.member)
+
+    def setUp(self):
+        media = tempfile.mkdtemp(prefix="pms-media-")
+        self.addCleanup(shutil.rmtree, media, True)
+        settings = override_settings(MEDIA_ROOT=media, CHUNKED_UPLOAD_DIR=f"{media}/incoming")
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.client.force_login(self.owner)
+
+    def start(self, data, filename="shot.png"):
+        response = self.client.post(
+            reverse("projects:upload_start", args=[self.project.pk]),
+            {"filename": filename, "size": len(data)},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()["upload_id"]
+
+    def chunk_url(self, upload_id):
+        return reverse("projects:upload_chunk", args=[self.project.pk, upload_id])
+
+    def put(self, upload_id, data, first, last=None):
+        last = len(data) - 1 if last is None else last
+        return self.client.put(
+            self.chunk_url(upload_id), data[first:last + 1],
+            content_type="application/octet-stream",
+            headers={"Content-Range": f"bytes {first}-{last}/{len(data)}"},
+        )
+
+    def upload(self, data, filename="shot.png"):
+        upload_id = self.start(data, filename)
+        self.assertEqual(self.put(upload_id, data, 0).status_code, 200)
+        return upload_id
+
+    def complete(self, upload_ids):
+        with self.captureOnCommitCallbacks(execute=True):  # jobs run eagerly on commit
+            return self.client.post(
+                reverse("projects:upload_complete", args=[self.project.pk]),
+                {"uploads": upload_ids},
+                content_type="application/json",
+            )
+
+    def test_resumed_upload(self):
+        data = image_bytes()
+        upload_id = self.start(data)
+        half = len(data) // 2
+
+        self.assertEqual(self.put(upload_id, data, 0, half - 1).json()["offset"], half)
+        self.assertEqual(self.client.get(self.chunk_url(upload_id)).json()["offset"], half)
+
+        response = self.put(upload_id, data, 0)  # resent from the start
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()["offset"], half)
+
+        self.assertEqual(self.put(upload_id, data, half).json()["offset"], len(data))
+        self.assertEqual(self.complete([upload_id]).json(), {"success": True, "queued": 1})
+
+        image = ProjectImage.objects.get(project=self.project)
+        self.assertEqual(image.uploaded_by, self.owner)
+        self.assertEqual((image.width, image.height), (40, 30))
+        self.assertIn("thumb", image.renditions)
+        self.assertEqual(self.client.get(self.chunk_url(upload_id)).status_code, 404)  # discarded
+
+    def test_bad_chunks(self):
+        data = image_bytes()
+        upload_id = self.start(data)
+        url = self.chunk_url(upload_id)
+
+        for header in ("", "bytes 5-1/10", f"bytes 0-1/{len(data) + 1}", "items 0-1/10"):
+            response = self.client.put(
+                url, data[:2], content_type="application/octet-stream",
+                headers={"Content-Range": header},
+            )
+            self.assertEqual(response.status_code, 400, header)
+        self.assertEqual(self.client.get(url).json()["offset"], 0)
+
+    def test_size_limits(self):
+        url = reverse("projects:upload_start", args=[self.project.pk])
+        for size in (0, "many", 10**12):
+            response = self.client.post(url, {"filename": "a.png", "size": size}, content_type="application/json")
+            self.assertEqual(response.status_code, 400, size)
+
+    def test_incomplete_batches_are_refused(self):
+        data = image_bytes()
+        partial = self.start(data)
+        self.put(partial, data, 0, 9)
+        done = self.upload(data)
+
+        response = self.complete([done, partial, "not-an-id"])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["incomplete"], [partial, "not-an-id"])
+        self.assertEqual(self.complete([]).status_code, 400)
+        self.assertFalse(ProjectImage.objects.exists())
+
+    def test_stored_extension_comes_from_the_content(self):
+        self.complete([
+            self.upload(image_bytes("JPEG"), "photo.html"),
+            self.upload(image_bytes("BMP"), "scan.png"),    # an image, but not an allowed format
+            self.upload(b"<script>alert(1)</script>", "evil.png"),
+        ])
+        [image] = ProjectImage.objects.filter(project=self.project)
+        self.assertTrue(image.image.name.endswith(".jpg"), image.image.name)
+
+    def test_sessions_are_private(self):
+        upload_id = self.upload(image_bytes())
+
+        self.client.force_login(self.member)  # on the project, but not their upload
+        self.assertEqual(self.client.get(self.chunk_url(upload_id)).status_code, 404)
+        response = self.complete([upload_id])
+        self.assertEqual(response.json()["incomplete"], [upload_id])
+
+        self.client.force_login(self.outsider)
+        self.assertEqual(self.client.get(self.chunk_url(upload_id)).status_code, 404)
+        response = self.client.post(
+            reverse("projects:upload_start", args=[self.project.pk]),
+            {"filename": "a.png", "size": 10}, content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(IMAGE_PROCESS_WORKERS=2)
+    def test_web_process_renders_without_a_pool(self):
+        self.complete([self.upload(image_bytes(size=(40 + n, 30))) for n in range(3)])
+        self.assertIsNone(jobs._render_pool)
+        self.assertEqual(ProjectImage.objects.filter(project=self.project).count(), 3)
+
+    @override_settings(IMAGE_PROCESS_WORKERS=2, JOBS_RUN_EAGERLY=False)
+    def test_worker_batches_share_one_pool(self):
+        self.addCleanup(setattr, jobs, "_render_pool", None)
+        self.addCleanup(lambda: jobs._render_pool and jobs._render_pool.shutdown())
+
+        def batch(width):
+            uploads = [self.upload(image_bytes(size=(width + n, 30))) for n in range(3)]
+            jobs.process_image_uploads(self.project.pk, self.owner.pk, uploads)
+
+        batch(40)
+        pool = jobs._render_pool
+        self.assertIsNotNone(pool)
+        batch(50)
+
+        self.assertIs(jobs._render_pool, pool)
+        self.assertEqual(ProjectImage.objects.filter(project=self.project).count(), 6)
+
+
+class RenditionTests(SimpleTestCase):
+
+    def decode(self, data):
+        with Image.open(io.BytesIO(data)) as image:
+            image.load()
+            return image
+
+    def test_never_wider_than_the_original(self):
+        width, height, sizes = renditions.render(image_bytes("PNG", (1200, 600)))
+        self.assertEqual((width, height), (1200, 600))
+        self.assertEqual({label: target for label, (target, _) in sizes.items()}, {"thumb": 320, "medium": 960})
+
+        for label, (target, files) in sizes.items():
+            for fmt, data in files.items():
+                self.assertEqual(self.decode(data).size, (target, target // 2), (label, fmt))
+
+        _, _, sizes = renditions.render(image_bytes("PNG", (100, 50)))
+        self.assertEqual(list(sizes), ["thumb"])
+        self.assertEqual(self.decode(sizes["thumb"][1]["jpeg"]).size, (100, 50))
+
+    def test_transparency_is_flattened_onto_white(self):
+        buffer = io.BytesIO()
+        Image.new("RGBA", (40, 30), (255, 0, 0, 0)).save(buffer, "PNG")
+        _, _, sizes = renditions.render(buffer.getvalue())
+
+        jpeg = self.decode(sizes["thumb"][1]["jpeg"])
+        self.assertEqual(jpeg.mode, "RGB")
+        self.assertTrue(all(channel >= 250 for channel in jpeg.getpixel((20, 15))))
+
+    def test_non_images_are_rejected(self):
+        with self.assertRaises(UnidentifiedImageError):
+            renditions.render(b"<html>not an image</html>")
+
+        directory = tempfile.mkdtemp(prefix="pms-render-")
+        self.addCleanup(shutil.rmtree, directory, True)
+        for name, data in (("page.png", b"<html>"), ("image.bmp", image_bytes("BMP"))):
+            path = f"{directory}/{name}"
+            with open(path, "wb") as f:
+                f.write(data)
+            self.assertIsNone(renditions.render_path(path), name)
+
+        path = f"{directory}/ok.upload"
+        with open(path, "wb") as f:
+            f.write(image_bytes("PNG"))
+        self.assertEqual(renditions.render_path(path)[0], "png")
+
+
+class PictureTagTests(SimpleTestCase):
+
+    def render(self, image):
+        return Template("{% load project_images %}{% picture image %}").render(Context({"image": image}))
+
+    def test_srcset(self):
+        image = ProjectImage(
+            image="project_images/a.png", width=1200, height=600,
+            renditions={
+                "medium": {"width": 960, "webp": "project_images/a.medium.webp", "jpeg": "project_images/a.medium.jpg"},
+                "thumb": {"width": 320, "webp": "project_images/a.thumb.webp", "jpeg": "project_images/a.thumb.jpg"},
+            },
+        )
+        html = self.render(image)
+        self.assertInHTML(
+            '<source type="image/webp" sizes="(min-width: 768px) 33vw, 100vw" '
+            'srcset="/media/project_images/a.thumb.webp 320w, /media/project_images/a.medium.webp 960w">',
+            html,
+        )
+        self.assertIn('src="/media/project_images/a.thumb.jpg"', html)
+        self.assertIn(
+            'srcset="/media/project_images/a.thumb.jpg 320w, /media/project_images/a.medium.jpg 960w"', html
+        )
+        self.assertIn('width="1200" height="600"', html)
+        self.assertIn('data-full="/media/project_images/a.medium.jpg"', html)  # no large: biggest there is
+
+    def test_original_until_rendered(self):
+        html = self.render(ProjectImage(image="project_images/a.png"))
+        self.assertInHTML(
+            '<img src="/media/project_images/a.png" class="img-fluid rounded" loading="lazy" alt="">', html
+        )
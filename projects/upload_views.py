@@ -0,0 +1,86 @@
+import json
+
+from django.contrib.auth.decorators import login_required
+from django.db.models import Q
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
+from django.views.decorators.http import require_http_methods, require_POST
+
+from . import uploads
+from .jobs import process_image_uploads
+from .models import Project
+
+
+def _project_for_upload(user, pk):
+    """Same rule as project_detail: managers anywhere, others on their own / assigned projects."""
+    if getattr(user, "role", None) == "Manager":
+        return get_object_or_404(Project, pk=pk)
+    return get_object_or_404(
+        Project.objects.filter(Q(owner=user) | Q(assigned_to=user)).distinct(), pk=pk
+    )
+
+
+def _json_body(request):
+    try:
+        return json.loads(request.body or b"{}")
+    except ValueError:
+        return {}
+
+
+# ✅ Start a chunked upload
+@login_required
+@require_POST
+def upload_start(request, pk):
+    project = _project_for_upload(request.user, pk)
+    data = _json_body(request)
+    try:
+        upload_id = uploads.start(project, request.user, data.get("filename", ""), data.get("size", 0))
+    except (uploads.UploadError, TypeError, ValueError) as e:
+        return JsonResponse({"success": False, "error": str(e)}, status=400)
+    return JsonResponse({"success": True, "upload_id": upload_id, "offset": 0})
+
+
+# ✅ GET → resume offset, PUT → append one chunk
+@login_required
+@require_http_methods(["GET", "PUT"])
+def upload_chunk(request, pk, upload_id):
+    project = _project_for_upload(request.user, pk)
+    try:
+        meta = uploads.load(upload_id, project=project, user=request.user)
+    except uploads.UploadError as e:
+        return JsonResponse({"success": False, "error": str(e)}, status=404)
+
+    if request.method == "GET":
+        return JsonResponse({"success": True, "offset": meta["offset"], "size": meta["size"]})
+
+    try:
+        # `request` is read as a stream: the chunk goes straight to disk
+        offset = uploads.append(meta, request, request.headers.get("Content-Range", ""))
+    except uploads.OffsetMismatch as e:
+        return JsonResponse({"success": False, "error": str(e), "offset": e.offset}, status=409)
+    except uploads.UploadError as e:
+        return JsonResponse({"success": False, "error": str(e)}, status=400)
+    return JsonResponse({"success": True, "offset": offset, "size": meta["size"]})
+
+
+# ✅ Queue a batch of finished uploads for processing
+@login_required
+@require_POST
+def upload_complete(request, pk):
+    project = _project_for_upload(request.user, pk)
+    upload_ids = _json_body(request).get("uploads") or []
+
+    incomplete = []
+    for upload_id in upload_ids:
+        try:
+            meta = uploads.load(upload_id, project=project, user=request.user)
+        except uploads.UploadError:
+            incomplete.append(upload_id)
+            continue
+        if meta["offset"] != meta["size"]:
+            incomplete.append(upload_id)
+    if not upload_ids or incomplete:
+        return JsonResponse({"success": False, "incomplete": incomplete}, status=400)
+
+    process_image_uploads.delay(project.id, request.user.id, upload_ids)
+    return JsonResponse({"success": True, "queued": len(upload_ids)})
@@ -0,0 +1,145 @@
+# projects/uploads.py
+"""
+Resumable, chunked image uploads.
+
+    POST /projects/<pk>/uploads/                 {"filename", "size"} → {"upload_id", "offset": 0}
+    GET  /projects/<pk>/uploads/<upload_id>/     → {"offset", "size"}   (resume point)
+    PUT  /projects/<pk>/uploads/<upload_id>/     raw bytes + Content-Range: bytes a-b/size
+    POST /projects/<pk>/uploads/complete/        {"uploads": [upload_id, ...]}
+
+Chunks are appended straight to a part file under CHUNKED_UPLOAD_DIR as
+they are read off the socket, so nothing is buffered in memory or
+re-spooled by Django's multipart parser. A client that loses the
+connection asks for the offset and continues from there.
+
+"complete" only queues the batch; validation, renditions and the
+ProjectImage inserts run on the job worker (projects.jobs).
+"""
+import json
+import os
+import time
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+
+
+CHUNK_READ_SIZE = 64 * 1024
+STALE_AFTER = 60 * 60 * 24  # abandoned part files are removed after a day
+
+
+class UploadError(ValueError):
+    pass
+
+
+class OffsetMismatch(UploadError):
+    def __init__(self, offset):
+        super().__init__(f"Expected a chunk starting at byte {offset}")
+        self.offset = offset
+
+
+def upload_dir():
+    path = Path(settings.CHUNKED_UPLOAD_DIR)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _paths(upload_id):
+    try:
+        upload_id = uuid.UUID(str(upload_id)).hex  # never trust it as a path
+    except ValueError:
+        raise UploadError("Unknown upload") from None
+    base = upload_dir() / upload_id
+    return base.with_suffix(".json"), base.with_suffix(".part")
+
+
+def start(project, user, filename, size):
+    """Create an empty session and return its id."""
+    size = int(size)
+    if size <= 0 or size > settings.MAX_IMAGE_UPLOAD_SIZE:
+        raise UploadError(f"Files must be between 1 byte and {settings.MAX_IMAGE_UPLOAD_SIZE} bytes")
+
+    purge_stale()
+    upload_id = uuid.uuid4().hex
+    meta_path, part_path = _paths(upload_id)
+    part_path.touch()
+    meta_path.write_text(json.dumps({
+        "project_id": project.id,
+        "user_id": user.id,
+        "filename": os.path.basename(filename) or "image",
+        "size": size,
+    }))
+    return upload_id
+
+
+def load(upload_id, project=None, user=None):
+    """Session metadata plus the current offset; checks it belongs to project/user."""
+    meta_path, part_path = _paths(upload_id)
+    try:
+        meta = json.loads(meta_path.read_text())
+    except FileNotFoundError:
+        raise UploadError("Unknown upload") from None
+    if (project and meta["project_id"] != project.id) or (user and meta["user_id"] != user.id):
+        raise UploadError("Unknown upload")
+    meta["upload_id"] = uuid.UUID(str(upload_id)).hex
+    meta["path"] = str(part_path)
+    meta["offset"] = part_path.stat().st_size if part_path.exists() else 0
+    return meta
+
+
+def parse_content_range(header):
+    """'bytes 0-1048575/5242880' → (0, 1048575, 5242880)."""
+    try:
+        unit, _, spec = header.partition(" ")
+        span, _, total = spec.partition("/")
+        first, _, last = span.partition("-")
+        first, last, total = int(first), int(last), int(total)
+    except ValueError:
+        raise UploadError("Bad Content-Range header") from None
+    if unit != "bytes" or first > last or last >= total:
+        raise UploadError("Bad Content-Range header")
+    return first, last, total
+
+
+def append(meta, stream, content_range):
+    """Stream one chunk from `stream` onto the part file; return the new offset."""
+    first, last, total = parse_content_range(content_range)
+    if total != meta["size"]:
+        raise UploadError("Content-Range total does not match the upload size")
+    if first != meta["offset"]:
+        raise OffsetMismatch(meta["offset"])
+
+    remaining = last - first + 1
+    with open(meta["path"], "ab") as part:
+        while remaining:
+            data = stream.read(min(CHUNK_READ_SIZE, remaining))
+            if not data:
+                break  # client went away; the partial chunk stays and is resumable
+            part.write(data)
+            remaining -= len(data)
+    return os.path.getsize(meta["path"])
+
+
+def from_uploaded_file(project, user, uploaded):
+    """Turn a regular multipart upload into a completed session (form fallback)."""
+    upload_id = start(project, user, uploaded.name, uploaded.size)
+    _, part_path = _paths(upload_id)
+    with open(part_path, "wb") as part:
+        for chunk in uploaded.chunks():
+            part.write(chunk)
+    return upload_id
+
+
+def discard(upload_id):
+    for path in _paths(upload_id):
+        path.unlink(missing_ok=True)
+
+
+def purge_stale(max_age=STALE_AFTER):
+    cutoff = time.time() - max_age
+    for path in upload_dir().iterdir():
+        try:
+            if path.suffix in (".json", ".part") and path.stat().st_mtime < cutoff:
+                path.unlink()
+        except FileNotFoundError:
+            pass  # finished or purged concurrently
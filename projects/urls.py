@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import views, api_views, upload_views
 
 app_name = "projects"
 
@@ -8,6 +8,10 @@ urlpatterns = [
     path("", views.project_list, name="project_list"),
     path("create/", views.project_create, name="project_create"),
 
+    # JSON API
+    path("api/", api_views.project_list_api, name="project_list_api"),
+    path("api/<int:pk>/", api_views.project_api, name="project_api"),
+
     # Detail Views (Editable + Read-only)
     path("<int:pk>/", views.project_detail, name="project_detail"),
     path("<int:pk>/view/", views.project_detail_readonly, name="project_detail_readonly"),
@@ -24,6 +28,11 @@ urlpatterns = [
     path("<int:project_id>/assign/", views.assign_project_ajax, name="assign_project_ajax"),
     path("<int:project_id>/assign/<int:user_id>/", views.assign_member, name="assign_member"),
 
+    # Chunked image uploads (see uploads.py)
+    path("<int:pk>/uploads/", upload_views.upload_start, name="upload_start"),
+    path("<int:pk>/uploads/complete/", upload_views.upload_complete, name="upload_complete"),
+    path("<int:pk>/uploads/<str:upload_id>/", upload_views.upload_chunk, name="upload_chunk"),
+
     # Delete image
     path("delete-image/<int:image_id>/", views.delete_project_image, name="delete_project_image"),
 ]
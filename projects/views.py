@@ -1,7 +1,7 @@
 from django.contrib.auth import get_user_model
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
-from django.shortcuts import render, get_object_or_404, redirect
+from django.shortcuts import render, get_object_or_404, aget_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.db.models import Q
@@ -9,10 +9,11 @@ from itertools import chain
 from tasks.models import Task
 from .models import Project, ProjectImage
 from .forms import ProjectForm, ProjectImageForm
+from .pagination import InvalidCursor, filter_projects, paginate, visible_projects
 from accounts.models import CustomUser
-from notifications.models import Notification
-from channels.layers import get_channel_layer
-from asgiref.sync import async_to_sync
+from . import uploads
+from .jobs import announce_assignment, process_image_uploads
+from backend.realtime import apublish_project_update
 
 User = get_user_model()
 
@@ -33,28 +34,32 @@ def assign_member(request, project_id, user_id):
 
     return JsonResponse({"success": False, "message": "Invalid request"}, status=405)
 
-# ✅ List all projects
+# ✅ List all projects (filtered + cursor paginated)
 @login_required
 def project_list(request):
+    readonly = request.user.role in ["HR", "Manager"]
 
-    # HR + Manager → SEE ALL PROJECTS (READ ONLY)
-    if request.user.role in ["HR", "Manager"]:
-        projects = Project.objects.all()
-        return render(request, "projects/project_list_readonly.html", {
-            "projects": projects,
-            "readonly": True
-        })
-
-    # Team Member → see created or assigned projects
-    projects = Project.objects.filter(
-        owner=request.user
-    ) | Project.objects.filter(
-        assigned_to=request.user
+    projects = filter_projects(
+        visible_projects(request.user).select_related("owner"), request.GET
     )
+    try:
+        page, next_cursor = paginate(projects, request.GET)
+    except InvalidCursor:
+        return redirect("projects:project_list")
+
+    next_query = None
+    if next_cursor:
+        params = request.GET.copy()
+        params["cursor"] = next_cursor
+        next_query = params.urlencode()
 
-    return render(request, "projects/project_list.html", {
-        "projects": projects.distinct(),
-        "readonly": False
+    # HR + Manager → SEE ALL PROJECTS (READ ONLY)
+    # Team Member → see created or assigned projects
+    template = "projects/project_list_readonly.html" if readonly else "projects/project_list.html"
+    return render(request, template, {
+        "projects": page,
+        "readonly": readonly,
+        "next_query": next_query,
     })
 
 
@@ -81,17 +86,23 @@ def project_detail(request, pk):
     # ✅ Handle multiple image uploads
     if request.method == "POST":
         if "image" in request.FILES:
+            # Form fallback for browsers without the chunked uploader:
+            # same background pipeline, just fed from Django's multipart files
             files = request.FILES.getlist('image')
-            for file in files:
-                ProjectImage.objects.create(project=project, image=file, uploaded_by=user)
-            messages.success(request, f"{len(files)} image(s) uploaded successfully!")
+            try:
+                upload_ids = [uploads.from_uploaded_file(project, user, file) for file in files]
+            except uploads.UploadError as e:
+                messages.error(request, str(e))
+                return redirect('projects:project_detail', pk=pk)
+            process_image_uploads.delay(project.id, user.id, upload_ids)
+            messages.success(request, f"{len(files)} image(s) uploaded; previews will appear shortly.")
             return redirect('projects:project_detail', pk=pk)
 
         elif "live_link" in request.POST:
             live_link = request.POST.get("live_link")
             if live_link:
                 project.live_link = live_link
-                project.save(update_fields=["live_link"])
+                project.save(update_fields=["live_link", "updated_at"])
                 messages.success(request, "🌐 Live project link updated successfully!")
             return redirect('projects:project_detail', pk=pk)
 
@@ -141,7 +152,7 @@ def project_edit(request, pk):
         return redirect('projects:project_list')
 
     if request.method == 'POST':
-        form = ProjectForm(request.POST, request.FILES, instance=project, user=request.user)
+        form = ProjectForm(request.POST, request.FILES, instance=project)
         if form.is_valid():
             form.save()
             messages.success(request, "✅ Project updated successfully!")
@@ -149,7 +160,7 @@ def project_edit(request, pk):
         else:
             messages.error(request, "⚠️ Please correct the errors below.")
     else:
-        form = ProjectForm(instance=project, user=request.user)
+        form = ProjectForm(instance=project)
 
     return render(request, 'projects/project_form.html', {'form': form, 'title': 'Edit Project'})
 
@@ -172,17 +183,18 @@ def project_delete(request, pk):
     return render(request, 'projects/project_confirm_delete.html', {'project': project})
 
 
-# ✅ AJAX: Update project status
+# ✅ AJAX: Update project status (async: runs on the ASGI event loop)
 @login_required
 @csrf_exempt
-def update_status_ajax(request, project_id):
+async def update_status_ajax(request, project_id):
     if request.method == "POST":
-        project = get_object_or_404(Project, id=project_id)
+        project = await aget_object_or_404(Project, id=project_id)
         new_status = request.POST.get("status")
 
         if new_status in ["Pending", "In Progress", "Completed", "On Hold"]:
             project.status = new_status
-            project.save(update_fields=["status"])
+            await project.asave(update_fields=["status", "updated_at"])
+            await apublish_project_update(project, status=new_status)
             return JsonResponse({"success": True, "status": new_status})
 
         return JsonResponse({"success": False, "error": "Invalid status"})
@@ -190,17 +202,18 @@ def update_status_ajax(request, project_id):
     return JsonResponse({"success": False, "error": "Invalid request method"})
 
 
-# ✅ AJAX: Update completion percentage
+# ✅ AJAX: Update completion percentage (async)
 @login_required
 @csrf_exempt
-def update_completion_ajax(request, project_id):
+async def update_completion_ajax(request, project_id):
     if request.method == "POST":
-        project = get_object_or_404(Project, id=project_id)
+        project = await aget_object_or_404(Project, id=project_id)
         try:
             new_completion = int(request.POST.get("completion", 0))
             if 0 <= new_completion <= 100:
                 project.completion = new_completion
-                project.save(update_fields=["completion"])
+                await project.asave(update_fields=["completion", "updated_at"])
+                await apublish_project_update(project, completion=new_completion)
                 return JsonResponse({"success": True, "completion": new_completion})
             else:
                 return JsonResponse({"success": False, "error": "Completion must be between 0–100"})
@@ -210,43 +223,28 @@ def update_completion_ajax(request, project_id):
     return JsonResponse({"success": False, "error": "Invalid request method"})
 
 
-# ✅ AJAX: Assign project to a team member (Manager only)
+# ✅ AJAX: Assign project to one or more team members (Manager only)
 @login_required
 @csrf_exempt
 def assign_project_ajax(request, project_id):
 
     if request.method == "POST" and request.user.role == "Manager":
         project = get_object_or_404(Project, id=project_id)
-        user_id = request.POST.get("assigned_to")
-
-        if user_id:
-            assigned_user = get_object_or_404(CustomUser, id=user_id)
-            project.assigned_to = assigned_user
-            project.save(update_fields=["assigned_to"])
-
-            # 1️⃣ Create Notification DB Entry
-            Notification.objects.create(
-                user=assigned_user,
-                message=f"You have been assigned to project: {project.name}",
-                project=project
-            )
-
-            # 2️⃣ Send Real-Time WS Event
-            layer = get_channel_layer()
-            async_to_sync(layer.group_send)(
-                f"user_{assigned_user.id}",
-                {
-                    "type": "send_notification",
-                    "data": {
-                        "message": f"Assigned to project: {project.name}",
-                        "project": project.id
-                    }
-                }
-            )
+        user_ids = request.POST.getlist("assigned_to")
+        assignees = list(
+            CustomUser.objects.filter(id__in=[i for i in user_ids if i.isdigit()])
+            .exclude(assigned_projects=project)  # already on it: nothing to notify
+        )
+
+        if assignees:
+            project.assigned_to.add(*assignees)
+
+            # Notifications and socket pushes run on the job worker
+            announce_assignment.delay(project.id, [user.id for user in assignees])
 
             return JsonResponse({"success": True})
 
-        return JsonResponse({"success": False})
+    return JsonResponse({"success": False})
 
 # ✅ Delete uploaded image (Manager only)
 @login_required
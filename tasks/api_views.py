@@ -0,0 +1,47 @@
+from django.contrib.auth.decorators import login_required
+from django.db.models import Q
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
+
+from backend.conditional import conditional_on_updated_at, loaded
+from projects.pagination import visible_projects
+from .models import Task
+
+
+def visible_tasks(user):
+    """Tasks the user may read: everything for HR/Manager, else assigned ones and those of their projects."""
+    if getattr(user, "role", None) in ["HR", "Manager"]:
+        return Task.objects.all()
+    return Task.objects.filter(Q(assigned_to=user.pk) | Q(project__in=visible_projects(user)))
+
+
+@login_required
+@conditional_on_updated_at(Task, visible=visible_tasks)
+def task_api(request, pk):
+    """
+    Task data for modal display, with ETag / Last-Modified from updated_at
+    (304 without loading the task while it is unchanged). The project and
+    assignee are sent as ids only: their names change without moving the
+    task's updated_at, so they would be served stale.
+    """
+    task = get_object_or_404(
+        visible_tasks(request.user).only(
+            "id", "title", "description", "status", "priority", "completion",
+            "due_date", "updated_at", "project_id", "assigned_to_id",
+        ),
+        pk=pk,
+    )
+    loaded(request, task)
+
+    return JsonResponse({
+        "id": task.id,
+        "title": task.title,
+        "description": task.description or "",
+        "status": task.status,
+        "priority": task.priority,
+        "completion": task.completion,
+        "due_date": task.due_date.strftime("%Y-%m-%d") if task.due_date else None,
+        "project": task.project_id,
+        "assigned_to": task.assigned_to_id,
+        "updated_at": task.updated_at.isoformat(),
+    })
@@ -1,5 +1,6 @@
 from django.db import models
 from accounts.models import CustomUser
+from backend.signals import UpdateSignalQuerySet
 from projects.models import Project
 
 class Task(models.Model):
@@ -22,6 +23,17 @@ class Task(models.Model):
     completion = models.PositiveIntegerField(default=0)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='Pending')
     priority = models.CharField(max_length=20, choices=PRIORITY_CHOICES, default='Medium')
+    # ETag / Last-Modified of the task JSON (backend/conditional.py)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # update() reports to the dashboard snapshots (backend/signals.py)
+    objects = UpdateSignalQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # "my tasks" lists and per-member status counts
+            models.Index(fields=["assigned_to", "status"], name="task_assignee_status_idx"),
+        ]
 
     def __str__(self):
         return self.title
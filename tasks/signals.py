@@ -0,0 +1,8 @@
+from django.dispatch import Signal
+
+
+# Sent by tasks.views.bulk_update_tasks after Task.objects.bulk_update(),
+# which skips pre_save / post_save. `changes` is a list of (old, task):
+# `old` is the row as it was ({"status", "assigned_to_id",
+# "project__owner_id"}), `task` carries the new status / completion.
+tasks_bulk_updated = Signal()
@@ -1,3 +1,184 @@
+import json
+from datetime import date
+from unittest import mock
+
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from accounts.models import CustomUser
+from projects.models import Project
+
+from .models import Task
+
+
+class TaskApiTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = CustomUser.objects.create_user(username="owner", password="x")
+        cls.assignee = CustomUser.objects.create_user(username="assignee", password="x")
+        cls.member = CustomUser.objects.create_user(username="member", password="x")
+        cls.outsider = CustomUser.objects.create_user(username="outsider", password="x")
+        cls.hr = CustomUser.objects.create_user(username="hr", password="x", role=CustomUser.ROLE_HR)
+        project = Project.objects.create(name="p", owner=cls.owner)
+        project.assigned_to.add(cls.member)
+        cls.task = Task.objects.create(
+            title="t", project=project, assigned_to=cls.assignee, due_date=date(2024, 1, 1)
+        )
+        cls.url = reverse("tasks:task_api", args=[cls.task.pk])
+
+    def get(self, user, **headers):
+        self.client.force_login(user)
+        return self.client.get(self.url, headers=headers)
+
+    def test_visibility(self):
+        for user in (self.owner, self.assignee, self.member, self.hr):
+            self.assertEqual(self.get(user).status_code, 200, user.username)
+        self.assertEqual(self.get(self.outsider).status_code, 404)
+
+    def test_revalidation(self):
+        response = self.get(self.assignee)
+        etag = response.headers["ETag"]
+        self.assertEqual(response.json()["project"], self.task.project_id)
+        self.assertEqual(response.json()["assigned_to"], self.assignee.pk)
+
+        self.assertEqual(self.get(self.assignee, if_none_match=etag).status_code, 304)
+        # a validator from before losing access does not reveal that it is current
+        self.assertEqual(self.get(self.outsider, if_none_match=etag).status_code, 404)
+
+        self.task.title = "renamed"
+        self.task.save()
+        response = self.get(self.assignee, if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["title"], "renamed")
+
+
+class BulkUpdateTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = CustomUser.objects.create_user(username="owner", password="x")
+        cls.assignee = CustomUser.objects.create_user(username="assignee", password="x")
+        cls.outsider = CustomUser.objects.create_user(username="outsider", password="x")
+        cls.manager = CustomUser.objects.create_user(
+            username="manager", password="x", role=CustomUser.ROLE_MANAGER
+        )
+        project = Project.objects.create(name="p", owner=cls.owner)
+        cls.first, cls.second = (
+            Task.objects.create(title=title, project=project, assigned_to=cls.assignee, due_date=date(2024, 1, 1))
+            for title in ("first", "second")
+        )
+
+    def post(self, user, changes):
+        self.client.force_login(user)
+        response = self.client.post(
+            reverse("tasks:bulk_update_tasks"), json.dumps({"changes": changes}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()["results"]
+
+    def errors(self, results):
+        return [result.get("error") for result in results]
+
+    def test_permissions(self):
+        changes = [{"id": self.first.pk, "completion": 10}]
+        self.assertEqual(self.errors(self.post(self.outsider, changes)), ["Not allowed"])
+        self.first.refresh_from_db()
+        self.assertEqual(self.first.completion, 0)
+
+        for user, completion in ((self.assignee, 20), (self.owner, 30), (self.manager, 40)):
+            changes = [{"id": self.first.pk, "completion": completion}]
+            self.assertEqual(self.errors(self.post(user, changes)), [None], user.username)
+            self.first.refresh_from_db()
+            self.assertEqual(self.first.completion, completion)
+
+    def test_changes_apply_in_order(self):
+        results = self.post(self.assignee, [
+            {"id": self.first.pk, "completion": 100},
+            {"id": self.second.pk, "status": "In Progress"},
+            {"id": self.first.pk, "status": "In Progress", "completion": 60},
+            {"id": 10**9, "status": "Completed"},
+        ])
+
+        self.assertEqual(
+            [(r["id"], r.get("status")) for r in results],
+            [(self.first.pk, "Completed"), (self.second.pk, "In Progress"),
+             (self.first.pk, "In Progress"), (10**9, None)],
+        )
+        self.assertEqual(results[3]["error"], "Task not found")
+        self.first.refresh_from_db()
+        self.assertEqual((self.first.status, self.first.completion), ("In Progress", 60))
+
+    def test_no_op_changes_are_not_written(self):
+        updated_at = self.first.updated_at
+        with CaptureQueriesContext(connection) as queries:
+            results = self.post(self.assignee, [
+                {"id": self.first.pk, "completion": 50},
+                {"id": self.first.pk, "status": "Pending", "completion": 0},  # back where it was
+            ])
+        self.assertEqual(self.errors(results), [None, None])
+        self.assertFalse([q for q in queries if q["sql"].startswith('UPDATE "tasks_task"')])
+        self.first.refresh_from_db()
+        self.assertEqual(self.first.updated_at, updated_at)
+
+    def test_malformed_changes(self):
+        results = self.post(self.manager, [
+            {"id": [1]}, {"id": True}, {"id": str(self.first.pk)}, {},
+            {"id": self.first.pk, "status": ["Completed"]},
+            {"id": self.first.pk, "completion": True},
+        ])
+        self.assertEqual(self.errors(results), [
+            "id must be an integer", "id must be an integer", "id must be an integer",
+            "id must be an integer", "Invalid status", "Completion must be between 0–100",
+        ])
+        self.assertEqual(results[0]["id"], [1])
+
+        self.client.force_login(self.manager)
+        for body in ("nope", {"changes": "x"}, {"changes": [1]}):
+            response = self.client.post(
+                reverse("tasks:bulk_update_tasks"), json.dumps(body), content_type="application/json"
+            )
+            self.assertEqual(response.status_code, 400, body)
+
+
+class AsyncTaskUpdateTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = CustomUser.objects.create_user(username="owner", password="x")
+        cls.project = Project.objects.create(name="p", owner=cls.owner)
+        cls.task = Task.objects.create(
+            title="t", project=cls.project, assigned_to=cls.owner, due_date=date(2024, 1, 1)
+        )
+
+    async def post(self, name, data):
+        await self.async_client.aforce_login(self.owner)
+        with mock.patch("tasks.views.apublish_project_update") as publish:
+            response = await self.async_client.post(reverse(name, args=[self.task.pk]), data)
+        await self.task.arefresh_from_db()
+        return response, publish
+
+    async def test_status_update_is_published(self):
+        response, publish = await self.post("tasks:update_task_status", {"status": "Completed"})
+        self.assertEqual(response.json(), {"success": True})
+        self.assertEqual(self.task.status, "Completed")
+        publish.assert_awaited_once_with(self.project, task=self.task.pk, status="Completed")
+
+        response, publish = await self.post("tasks:update_task_status", {"status": "Done"})
+        self.assertFalse(response.json()["success"])
+        publish.assert_not_awaited()
+
+    async def test_completion_update_is_published(self):
+        response, publish = await self.post("tasks:update_task_completion", {"completion": "40"})
+        self.assertEqual(response.json(), {"success": True})
+        self.assertEqual((self.task.completion, self.task.status), (40, "In Progress"))
+        publish.assert_awaited_once_with(
+            self.project, task=self.task.pk, status="In Progress", completion=40
+        )
 
-# Create your tests here.
+        response, publish = await self.post("tasks:update_task_completion", {"completion": "x"})
+        self.assertFalse(response.json()["success"])
+        publish.assert_not_awaited()
@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import views, api_views
 
 app_name = "tasks"
 
@@ -13,6 +13,12 @@ urlpatterns = [
     # Task creation
     path("create/", views.task_create, name="task_create"),
 
+    # AJAX: batch status / completion update
+    path("bulk-update/", views.bulk_update_tasks, name="bulk_update_tasks"),
+
+    # JSON API
+    path("api/<int:pk>/", api_views.task_api, name="task_api"),
+
     # Task detail (keep this **after** AJAX URLs)
     path("<int:pk>/", views.task_detail, name="task_detail"),
 
@@ -1,21 +1,35 @@
-from django.shortcuts import render, get_object_or_404, redirect
+import json
+
+from django.shortcuts import render, get_object_or_404, aget_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.db import transaction
 from django.http import JsonResponse, HttpResponseForbidden
+from django.utils import timezone
+from django.views.decorators.http import require_POST
 from .models import Task
 from .forms import TaskForm
+from .signals import tasks_bulk_updated
 from accounts.models import CustomUser
+from backend.realtime import apublish_project_update
+from backend.signals import reported_separately
+
+
+STATUS_VALUES = {value for value, _ in Task.STATUS_CHOICES}
+BULK_UPDATE_LIMIT = 200
 
 
 # -----------------------------------------------------
 # 🧩 Task List View
 # -----------------------------------------------------
 @login_required
-def task_list(request):
+def task_list(request, user_id=None):
 
-    # HR + Manager → VIEW ALL TASKS
+    # HR + Manager → VIEW ALL TASKS (or one member's, via task_list_for_member)
     if request.user.role in ["HR", "Manager"]:
-        tasks = Task.objects.all()
+        tasks = Task.objects.select_related("assigned_to")
+        if user_id is not None:
+            tasks = tasks.filter(assigned_to_id=user_id)
         return render(request, "tasks/task_list_readonly.html", {
             "tasks": tasks,
             "readonly": True
@@ -73,17 +87,18 @@ def task_create(request):
 
 
 # -----------------------------------------------------
-# 🧩 AJAX — Update Task Status
+# 🧩 AJAX — Update Task Status (async)
 # -----------------------------------------------------
 @login_required
-def update_task_status(request, pk):
+async def update_task_status(request, pk):
     if request.method == "POST":
-        task = get_object_or_404(Task, pk=pk)
+        task = await aget_object_or_404(Task.objects.select_related("project"), pk=pk)
         new_status = request.POST.get("status")
 
         if new_status in ["Pending", "In Progress", "Completed"]:
             task.status = new_status
-            task.save(update_fields=["status"])
+            await task.asave(update_fields=["status", "updated_at"])
+            await apublish_project_update(task.project, task=task.id, status=task.status)
             return JsonResponse({"success": True})
         else:
             return JsonResponse({"success": False, "error": "Invalid status"})
@@ -91,12 +106,12 @@ def update_task_status(request, pk):
 
 
 # -----------------------------------------------------
-# 🧩 AJAX — Update Task Completion Percentage
+# 🧩 AJAX — Update Task Completion Percentage (async)
 # -----------------------------------------------------
 @login_required
-def update_task_completion(request, pk):
+async def update_task_completion(request, pk):
     if request.method == "POST":
-        task = get_object_or_404(Task, pk=pk)
+        task = await aget_object_or_404(Task.objects.select_related("project"), pk=pk)
         try:
             completion = int(request.POST.get("completion", 0))
             if 0 <= completion <= 100:
@@ -105,7 +120,10 @@ def update_task_completion(request, pk):
                     task.status = "Completed"
                 elif completion > 0 and task.status == "Pending":
                     task.status = "In Progress"
-                task.save(update_fields=["completion", "status"])
+                await task.asave(update_fields=["completion", "status", "updated_at"])
+                await apublish_project_update(
+                    task.project, task=task.id, status=task.status, completion=completion
+                )
                 return JsonResponse({"success": True})
             else:
                 return JsonResponse({"success": False, "error": "Completion must be between 0–100"})
@@ -113,6 +131,127 @@ def update_task_completion(request, pk):
             return JsonResponse({"success": False, "error": "Invalid completion value"})
     return JsonResponse({"success": False, "error": "Invalid request method"})
 
+# -----------------------------------------------------
+# 🧩 AJAX — Batch status / completion update (board drag & drop)
+# -----------------------------------------------------
+def _task_id(change):
+    """The change's task id, or None unless it is a real int (True is not task 1)."""
+    task_id = change.get("id")
+    return task_id if isinstance(task_id, int) and not isinstance(task_id, bool) else None
+
+
+def _apply(task, change):
+    """Validate one change and apply it to `task`; returns an error or None."""
+    status = change.get("status")
+    completion = change.get("completion")
+
+    if status is not None and (not isinstance(status, str) or status not in STATUS_VALUES):
+        return "Invalid status"
+    if completion is not None:
+        if not isinstance(completion, int) or isinstance(completion, bool) or not 0 <= completion <= 100:
+            return "Completion must be between 0–100"
+
+    if completion is not None:
+        task.completion = completion
+        # Same rules as update_task_completion, unless a status was given
+        if status is None and completion == 100:
+            task.status = "Completed"
+        elif status is None and completion > 0 and task.status == "Pending":
+            task.status = "In Progress"
+    if status is not None:
+        task.status = status
+    return None
+
+
+@login_required
+@require_POST
+def bulk_update_tasks(request):
+    """
+    Apply many task changes in one request:
+
+        {"changes": [{"id": 12, "status": "Completed"}, {"id": 13, "completion": 40}, ...]}
+
+    Every task is read (and permission-checked) with one query and written
+    with one bulk_update in a single transaction. A user may change tasks
+    assigned to them or in projects they own; Managers may change any.
+    The response has one result per change, in order.
+    """
+    try:
+        changes = json.loads(request.body)["changes"]
+        if not isinstance(changes, list) or not all(isinstance(c, dict) for c in changes):
+            raise TypeError
+    except (ValueError, KeyError, TypeError):
+        return JsonResponse(
+            {"success": False, "error": 'Expected {"changes": [{"id": ...}, ...]}'}, status=400
+        )
+    if len(changes) > BULK_UPDATE_LIMIT:
+        return JsonResponse(
+            {"success": False, "error": f"At most {BULK_UPDATE_LIMIT} changes per request"}, status=400
+        )
+
+    user = request.user
+    ids = {_task_id(c) for c in changes} - {None}
+    results, changed = [], {}
+
+    with transaction.atomic():
+        # Locked until commit (in pk order, so two batches cannot deadlock):
+        # a concurrent write between this read and the bulk_update would
+        # otherwise be lost and skew the snapshot deltas
+        rows = {
+            row["id"]: row
+            for row in Task.objects.select_for_update().filter(pk__in=ids).order_by("pk").values(
+                "id", "status", "completion", "assigned_to_id", "project__owner_id"
+            )
+        }
+
+        for change in changes:
+            task_id = _task_id(change)
+            if task_id is None:
+                results.append({"id": change.get("id"), "success": False, "error": "id must be an integer"})
+                continue
+            row = rows.get(task_id)
+            if row is None:
+                results.append({"id": task_id, "success": False, "error": "Task not found"})
+                continue
+            if not (
+                user.role == "Manager"
+                or row["assigned_to_id"] == user.id
+                or row["project__owner_id"] == user.id
+            ):
+                results.append({"id": task_id, "success": False, "error": "Not allowed"})
+                continue
+
+            # Several changes to one task apply in order to the same object
+            task = changed.get(task_id) or Task(
+                id=task_id, status=row["status"], completion=row["completion"]
+            )
+            error = _apply(task, change)
+            if error:
+                results.append({"id": task_id, "success": False, "error": error})
+                continue
+            changed[task_id] = task
+            results.append({
+                "id": task_id, "success": True, "status": task.status, "completion": task.completion,
+            })
+
+        changed = {
+            task_id: task for task_id, task in changed.items()
+            if (task.status, task.completion) != (rows[task_id]["status"], rows[task_id]["completion"])
+        }
+        if changed:
+            now = timezone.now()
+            for task in changed.values():
+                task.updated_at = now  # bulk_update skips auto_now
+            with reported_separately():
+                Task.objects.bulk_update(changed.values(), ["status", "completion", "updated_at"])
+            # Snapshots and dashboard fragments (bulk_update sends no post_save)
+            tasks_bulk_updated.send(
+                sender=Task, changes=[(rows[task_id], task) for task_id, task in changed.items()]
+            )
+
+    return JsonResponse({"success": True, "results": results})
+
+
 # -----------------------------------------------------
 # 🧩 Task Edit View
 # -----------------------------------------------------
@@ -120,8 +259,8 @@ def update_task_completion(request, pk):
 def task_edit(request, pk):
     task = get_object_or_404(Task, pk=pk)
 
-    # Only assigned user or owner can edit
-    if request.user != task.assigned_to and request.user != task.owner:
+    # Only assigned user or project owner can edit
+    if request.user.pk not in (task.assigned_to_id, task.project.owner_id):
         messages.error(request, "You are not authorized to edit this task.")
         return redirect("tasks:task_detail", pk=pk)
 
@@ -145,8 +284,8 @@ def task_edit(request, pk):
 def task_delete(request, pk):
     task = get_object_or_404(Task, pk=pk)
 
-    # Only assigned user or owner can delete
-    if request.user != task.assigned_to and request.user != getattr(task, 'owner', None):
+    # Only assigned user or project owner can delete
+    if request.user.pk not in (task.assigned_to_id, task.project.owner_id):
         messages.error(request, "You are not authorized to delete this task.")
         return redirect("tasks:task_detail", pk=pk)
 